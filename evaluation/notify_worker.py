@@ -1,7 +1,12 @@
 import os
 import json
+import select
 import socket
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 
 
 # import ../pash/compiler/config
@@ -11,8 +16,8 @@ import sys
 
 # Many functions are copied from worker_manager.py
 # This is used in evaluation to send a datanode a message to bring itself back up after being killed
-HOST = socket.gethostbyname(socket.gethostname())
-PORT = 55555        # Port to listen on (non-privileged ports are > 1023)
+RESURRECT_PARALLELISM = int(os.environ.get('FRAC_RESURRECT_PARALLELISM', 16))  # workers contacted at once
+CONNECT_TIMEOUT = float(os.environ.get('FRAC_CONNECT_TIMEOUT', 2.0))  # seconds
 PASH_TOP = os.environ['PASH_TOP']
 
 sys.path.append(f"{PASH_TOP}/compiler/dspash")  # Add the directory to sys.path
@@ -20,60 +25,124 @@ from socket_utils import SocketManager, encode_request, decode_request, send_msg
 KILL_WITNESS_PATH = os.path.join(os.path.dirname(os.path.realpath(__file__)), '../pash/compiler/dspash/kill_witness.log')
 
 
+@lru_cache(maxsize=256)
+def resolve_host(host):
+    """Resolve a host name/address to an IP once per process (LRU cached)."""
+    try:
+        return socket.gethostbyaddr(host)[2][0]
+    except (socket.herror, socket.gaierror):
+        return socket.gethostbyname(host)
+
+
 class WorkerConnection:
+    """Lazily connected, self-healing connection to one worker."""
+
     def __init__(self, name, host, port):
         self.name = name
-        self._host = socket.gethostbyaddr(host)[2][0] # get ip address in case host needs resolving
+        self.host_name = host  # as configured; resolved on first use
+        self._host = None
         self._port = port
         self._running_processes = 0
-        self._online = True
-        # assume client service is running, can add a way to activate later
+        self._socket = None
+        self._lock = threading.Lock()
+
+    def connect(self):
+        """Open the connection if it is not open yet; returns True on success."""
+        with self._lock:
+            if self._socket is not None:
+                return True
+            try:
+                self._socket = socket.create_connection((self.host(), self._port), timeout=CONNECT_TIMEOUT)
+                self._socket.settimeout(None)
+                return True
+            except OSError:
+                self._socket = None
+                return False
+
+    def ping(self):
+        """Health check: the connection is open and the worker has not hung up.
+
+        The worker protocol has no ping message, so this peeks at the socket:
+        a readable socket with no data means the worker closed it.
+        """
+        if self._socket is None:
+            return False
         try:
-            self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self._socket.connect((self._host, self._port))
-        except Exception as e:
-            self._online = False
-        
-    def is_online(self):
-        # TODO: create a ping to confirm is online
-        return self._online
+            ready, _, _ = select.select([self._socket], [], [], 0)
+            if ready and not self._socket.recv(1, socket.MSG_PEEK):
+                self._drop()
+                return False
+            return True
+        except OSError:
+            self._drop()
+            return False
 
-    def send_resurrect_request(self) -> bool:
-        request_dict = { 'type': 'resurrect' }
-        request = encode_request(request_dict)
-        send_msg(self._socket, request)
+    def is_online(self):
+        """Ping the worker, reconnecting once if the connection was lost."""
+        return self.ping() or (self.connect() and self.ping())
+
+    def _drop(self):
+        with self._lock:
+            if self._socket is not None:
+                try:
+                    self._socket.close()
+                except OSError:
+                    pass
+                self._socket = None
+
+    def send_request(self, request_dict):
+        """Send a request without waiting for the reply (see recv_response)."""
+        if not self.is_online():
+            raise ConnectionError(f"{self} is offline")
+        try:
+            send_msg(self._socket, encode_request(request_dict))
+        except OSError:
+            # Stale connection: reconnect and retry once
+            self._drop()
+            if not self.connect():
+                raise
+            send_msg(self._socket, encode_request(request_dict))
+
+    def recv_response(self):
         response_data = recv_msg(self._socket)
         if not response_data or decode_request(response_data)['status'] != "OK":
             raise Exception(f"didn't recieved ack on request {response_data}")
-        else:
-            # response = decode_request(response_data)
-            return True
+        return True
+
+    def send_resurrect_request(self) -> bool:
+        self.send_request({ 'type': 'resurrect' })
+        return self.recv_response()
 
     def close(self):
-        self._socket.send("Done")
-        self._socket.close()
+        if self._socket is not None:
+            try:
+                self._socket.send(b"Done")
+            except OSError:
+                pass
+            self._drop()
 
     def __str__(self):
-        return f"Worker {self._host}:{self._port}"
+        return f"Worker {self.host_name}:{self._port}"
 
     def host(self):
+        """IP address of the worker; raises OSError if the host does not resolve."""
+        if self._host is None:
+            self._host = resolve_host(self.host_name)
         return self._host
 
 class Messenger():
-    def __init__(self, workers: WorkerConnection = []):
-        self.workers = workers
-        self.host = socket.gethostbyname(socket.gethostname())
-        self.s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        self.s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        self.s.bind((HOST, PORT))
-        self.s.listen()
+    """Pool of worker connections; hosts are resolved only when a worker is used."""
+
+    def __init__(self, workers=None):
+        self.workers = list(workers or [])
 
     def __del__(self):
-        # Cleanup resources here, such as closing the socket
-        self.s.close()
-        
+        # Cleanup resources here, such as closing the sockets
+        for w in self.workers:
+            w._drop()
+
     def add_worker(self, name, host, port):
-            self.workers.append(WorkerConnection(name, host, port))
+        self.workers.append(WorkerConnection(name, host, port))
 
     def add_workers_from_cluster_config(self, config_path):
         with open(config_path, 'r') as f:
@@ -85,29 +154,55 @@ class Messenger():
             port = worker['port']
             self.add_worker(name, host, port)
 
-        addrs = {conn.host() for conn in self.workers}
+    def worker_for(self, target):
+        """First worker at target (a name or address), resolving as few hosts as possible."""
+        for w in self.workers:
+            if w.host_name == target:
+                return w
+        address = resolve_host(target)
+        for w in self.workers:
+            try:
+                if w.host() == address:
+                    return w
+            except OSError:
+                continue  # an unresolvable worker cannot be the target
+        return None
 
     def send_resurrect_request(self, resurrect_target):
-        resurrect_target_host = socket.gethostbyaddr(resurrect_target)[2][0]
-        socket.gethostbyaddr(resurrect_target)[2][0]
-        for worker in self.workers:
-            if worker.host() == resurrect_target_host:
-                worker.send_resurrect_request()
-                return
-
-    def send_resurrect_all(self):
-        """Send a resurrect RPC to every worker that is currently offline."""
-        for w in self.workers:
+        worker = self.worker_for(resurrect_target.strip())
+        if worker is not None:
+            worker.send_resurrect_request()
+
+    def send_resurrect_all(self, parallelism=RESURRECT_PARALLELISM):
+        """Send a resurrect RPC to every worker, pipelined over the pool.
+
+        Connections are opened concurrently, then every request is sent
+        before any reply is read, so the reset costs about one round trip.
+        Workers that are already up ignore the request.
+        """
+        start = time.time()
+        with ThreadPoolExecutor(max_workers=max(1, parallelism)) as pool:
+            online = list(pool.map(WorkerConnection.is_online, self.workers))
+
+        sent = []
+        for w, up in zip(self.workers, online):
+            if not up:
+                print(f"[notify_worker] could not resurrect {w.host_name}: offline")
+                continue
+            try:
+                w.send_request({ 'type': 'resurrect' })
+                sent.append(w)
+            except Exception as e:
+                print(f"[notify_worker] could not resurrect {w.host_name}: {e}")
+
+        for w in sent:
             try:
-                if not w.is_online():
-                    # try to reconnect in case the socket was severed
-                    w.send_resurrect_request()
-                else:
-                    # Still send the request; the worker will ignore if already up
-                    w.send_resurrect_request()
-                print(f"[notify_worker] resurrect signal sent to {w.host()}")
+                w.recv_response()
+                print(f"[notify_worker] resurrect signal sent to {w.host_name}")
             except Exception as e:
-                print(f"[notify_worker] could not resurrect {w.host()}: {e}")
+                w._drop()
+                print(f"[notify_worker] could not resurrect {w.host_name}: {e}")
+        print(f"[notify_worker] resurrect_all took {time.time() - start:.3f}s")
 
 if __name__ == "__main__":
     # Arity check
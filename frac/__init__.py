@@ -1,25 +1,91 @@
 """
 frac – Unified, Lightweight Fault-Injection Subsystem (v2)
 
-Convenience re-exports for common public symbols.
+Convenience re-exports for common public symbols.  They are imported on
+first access (PEP 562), so ``import frac`` and the CLI stay cheap.
 """
 
+from __future__ import annotations
+
+import sys as _sys
+import time as _time
+
+# Startup clock for ``frac --profile-startup``
+_START = _time.perf_counter()
+_START_MODULES = len(_sys.modules)
+
+# typing is not imported here: it alone would double the cost of ``import frac``
+TYPE_CHECKING = False
+
 __version__ = "2.0.0"
 
-# Core abstractions
-from .api import (
-    Node,
-    Event,
-    TimeEvent,
-    DelayEvent,
-    ByteEvent,
-    TokenEvent,
-    RuntimeHooks,
-    Frac,
-)
-
-# Built-in implementations
-from .local import LocalProcessNode, LocalFrac
-
-# Helpers for building custom RuntimeHooks
-from .observers import ByteCounter, Timer 
\ No newline at end of file
+_EXPORTS = {
+    # Core abstractions
+    "api": (
+        "Node",
+        "Event",
+        "TimeEvent",
+        "DelayEvent",
+        "ByteEvent",
+        "TokenEvent",
+        "ProgressEvent",
+        "PoissonEvent",
+        "RateEvent",
+        "AllOf",
+        "AnyOf",
+        "Sequence",
+        "Repeat",
+        "Timeout",
+        "RuntimeHooks",
+        "Frac",
+    ),
+    # Built-in implementations
+    "local": ("LocalProcessNode", "LocalFrac", "ProcessGroupNode", "LinkShaper", "SlowLink"),
+    "group": ("NodeGroup", "NodeGroupError", "NodeResult"),
+    "aio": ("AsyncProcessNode", "AsyncStreamingHooks", "AsyncLocalFrac"),
+    # Helpers for building custom RuntimeHooks
+    "observers": ("ByteCounter", "Timer", "TimerScheduler", "TimerHandle", "default_scheduler"),
+}
+_MODULE_OF = {name: module for module, names in _EXPORTS.items() for name in names}
+
+__all__ = list(_MODULE_OF)
+
+
+def __getattr__(name: str) -> object:
+    module = _MODULE_OF.get(name)
+    if module is None:
+        raise AttributeError(f"module 'frac' has no attribute {name!r}")
+    from importlib import import_module
+
+    value = getattr(import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list:
+    return sorted(list(globals()) + __all__)
+
+
+if TYPE_CHECKING:
+    from .api import (
+        AllOf,
+        AnyOf,
+        ByteEvent,
+        DelayEvent,
+        Event,
+        Frac,
+        Node,
+        PoissonEvent,
+        ProgressEvent,
+        RateEvent,
+        Repeat,
+        RuntimeHooks,
+        Sequence,
+        TimeEvent,
+        Timeout,
+        TokenEvent,
+    )
+    from .aio import AsyncLocalFrac, AsyncProcessNode, AsyncStreamingHooks
+    from .group import NodeGroup, NodeGroupError, NodeResult
+    from .local import LinkShaper, LocalFrac, LocalProcessNode, ProcessGroupNode, SlowLink
+    from .observers import ByteCounter, Timer, TimerHandle, TimerScheduler, default_scheduler
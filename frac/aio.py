@@ -0,0 +1,355 @@
+"""asyncio implementation of the local node, hooks and Frac.
+
+AsyncProcessNode runs its command with ``asyncio.subprocess`` and
+AsyncStreamingHooks pumps it from a StreamReader to a StreamWriter, so
+hundreds of piped nodes can share one event loop: there is no feeder or
+reaper thread per node, timers are loop timers rather than the shared
+timer thread, and both directions honour backpressure through
+``drain()``.  The regular Event classes arm against AsyncStreamingHooks
+unchanged; their callbacks, and so kill(), run on the loop.
+
+    node = AsyncProcessNode(["grep", "x"])
+    hooks = AsyncStreamingHooks(node)
+    AsyncLocalFrac().inject(node, ByteEvent(10_000), hooks)
+    await node.start()
+    await hooks.pump(reader, writer)
+
+Everything except call_later/call_at, which are thread-safe, must be used
+from the loop thread.  On Python 3.8-3.11 an application that owns its
+event loop policy can call ``use_pidfd_watcher()`` to stop asyncio from
+starting a waiter thread per child.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import signal
+import sys
+import time
+from typing import TYPE_CHECKING, Callable, List, Optional, Set, Tuple
+
+from . import metrics
+from .api import Event, Frac, Node, RuntimeHooks
+from .local import DEFAULT_CHUNK_SIZE, DEFAULT_KILL_TIMEOUT, LinkShaper
+from .observers import BaseRuntimeHooks
+
+if TYPE_CHECKING:
+    from datetime import datetime
+
+
+def use_pidfd_watcher() -> None:
+    """Reap children with pidfds instead of a waiter thread per process.
+
+    Python 3.12+ does this by default on Linux; 3.8-3.11 default to the
+    threaded watcher.  This replaces the child watcher of the process-wide
+    event loop policy, so it is left to the application to call (from the
+    running loop); frac never calls it on its own.
+    """
+    if sys.version_info >= (3, 12) or not hasattr(os, "pidfd_open"):
+        return
+    policy = asyncio.get_event_loop_policy()
+    try:
+        watcher = policy.get_child_watcher()  # type: ignore[attr-defined]
+    except (AttributeError, NotImplementedError):
+        return
+    if isinstance(watcher, asyncio.ThreadedChildWatcher):
+        pidfd_watcher = asyncio.PidfdChildWatcher()
+        pidfd_watcher.attach_loop(asyncio.get_running_loop())
+        policy.set_child_watcher(pidfd_watcher)  # type: ignore[attr-defined]
+
+
+class AsyncProcessNode(Node):
+    """A local subprocess driven by asyncio; kill() terminates, resurrect() respawns."""
+
+    def __init__(self, cmd: List[str], kill_timeout: float = DEFAULT_KILL_TIMEOUT) -> None:
+        self.cmd = cmd
+        self.kill_timeout = kill_timeout  # seconds between SIGTERM and SIGKILL
+        self.kill_stats: dict = {}  # latencies of the last kill()
+        self._kill_start: Optional[float] = None  # until the pump sees EOF
+        self.proc: Optional[asyncio.subprocess.Process] = None
+        self.killed = False
+        self._tasks: Set[asyncio.Task] = set()  # reap/respawn tasks in flight
+
+    async def start(self) -> None:
+        """Spawn the command with piped stdin/stdout."""
+        if self.proc is None:
+            await self._spawn()
+
+    async def _spawn(self) -> None:
+        self.proc = await asyncio.create_subprocess_exec(
+            *self.cmd, stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE
+        )
+        self.killed = False
+
+    def _running(self) -> bool:
+        return self.proc is not None and self.proc.returncode is None
+
+    def is_alive(self) -> bool:
+        return self._running() and not self.killed
+
+    def _background(self, coro) -> None:
+        task = asyncio.get_running_loop().create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def kill(self) -> None:
+        """Terminate the process; the pump stops at once, reaping happens in a task."""
+        if not self._running() or self.killed:
+            return
+        proc = self.proc
+        assert proc is not None
+        sys.stderr.write(f"[frac] killing PID {proc.pid}\n")
+        sys.stderr.flush()
+
+        start = time.perf_counter()
+        self.killed = True
+        self._signal(proc, signal.SIGTERM)
+        if proc.stdin is not None:
+            proc.stdin.close()
+        stats = {"pid": proc.pid}
+        self.kill_stats = stats
+        self._kill_start = start
+        self._background(self._reap(proc, start, stats))
+
+    def note_eof(self) -> None:
+        """Called by the pump when it stops forwarding; records kill_to_eof_ms after a kill."""
+        start, self._kill_start = self._kill_start, None
+        if start is not None:
+            eof_ms = (time.perf_counter() - start) * 1000
+            self.kill_stats["kill_to_eof_ms"] = eof_ms
+            metrics.observe("frac_kill_to_eof_seconds", eof_ms / 1000)
+            sys.stderr.write(
+                f"[frac] PID {self.kill_stats['pid']} output ended: kill-to-EOF {eof_ms:.3f} ms\n"
+            )
+            sys.stderr.flush()
+
+    def _signal(self, proc: asyncio.subprocess.Process, sig: int) -> None:
+        # Not proc.send_signal(): on 3.11 it polls, and so reaps, the child
+        # behind the child watcher's back, leaving wait() to report 255
+        if proc.returncode is None:
+            try:
+                os.kill(proc.pid, sig)
+            except ProcessLookupError:
+                pass
+
+    async def _reap(self, proc: asyncio.subprocess.Process, start: float, stats: dict) -> None:
+        """Wait for a killed process, escalating to SIGKILL after kill_timeout."""
+        try:
+            await asyncio.wait_for(proc.wait(), self.kill_timeout)
+            escalated = False
+        except asyncio.TimeoutError:
+            escalated = True
+            self._signal(proc, signal.SIGKILL)
+            await proc.wait()
+        stats["kill_to_reap_ms"] = (time.perf_counter() - start) * 1000
+        metrics.observe("frac_kill_to_reap_seconds", stats["kill_to_reap_ms"] / 1000)
+        stats["escalated"] = escalated
+        sys.stderr.write(
+            f"[frac] PID {proc.pid} reaped: kill-to-reap {stats['kill_to_reap_ms']:.3f} ms"
+            f"{' (SIGKILL)' if escalated else ''}\n"
+        )
+        sys.stderr.flush()
+
+    def resurrect(self) -> None:
+        """Spawn a fresh process (in a task; await ``resurrected()`` to wait for it)."""
+        self._background(self._respawn())
+
+    async def _respawn(self) -> None:
+        await self._spawn()
+        sys.stderr.write(f"[frac] resurrected as PID {self.proc.pid}\n")  # type: ignore[union-attr]
+        sys.stderr.flush()
+
+    async def resurrected(self) -> None:
+        """Wait for pending reap and respawn tasks."""
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks))
+
+    async def stop(self) -> None:
+        """Terminate and reap the process when the harness shuts down."""
+        if self._running():
+            self._signal(self.proc, signal.SIGTERM)  # type: ignore[arg-type]
+        if self.proc is not None:
+            await self.proc.wait()
+        await self.resurrected()
+
+
+class LoopTimerHandle:
+    """Cancellation handle for a callback scheduled on an event loop."""
+
+    __slots__ = ("when", "fn", "cancelled", "latency", "_handle")
+
+    def __init__(self, when: float, fn: Callable[[], None]) -> None:
+        self.when = when  # loop.time() deadline
+        self.fn = fn
+        self.cancelled = False
+        self.latency: Optional[float] = None  # seconds late, set once fired
+        self._handle: Optional[asyncio.TimerHandle] = None
+
+    def cancel(self) -> None:
+        """Prevent the callback from running if it has not fired yet."""
+        self.cancelled = True
+        if self._handle is not None:
+            self._handle.cancel()
+
+
+class AsyncStreamingHooks(BaseRuntimeHooks):
+    """RuntimeHooks for an AsyncProcessNode, with timers on the event loop."""
+
+    def __init__(
+        self, node: AsyncProcessNode, loop: Optional[asyncio.AbstractEventLoop] = None
+    ) -> None:
+        super().__init__()
+        self.node = node
+        self.set_fire_callback(node.kill)
+        self._loop = loop
+        self._shaper: Optional[LinkShaper] = None
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+        return self._loop
+
+    def set_shaper(self, shaper: Optional[LinkShaper]) -> None:
+        """Degrade the output link with shaper, or restore full speed with None."""
+        self._shaper = shaper
+
+    # Timers
+    def call_at(self, when: datetime, fn: Callable[[], None]) -> LoopTimerHandle:
+        """Schedule function to run at specific time."""
+        return self.call_later(when.timestamp() - time.time(), fn)
+
+    def call_later(self, secs: float, fn: Callable[[], None]) -> LoopTimerHandle:
+        """Schedule function to run after delay (callable from any thread)."""
+        loop = self._get_loop()
+        handle = LoopTimerHandle(loop.time() + max(0.0, secs), fn)
+        try:
+            on_loop = asyncio.get_running_loop() is loop
+        except RuntimeError:
+            on_loop = False
+        if on_loop:
+            self._schedule(handle)
+        else:
+            loop.call_soon_threadsafe(self._schedule, handle)
+        return handle
+
+    def _schedule(self, handle: LoopTimerHandle) -> None:
+        if not handle.cancelled:
+            handle._handle = self._get_loop().call_at(handle.when, self._run_timer, handle)
+
+    def _run_timer(self, handle: LoopTimerHandle) -> None:
+        handle.latency = self._get_loop().time() - handle.when
+        metrics.observe("frac_timer_latency_seconds", handle.latency)
+        try:
+            handle.fn()
+        except Exception as e:
+            sys.stderr.write(f"[frac] timer callback failed: {e!r}\n")
+            sys.stderr.flush()
+
+    # Streaming
+    async def pump(
+        self,
+        reader: Optional[asyncio.StreamReader],
+        writer: asyncio.StreamWriter,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> None:
+        """Feed reader into the node and forward its stdout to writer.
+
+        Like LocalStreamingHooks.pump_data: reads never cross a pending byte
+        threshold, so a ByteEvent kill lands on the exact byte, and every
+        forwarded chunk is counted and scanned for watched tokens, and every
+        chunk fed to the node counts as consumed input.  A StreamReader has
+        no size, so ProgressEvent needs ``set_input_size()`` first.  Returns
+        when the node's output ends or the node is killed; writer is left
+        open.
+        """
+        proc = self.node.proc
+        if proc is None or proc.stdout is None:
+            raise RuntimeError("pump() needs a started node")
+        feeder = asyncio.get_running_loop().create_task(self._feed(reader, proc))
+        try:
+            while not self.node.killed:
+                limit = chunk_size
+                remaining = self.bytes_until_threshold()
+                if remaining is not None and remaining < limit:
+                    limit = remaining
+                shaper = self._shaper
+                if shaper is not None and shaper.burst < limit:
+                    limit = shaper.burst
+
+                chunk = await proc.stdout.read(limit)
+                # Output still buffered when the node was killed is dropped,
+                # as closing the pipe does for the thread-based pump
+                if not chunk or self.node.killed:
+                    break
+                if shaper is not None:
+                    pause = shaper.pause(len(chunk))
+                    if pause > 0:
+                        await asyncio.sleep(pause)
+                writer.write(chunk)
+                await writer.drain()
+                self.add_bytes(chunk)
+        except (ConnectionError, BrokenPipeError):
+            pass
+        finally:
+            feeder.cancel()
+            try:
+                await feeder
+            except asyncio.CancelledError:
+                pass
+        self.node.note_eof()
+        if self.node.killed:
+            # asyncio only reports the exit once stdout is closed; drain what
+            # the dying process still writes without forwarding it
+            self.node._background(_discard(proc.stdout))
+
+    async def _feed(
+        self, reader: Optional[asyncio.StreamReader], proc: asyncio.subprocess.Process
+    ) -> None:
+        stdin = proc.stdin
+        if stdin is None:
+            return
+        try:
+            while reader is not None and not self.node.killed:
+                chunk = await reader.read(DEFAULT_CHUNK_SIZE)
+                if not chunk or self.node.killed:
+                    break
+                stdin.write(chunk)
+                await stdin.drain()
+                self.add_input_bytes(len(chunk))
+        except (ConnectionError, BrokenPipeError):
+            pass
+        finally:
+            stdin.close()
+
+
+async def _discard(stream: asyncio.StreamReader) -> None:
+    try:
+        while await stream.read(DEFAULT_CHUNK_SIZE):
+            pass
+    except (ConnectionError, BrokenPipeError):
+        pass
+
+
+class AsyncLocalFrac(Frac):
+    """Frac implementation for asyncio-driven local processes."""
+
+    def inject(self, target: Node, event: Event, hooks: RuntimeHooks) -> None:
+        """Arm event to kill target when condition is met (call from the loop)."""
+        event.arm(hooks)
+
+
+async def pipe_streams(
+    read_file, write_file
+) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+    """Stream reader/writer over two pipe-like files (pipes, sockets, ttys).
+
+    Regular files cannot be watched by the event loop; pass a pipe, e.g.
+    from ``cat file |``.
+    """
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader(loop=loop)
+    await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), read_file)
+    transport, protocol = await loop.connect_write_pipe(asyncio.streams.FlowControlMixin, write_file)
+    writer = asyncio.StreamWriter(transport, protocol, None, loop)
+    return reader, writer
@@ -2,10 +2,16 @@
 
 from __future__ import annotations
 
+import functools
+import math
+import threading
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from datetime import datetime
-from typing import Callable, Protocol
+from typing import TYPE_CHECKING, Any, Callable, Optional, Protocol
+
+if TYPE_CHECKING:
+    import random
+    from datetime import datetime
 
 
 # ---------------------------------------------------------------------------
@@ -85,29 +91,36 @@ class DelayEvent(Event):
 
 @dataclass
 class ByteEvent(Event):
-    """Fire after N bytes have been sent."""
+    """Fire after N bytes have been sent.
+
+    With ``relative=True`` the N bytes are counted from the moment the event
+    is armed, which is what a Repeat or Sequence child usually wants.
+    """
     bytes_out: int
-    
-    def __post_init__(self):
-        self._fired = False
+    relative: bool = False
 
     def arm(self, hooks: RuntimeHooks) -> None:
+        # Per-arm state, so the same event can be armed again (e.g. by Repeat)
+        fired = False
+        target = self.bytes_out + (hooks.bytes_sent() if self.relative else 0)
+
         def fire_once():
-            if not self._fired:
-                self._fired = True
+            nonlocal fired
+            if not fired:
+                fired = True
                 hooks.fire()
-        
+
         # Use immediate threshold checking if available
         if hasattr(hooks, 'add_byte_threshold'):
-            hooks.add_byte_threshold(self.bytes_out, fire_once)
+            hooks.add_byte_threshold(target, fire_once)
         else:
             # Fallback to polling for hooks that don't support immediate thresholds
             def check_condition():
-                if not self._fired and hooks.bytes_sent() >= self.bytes_out:
+                if not fired and hooks.bytes_sent() >= target:
                     fire_once()
-                elif not self._fired:
+                elif not fired:
                     hooks.call_later(_POLL_INTERVAL, check_condition)
-            
+
             check_condition()
 
 
@@ -117,7 +130,448 @@ class TokenEvent(Event):
     token: str
 
     def arm(self, hooks: RuntimeHooks) -> None:
-        _poll_until(lambda: hooks.seen_token(self.token), hooks)
+        fired = False
+
+        def fire_once():
+            nonlocal fired
+            if not fired:
+                fired = True
+                hooks.fire()
+
+        # Use push-based matching on the stream if available
+        if _pushes_tokens(hooks):
+            hooks.add_token_watch(self.token, fire_once)
+        else:
+            # Fallback to polling for hooks that can't scan the stream, or
+            # that report tokens by overriding seen_token()
+            _poll_until(lambda: hooks.seen_token(self.token), hooks)
+
+
+@dataclass
+class ProgressEvent(Event):
+    """Fire once the node has consumed ``fraction`` of its input (0 < fraction <= 1).
+
+    Needs hooks that know the input size and how much of it was consumed
+    (``progress()``), e.g. LocalStreamingHooks pumping a regular file, or
+    hooks fed by frac.procfs.ProcIOProgress.  This places a fault at, say,
+    half-way through a job without calibration runs to learn its byte count.
+    """
+    fraction: float
+
+    def __post_init__(self):
+        if not 0 < self.fraction <= 1:
+            raise ValueError("ProgressEvent needs 0 < fraction <= 1")
+
+    def arm(self, hooks: RuntimeHooks) -> None:
+        fired = False
+
+        def fire_once():
+            nonlocal fired
+            if not fired:
+                fired = True
+                hooks.fire()
+
+        if hasattr(hooks, 'add_progress_watch'):
+            hooks.add_progress_watch(self.fraction, fire_once)
+            return
+        progress = getattr(hooks, 'progress', None)
+        if progress is None:
+            raise TypeError(f"{type(hooks).__name__} does not report progress()")
+        # Fallback to polling for hooks that only report progress()
+        _poll_until(lambda: (progress() or 0.0) >= self.fraction, hooks)
+
+
+# ---------------------------------------------------------------------------
+# Probabilistic events
+# ---------------------------------------------------------------------------
+_GB = 10**9
+
+
+# random is imported on first use: most frac invocations never draw a number
+
+
+def _random_seed() -> int:
+    import random
+
+    return random.SystemRandom().randrange(2**32)
+
+
+def _rng(seed: int) -> random.Random:
+    import random
+
+    return random.Random(seed)
+
+
+def _arrivals(
+    rng: random.Random, rate: float, count: Optional[int], limit: Optional[float]
+) -> list[float]:
+    """Poisson arrival offsets: exponential gaps until count or limit is reached."""
+    offsets: list[float] = []
+    t = 0.0
+    while count is None or len(offsets) < count:
+        t += rng.expovariate(rate)
+        if limit is not None and t > limit:
+            break
+        offsets.append(t)
+    return offsets
+
+
+@dataclass
+class PoissonEvent(Event):
+    """Fire at Poisson arrivals, ``rate_per_s`` times per second on average.
+
+    The arrival times are drawn from ``seed`` when the event is created (a
+    random seed is picked, and kept in ``seed``, if none is given), so a run
+    can be replayed exactly.  ``count`` and/or ``duration_ms`` bound the
+    schedule.  All arrivals are armed at once on the timer scheduler.
+    """
+    rate_per_s: float
+    seed: Optional[int] = None
+    count: Optional[int] = None
+    duration_ms: Optional[int] = None
+
+    def __post_init__(self):
+        if self.rate_per_s <= 0:
+            raise ValueError("PoissonEvent needs rate_per_s > 0")
+        if self.count is None and self.duration_ms is None:
+            raise ValueError("PoissonEvent needs count or duration_ms")
+        if self.seed is None:
+            self.seed = _random_seed()
+        self.schedule_ms = _arrivals(
+            _rng(self.seed), self.rate_per_s / 1000.0, self.count, self.duration_ms
+        )
+
+    @property
+    def times(self) -> int:
+        """Number of fires in the schedule."""
+        return len(self.schedule_ms)
+
+    def arm(self, hooks: RuntimeHooks) -> None:
+        for offset in self.schedule_ms:
+            hooks.call_later(offset / 1000.0, hooks.fire)
+
+
+@dataclass
+class RateEvent(Event):
+    """Fire with probability ``per_gb`` in every GB (10**9 bytes) sent.
+
+    Faults form a Poisson process over the byte stream; the byte offsets
+    (counted from arming) are drawn from ``seed`` when the event is created,
+    like PoissonEvent.  ``count`` and/or ``max_bytes`` bound the schedule.
+    Offsets go straight into the hooks' byte-threshold index.
+    """
+    per_gb: float
+    seed: Optional[int] = None
+    count: Optional[int] = None
+    max_bytes: Optional[int] = None
+
+    def __post_init__(self):
+        if not 0 < self.per_gb < 1:
+            raise ValueError("RateEvent needs 0 < per_gb < 1")
+        if self.count is None and self.max_bytes is None:
+            raise ValueError("RateEvent needs count or max_bytes")
+        if self.seed is None:
+            self.seed = _random_seed()
+        rate = -math.log1p(-self.per_gb) / _GB  # faults per byte
+        offsets = _arrivals(_rng(self.seed), rate, self.count, self.max_bytes)
+        self.schedule_bytes = [max(1, math.ceil(offset)) for offset in offsets]
+
+    @property
+    def times(self) -> int:
+        """Number of fires in the schedule."""
+        return len(self.schedule_bytes)
+
+    def arm(self, hooks: RuntimeHooks) -> None:
+        targets = [hooks.bytes_sent() + offset for offset in self.schedule_bytes]
+        if hasattr(hooks, 'add_byte_threshold'):
+            for target in targets:
+                hooks.add_byte_threshold(target, hooks.fire)
+            return
+
+        # Fallback: one polling loop walks the whole schedule
+        def check(i: int) -> None:
+            sent = hooks.bytes_sent()
+            while i < len(targets) and sent >= targets[i]:
+                hooks.fire()
+                i += 1
+            if i < len(targets):
+                hooks.call_later(_POLL_INTERVAL, lambda: check(i))
+
+        check(0)
+
+
+# ---------------------------------------------------------------------------
+# Composite events
+# ---------------------------------------------------------------------------
+class _ScopedHooks:
+    """The hooks one armed child of a composite event sees.
+
+    Everything is forwarded to the real hooks, so feature detection
+    (``add_byte_threshold``, ``add_token_watch``) and the shared timer
+    scheduler work unchanged, but fire() reports to the parent instead.
+    close() drops later fires, cancels the timers the child asked for,
+    unregisters its byte thresholds and token/progress watches where the
+    hooks support removing them (so e.g. a ProcHooks sampler can stop) and
+    refuses new ones, which also ends any polling fallback.
+    """
+
+    def __init__(self, hooks: RuntimeHooks, on_fire: Callable[[], None]) -> None:
+        self._hooks = hooks
+        self._on_fire = on_fire
+        self._handles: list[Any] = []
+        self._watches: list[tuple[str, Any, Callable[[], None]]] = []  # (remover, key, callback)
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._hooks, name)  # AttributeError keeps feature detection honest
+        remover = _WATCH_REMOVERS.get(name)
+        if remover is None:
+            return attr
+        return functools.partial(self._add_watch, attr, remover)
+
+    def _add_watch(
+        self, add: Callable[[Any, Callable[[], None]], None], remover: str,
+        key: Any, callback: Callable[[], None],
+    ) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._watches.append((remover, key, callback))
+        add(key, callback)
+
+    def _track(self, handle: Any) -> Any:
+        if hasattr(handle, "cancel"):
+            with self._lock:
+                if len(self._handles) >= 32:
+                    # Forget timers that already ran or were cancelled
+                    self._handles = [
+                        h for h in self._handles
+                        if getattr(h, "latency", None) is None and not getattr(h, "cancelled", False)
+                    ]
+                self._handles.append(handle)
+        return handle
+
+    def call_at(self, when, fn):
+        if self._closed:
+            return None
+        return self._track(self._hooks.call_at(when, fn))
+
+    def call_later(self, secs, fn):
+        if self._closed:
+            return None
+        return self._track(self._hooks.call_later(secs, fn))
+
+    def fire(self) -> None:
+        if not self._closed:
+            self._on_fire()
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            handles, self._handles = self._handles, []
+            watches, self._watches = self._watches, []
+        for handle in handles:
+            handle.cancel()
+        for remover, key, callback in watches:
+            remove = getattr(self._hooks, remover, None)
+            if remove is not None:
+                remove(key, callback)  # a no-op for watches that already fired
+
+
+# Registration methods _ScopedHooks tracks, and how to undo them on close()
+_WATCH_REMOVERS = {
+    "add_byte_threshold": "remove_byte_threshold",
+    "add_token_watch": "remove_token_watch",
+    "add_progress_watch": "remove_progress_watch",
+}
+
+
+def _pushes_tokens(hooks: RuntimeHooks) -> bool:
+    """True if token watches on hooks fire without polling seen_token()."""
+    while isinstance(hooks, _ScopedHooks):
+        hooks = hooks._hooks
+    if not hasattr(hooks, "add_token_watch"):
+        return False
+    from .observers import BaseRuntimeHooks  # loaded already if hooks is one
+
+    # A subclass overriding seen_token() reports tokens through it, not
+    # through add_token(), so its watches would never fire
+    return getattr(type(hooks), "seen_token", None) is BaseRuntimeHooks.seen_token
+
+
+def _scope(hooks: RuntimeHooks, on_fire: Callable[[], None]) -> RuntimeHooks:
+    return _ScopedHooks(hooks, on_fire)  # type: ignore[return-value]
+
+
+class AllOf(Event):
+    """Fire once every child event has fired, in any order."""
+
+    def __init__(self, *events: Event) -> None:
+        if not events:
+            raise ValueError("AllOf needs at least one event")
+        self.events = list(events)
+
+    def __repr__(self) -> str:
+        return f"AllOf({', '.join(map(repr, self.events))})"
+
+    def arm(self, hooks: RuntimeHooks) -> None:
+        lock = threading.Lock()
+        pending = set(range(len(self.events)))
+        scopes: list[Any] = []
+
+        def child_fired(i: int) -> None:
+            with lock:
+                if i not in pending:
+                    return
+                pending.discard(i)
+                done = not pending
+            scopes[i].close()
+            if done:
+                hooks.fire()
+
+        for i in range(len(self.events)):
+            scopes.append(_scope(hooks, lambda i=i: child_fired(i)))
+        for event, scope in zip(self.events, scopes):
+            event.arm(scope)
+
+
+class AnyOf(Event):
+    """Fire when the first child event fires; the others are disarmed."""
+
+    def __init__(self, *events: Event) -> None:
+        if not events:
+            raise ValueError("AnyOf needs at least one event")
+        self.events = list(events)
+
+    def __repr__(self) -> str:
+        return f"AnyOf({', '.join(map(repr, self.events))})"
+
+    def arm(self, hooks: RuntimeHooks) -> None:
+        lock = threading.Lock()
+        done = False
+        scopes: list[Any] = []
+
+        def child_fired() -> None:
+            nonlocal done
+            with lock:
+                if done:
+                    return
+                done = True
+            for scope in scopes:
+                scope.close()
+            hooks.fire()
+
+        scopes.extend(_scope(hooks, child_fired) for _ in self.events)
+        for event, scope in zip(self.events, scopes):
+            if done:  # an earlier child fired while being armed
+                scope.close()
+                continue
+            event.arm(scope)
+
+
+class Sequence(Event):
+    """Fire after each child event has fired in turn.
+
+    A child is only armed once the previous one has fired, so DelayEvents
+    and relative ByteEvents count from the end of the previous step.
+    """
+
+    def __init__(self, *events: Event) -> None:
+        if not events:
+            raise ValueError("Sequence needs at least one event")
+        self.events = list(events)
+
+    def __repr__(self) -> str:
+        return f"Sequence({', '.join(map(repr, self.events))})"
+
+    def arm(self, hooks: RuntimeHooks) -> None:
+        def step(i: int) -> None:
+            if i == len(self.events):
+                hooks.fire()
+                return
+            scope: Any = None
+
+            def child_fired() -> None:
+                scope.close()
+                step(i + 1)
+
+            scope = _scope(hooks, child_fired)
+            self.events[i].arm(scope)
+
+        step(0)
+
+
+@dataclass
+class Repeat(Event):
+    """Fire every time the child event fires, re-arming it ``times`` times in total.
+
+    The child is armed again right after each fire, so use relative events
+    (DelayEvent, ``ByteEvent(n, relative=True)``) for "every N" schedules.
+    To kill and resurrect in turn, bind fire to a callback that alternates.
+    """
+    event: Event
+    times: int
+
+    def __post_init__(self):
+        if self.times < 1:
+            raise ValueError("Repeat needs times >= 1")
+
+    def arm(self, hooks: RuntimeHooks) -> None:
+        count = 0
+
+        def arm_next() -> None:
+            scope: Any = None
+
+            def child_fired() -> None:
+                nonlocal count
+                scope.close()
+                count += 1
+                if count < self.times:
+                    arm_next()
+                hooks.fire()
+
+            scope = _scope(hooks, child_fired)
+            self.event.arm(scope)
+
+        arm_next()
+
+
+@dataclass
+class Timeout(Event):
+    """Fire when the child event fires, unless ``ms`` milliseconds pass first.
+
+    On expiry the child is disarmed and nothing fires.  Combine with AnyOf
+    and a DelayEvent instead to fire at the deadline regardless.
+    """
+    event: Event
+    ms: int
+
+    def arm(self, hooks: RuntimeHooks) -> None:
+        lock = threading.Lock()
+        done = False
+
+        def finish() -> bool:
+            nonlocal done
+            with lock:
+                if done:
+                    return False
+                done = True
+            scope.close()
+            if timer is not None and hasattr(timer, "cancel"):
+                timer.cancel()
+            return True
+
+        def child_fired() -> None:
+            if finish():
+                hooks.fire()
+
+        timer: Any = None
+        scope: Any = _scope(hooks, child_fired)
+        timer = hooks.call_later(self.ms / 1000.0, finish)
+        if done:  # ms == 0 and the timer already ran
+            return
+        self.event.arm(scope)
 
 
 # ---------------------------------------------------------------------------
@@ -0,0 +1,588 @@
+"""Micro-benchmarks for frac's own hot paths.
+
+Run with ``frac bench`` (or ``python -m frac.bench``).  Each benchmark
+returns a flat dict so the results can be printed as a table or dumped as
+JSON with ``--json``.  ``--baseline`` compares against an earlier JSON dump
+and exits with status 1 if any result regressed by more than
+``--tolerance``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from .api import ByteEvent, DelayEvent
+from .local import DEFAULT_CHUNK_SIZE, LocalFrac, LocalProcessNode, LocalStreamingHooks
+from .observers import BaseRuntimeHooks, TimerScheduler, TokenMatcher
+
+SUITES = ("pump", "timers", "thresholds", "tokens", "kill")
+
+# Result keys compared against a baseline, and which direction is better
+HIGHER_IS_BETTER = ("mb_per_s",)
+LOWER_IS_BETTER = (
+    "ns_per_chunk", "mean_latency_ms", "kill_ms_mean", "kill_to_eof_ms_mean",
+    "kill_to_reap_ms_mean", "resurrect_ms_mean",
+)
+
+
+def bench_pump(
+    chunk_size: int, total_bytes: int, kill_at: int | None = None
+) -> Dict[str, Any]:
+    """Measure LocalStreamingHooks.pump_data throughput through ``cat``.
+
+    With ``kill_at`` a ByteEvent is armed and the number of bytes actually
+    forwarded is reported, so exactness can be checked alongside speed.
+    """
+    node = LocalProcessNode(["cat"])
+    node.start()
+    hooks = LocalStreamingHooks(node)
+    if kill_at is not None:
+        LocalFrac().inject(node, ByteEvent(kill_at), hooks)
+
+    source = io.BytesIO(b"x" * total_bytes)
+    with open(os.devnull, "wb") as sink:
+        start = time.perf_counter()
+        hooks.pump_data(source, sink, chunk_size=chunk_size)
+        elapsed = time.perf_counter() - start
+
+    if node.proc:
+        node.proc.terminate()
+        node.proc.wait()
+
+    forwarded = hooks.bytes_sent()
+    name = f"pump[chunk={chunk_size}]"
+    if kill_at is not None:
+        name = f"pump[chunk={chunk_size},kill_at={kill_at}]"
+    return {
+        "name": name,
+        "bytes": forwarded,
+        "seconds": elapsed,
+        "mb_per_s": forwarded / elapsed / 1e6 if elapsed else 0.0,
+        "kill_at": kill_at,
+    }
+
+
+def bench_pipe_pump(total_bytes: int, splice: bool) -> Dict[str, Any]:
+    """Measure the pump between real pipes, with or without splice(2)."""
+    node = LocalProcessNode(["cat"])
+    node.start()
+    hooks = LocalStreamingHooks(node)
+
+    producer = subprocess.Popen(
+        ["head", "-c", str(total_bytes), "/dev/zero"], stdout=subprocess.PIPE
+    )
+    consumer = subprocess.Popen(
+        ["cat"], stdin=subprocess.PIPE, stdout=subprocess.DEVNULL
+    )
+    start = time.perf_counter()
+    hooks.pump_data(producer.stdout, consumer.stdin, splice=splice)
+    consumer.stdin.close()  # type: ignore[union-attr]
+    consumer.wait()
+    elapsed = time.perf_counter() - start
+    producer.wait()
+    if node.proc:
+        node.proc.wait()
+
+    forwarded = hooks.bytes_sent()
+    return {
+        "name": f"pipe-pump[splice={splice}]",
+        "bytes": forwarded,
+        "seconds": elapsed,
+        "mb_per_s": forwarded / elapsed / 1e6 if elapsed else 0.0,
+        "kill_at": None,
+    }
+
+
+def run_pump_suite(size: int, legacy_size: int) -> List[Dict[str, Any]]:
+    """Compare the 1-byte legacy path against the chunked and splice pumps."""
+    results = [bench_pump(1, legacy_size)]
+    for chunk_size in (4096, DEFAULT_CHUNK_SIZE, 1024 * 1024):
+        results.append(bench_pump(chunk_size, size))
+    # Exactness check: kill on an offset that is not chunk aligned
+    results.append(bench_pump(DEFAULT_CHUNK_SIZE, size, kill_at=size // 2 + 1))
+    results.append(bench_pipe_pump(size, splice=False))
+    if hasattr(os, "splice"):
+        results.append(bench_pipe_pump(size, splice=True))
+    return results
+
+
+def bench_timers(count: int, spread_ms: int, legacy: bool = False) -> Dict[str, Any]:
+    """Arm ``count`` DelayEvents spread over ``spread_ms`` and wait for all.
+
+    ``legacy=True`` uses one threading.Timer per callback, as frac did before
+    the shared TimerScheduler.
+    """
+    scheduler = TimerScheduler()
+    done = threading.Event()
+    fired = 0
+    lock = threading.Lock()
+    peak_threads = threading.active_count()
+
+    def on_fire() -> None:
+        nonlocal fired, peak_threads
+        with lock:
+            fired += 1
+            peak_threads = max(peak_threads, threading.active_count())
+            if fired == count:
+                done.set()
+
+    latencies: List[float] = []
+
+    class _LegacyHooks(BaseRuntimeHooks):
+        def call_later(self, secs, fn):  # type: ignore[override]
+            due = time.monotonic() + secs
+
+            def run() -> None:
+                latencies.append(time.monotonic() - due)
+                fn()
+
+            threading.Timer(secs, run).start()
+
+    hooks = _LegacyHooks(scheduler) if legacy else BaseRuntimeHooks(scheduler)
+    hooks.set_fire_callback(on_fire)
+
+    start = time.perf_counter()
+    for i in range(count):
+        DelayEvent(i * spread_ms // count).arm(hooks)
+    armed = time.perf_counter() - start
+    done.wait()
+    elapsed = time.perf_counter() - start
+
+    if legacy:
+        mean = sum(latencies) / len(latencies) * 1000 if latencies else 0.0
+        worst = max(latencies) * 1000 if latencies else 0.0
+    else:
+        stats = scheduler.stats()
+        mean, worst = stats["mean_latency_ms"], stats["max_latency_ms"]
+    return {
+        "name": f"timers[{'threading.Timer' if legacy else 'scheduler'},n={count}]",
+        "events": count,
+        "arm_seconds": armed,
+        "seconds": elapsed,
+        "mean_latency_ms": mean,
+        "max_latency_ms": worst,
+        "peak_threads": peak_threads,
+    }
+
+
+def run_timer_suite(count: int, legacy_count: int, spread_ms: int) -> List[Dict[str, Any]]:
+    """Arm many events on the shared scheduler versus one thread per timer."""
+    return [
+        bench_timers(legacy_count, spread_ms, legacy=True),
+        bench_timers(count, spread_ms),
+    ]
+
+
+def bench_thresholds(
+    thresholds: int, total_bytes: int, chunk_size: int, legacy: bool = False
+) -> Dict[str, Any]:
+    """Push ``total_bytes`` through add_byte_count with many armed thresholds.
+
+    ``legacy=True`` replays the original list scan (two locked reads of the
+    counter plus a full copy-and-scan of the threshold list per chunk).
+    """
+    hooks = BaseRuntimeHooks(TimerScheduler())
+    rng = random.Random(0)
+    fired = 0
+
+    def on_threshold() -> None:
+        nonlocal fired
+        fired += 1
+
+    offsets = [rng.randint(1, total_bytes) for _ in range(thresholds)]
+    legacy_list = [(offset, on_threshold) for offset in offsets]
+    start = time.perf_counter()
+    if not legacy:
+        for offset in offsets:
+            hooks.add_byte_threshold(offset, on_threshold)
+    armed = time.perf_counter() - start
+
+    counter = hooks._byte_counter
+    chunks = total_bytes // chunk_size
+    start = time.perf_counter()
+    for _ in range(chunks):
+        if legacy:
+            old_total = counter.total()
+            counter.add_count(chunk_size)
+            new_total = counter.total()
+            for threshold, callback in legacy_list[:]:
+                if old_total < threshold <= new_total:
+                    callback()
+                    legacy_list.remove((threshold, callback))
+        else:
+            hooks.add_byte_count(chunk_size)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "name": f"thresholds[{'list' if legacy else 'heap'},n={thresholds}]",
+        "thresholds": thresholds,
+        "bytes": chunks * chunk_size,
+        "chunks": chunks,
+        "fired": fired,
+        "arm_seconds": armed,
+        "seconds": elapsed,
+        "ns_per_chunk": elapsed / chunks * 1e9 if chunks else 0.0,
+    }
+
+
+def run_threshold_suite(
+    thresholds: int, legacy_thresholds: int, total_bytes: int, chunk_size: int
+) -> List[Dict[str, Any]]:
+    """Threshold-index cost per add_bytes chunk, heap versus original list."""
+    return [
+        bench_thresholds(legacy_thresholds, total_bytes, chunk_size, legacy=True),
+        bench_thresholds(thresholds, total_bytes, chunk_size),
+        bench_thresholds(0, total_bytes, chunk_size),
+    ]
+
+
+def bench_tokens(
+    tokens: int, total_bytes: int, chunk_size: int, legacy: bool = False
+) -> Dict[str, Any]:
+    """Scan ``total_bytes`` of text for ``tokens`` watched tokens.
+
+    ``legacy=True`` does one substring search per token per chunk (which
+    also misses tokens split across chunks), as a reference point.
+    """
+    rng = random.Random(0)
+    words = [f"tok-{i:06d}-{rng.randrange(16**6):06x}" for i in range(tokens)]
+    # Log-like text; each line starts a token prefix but never completes one
+    lines = "".join(
+        f"INFO worker {i % 7} step {i} {words[i % tokens][:8]} batch done\n" for i in range(64)
+    )
+    chunk = (lines.encode() * (chunk_size // len(lines) + 1))[:chunk_size]
+    chunks = total_bytes // chunk_size
+
+    matcher = TokenMatcher()
+    for word in words:
+        matcher.add(word)
+    needles = [word.encode() for word in words]
+
+    found = 0
+    start = time.perf_counter()
+    for _ in range(chunks):
+        if legacy:
+            found += sum(1 for needle in needles if needle in chunk)
+        else:
+            found += len(matcher.feed(chunk))
+    elapsed = time.perf_counter() - start
+    scanned = chunks * chunk_size
+    return {
+        "name": f"tokens[{'substring' if legacy else 'matcher'},n={tokens}]",
+        "tokens": tokens,
+        "bytes": scanned,
+        "found": found,
+        "seconds": elapsed,
+        "mb_per_s": scanned / elapsed / 1e6 if elapsed else 0.0,
+    }
+
+
+def run_token_suite(total_bytes: int, chunk_size: int) -> List[Dict[str, Any]]:
+    """Token-scan throughput for a few watch-list sizes."""
+    results = []
+    for tokens in (1, 16, 256):
+        results.append(bench_tokens(tokens, total_bytes, chunk_size, legacy=True))
+        results.append(bench_tokens(tokens, total_bytes, chunk_size))
+    return results
+
+
+def bench_kill_resurrect(rounds: int) -> Dict[str, Any]:
+    """Kill and resurrect a ``cat`` LocalProcessNode ``rounds`` times.
+
+    Each round pumps the node's output on a thread, as byte-kill does.
+    ``kill_ms`` is how long kill() blocks the caller, ``kill_to_eof_ms``
+    (until the pump sees the output end) and ``kill_to_reap_ms`` come from
+    the node's kill_stats, and ``resurrect_ms`` is the time to respawn.
+    """
+    node = LocalProcessNode(["cat"])
+    node.start()
+    hooks = LocalStreamingHooks(node)
+    kill_ms: List[float] = []
+    eof_ms: List[float] = []
+    reap_ms: List[float] = []
+    resurrect_ms: List[float] = []
+    for _ in range(rounds):
+        proc = node.proc
+        r, w = os.pipe()
+        with open(r, "rb", buffering=0) as source, open(os.devnull, "wb") as sink:
+            pump = threading.Thread(target=hooks.pump_data, args=(source, sink))
+            pump.start()
+            start = time.perf_counter()
+            node.kill()
+            kill_ms.append((time.perf_counter() - start) * 1000)
+            pump.join(5)
+            os.close(w)  # lets the pump's input thread finish
+        proc.wait()  # type: ignore[union-attr]
+        # The reaper thread fills in the reap latency right after the exit
+        deadline = time.monotonic() + 5
+        while "kill_to_reap_ms" not in node.kill_stats and time.monotonic() < deadline:
+            time.sleep(0.0005)
+        eof_ms.append(node.kill_stats.get("kill_to_eof_ms", 0.0))
+        reap_ms.append(node.kill_stats.get("kill_to_reap_ms", 0.0))
+
+        start = time.perf_counter()
+        node.resurrect()
+        resurrect_ms.append((time.perf_counter() - start) * 1000)
+    node.stop()
+
+    def summary(key: str, values: List[float]) -> Dict[str, float]:
+        return {
+            f"{key}_mean": statistics.fmean(values) if values else 0.0,
+            f"{key}_p50": statistics.median(values) if values else 0.0,
+            f"{key}_max": max(values, default=0.0),
+        }
+
+    return {
+        "name": "kill-resurrect[cat]",
+        "rounds": rounds,
+        **summary("kill_ms", kill_ms),
+        **summary("kill_to_eof_ms", eof_ms),
+        **summary("kill_to_reap_ms", reap_ms),
+        **summary("resurrect_ms", resurrect_ms),
+    }
+
+
+def compare(
+    results: List[Dict[str, Any]], baseline: List[Dict[str, Any]], tolerance: float
+) -> List[Dict[str, Any]]:
+    """Compare results to a baseline by name; returns one row per compared key.
+
+    Names encode each result's configuration, so rows only pair up with a
+    baseline run of the same configuration.  A row is a regression when
+    the key got worse by more than ``tolerance`` (a fraction, e.g. 0.1 for
+    10%).
+    """
+    names = [r["name"] for r in results]
+    if len(set(names)) != len(names):
+        raise ValueError(f"benchmark names are not unique: {sorted(names)}")
+    previous = {r["name"]: r for r in baseline}
+    rows = []
+    for result in results:
+        old = previous.get(result["name"])
+        if old is None:
+            continue
+        for key in HIGHER_IS_BETTER + LOWER_IS_BETTER:
+            if key not in result or not old.get(key):
+                continue
+            change = (result[key] - old[key]) / old[key]
+            worse = -change if key in HIGHER_IS_BETTER else change
+            rows.append({
+                "name": result["name"],
+                "key": key,
+                "baseline": old[key],
+                "value": result[key],
+                "change": change,
+                "regression": worse > tolerance,
+            })
+    return rows
+
+
+def _print_comparison(rows: List[Dict[str, Any]], tolerance: float) -> None:
+    for row in rows:
+        flag = "  REGRESSION" if row["regression"] else ""
+        print(
+            f"{row['name']:<36} {row['key']:<20} {row['baseline']:>12.3f} -> "
+            f"{row['value']:>12.3f}  {row['change']:>+7.1%}{flag}"
+        )
+    regressions = sum(1 for row in rows if row["regression"])
+    print(f"{len(rows)} compared, {regressions} regressed by more than {tolerance:.0%}")
+
+
+def _print_token_table(results: List[Dict[str, Any]]) -> None:
+    for r in results:
+        print(
+            f"{r['name']:<28} {r['bytes']:>12} B {r['seconds']:>9.3f} s "
+            f"{r['mb_per_s']:>10.1f} MB/s"
+        )
+
+
+def _print_kill_table(results: List[Dict[str, Any]]) -> None:
+    for r in results:
+        print(
+            f"{r['name']:<24} {r['rounds']:>5} rounds  kill {r['kill_ms_mean']:>7.3f} ms  "
+            f"EOF {r['kill_to_eof_ms_mean']:>7.3f} ms  reap {r['kill_to_reap_ms_mean']:>7.3f} ms  "
+            f"resurrect {r['resurrect_ms_mean']:>7.3f} ms"
+        )
+
+
+def _print_threshold_table(results: List[Dict[str, Any]]) -> None:
+    for r in results:
+        print(
+            f"{r['name']:<28} {r['thresholds']:>7} thresholds  {r['bytes']:>12} B  "
+            f"fired {r['fired']:>7}  {r['seconds']:>8.3f} s  {r['ns_per_chunk']:>9.0f} ns/chunk"
+        )
+
+
+def _print_timer_table(results: List[Dict[str, Any]]) -> None:
+    for r in results:
+        print(
+            f"{r['name']:<24} {r['events']:>7} events  arm {r['arm_seconds']:>7.3f} s  "
+            f"latency mean {r['mean_latency_ms']:>7.2f} ms  max {r['max_latency_ms']:>8.2f} ms  "
+            f"peak threads {r['peak_threads']}"
+        )
+
+
+def _print_table(results: List[Dict[str, Any]]) -> None:
+    for r in results:
+        print(
+            f"{r['name']:<36} {r['bytes']:>12} B {r['seconds']:>9.3f} s "
+            f"{r['mb_per_s']:>10.1f} MB/s"
+        )
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Benchmark options, shared by ``frac bench`` and ``python -m frac.bench``."""
+    parser.add_argument(
+        "--suite", action="append", choices=SUITES,
+        help="Run only this suite (repeatable; default: all)"
+    )
+    parser.add_argument(
+        "--quick", action="store_true",
+        help="Small sizes for a fast smoke run (numbers are noisier)"
+    )
+    parser.add_argument(
+        "--size", type=int, default=256 * 1024 * 1024,
+        help="Bytes pushed through the chunked pump"
+    )
+    parser.add_argument(
+        "--legacy-size", type=int, default=1024 * 1024,
+        help="Bytes pushed through the 1-byte pump (it is slow)"
+    )
+    parser.add_argument(
+        "--timers", type=int, default=10_000,
+        help="DelayEvents armed on the shared scheduler"
+    )
+    parser.add_argument(
+        "--legacy-timers", type=int, default=1000,
+        help="DelayEvents armed with one threading.Timer each"
+    )
+    parser.add_argument(
+        "--timer-spread-ms", type=int, default=1000,
+        help="Delays are spread evenly over this window"
+    )
+    parser.add_argument(
+        "--thresholds", type=int, default=100_000,
+        help="Byte thresholds armed on the heap index"
+    )
+    parser.add_argument(
+        "--legacy-thresholds", type=int, default=1000,
+        help="Byte thresholds armed for the original list scan"
+    )
+    parser.add_argument(
+        "--threshold-bytes", type=int, default=1024 ** 3,
+        help="Simulated traffic for the threshold benchmark"
+    )
+    parser.add_argument(
+        "--token-bytes", type=int, default=64 * 1024 * 1024,
+        help="Text scanned by the token benchmark"
+    )
+    parser.add_argument(
+        "--kill-rounds", type=int, default=50,
+        help="Kill/resurrect cycles of a LocalProcessNode"
+    )
+    parser.add_argument(
+        "--json", metavar="PATH",
+        help="Write results as JSON ('-' for stdout, which replaces the tables)"
+    )
+    parser.add_argument(
+        "--baseline", metavar="PATH",
+        help="Compare against a JSON file from an earlier --json run"
+    )
+    parser.add_argument(
+        "--tolerance", type=float, default=0.10,
+        help="Allowed slowdown versus the baseline before failing (default: 0.10)"
+    )
+
+
+def _quick(args: argparse.Namespace) -> None:
+    args.size = min(args.size, 32 * 1024 * 1024)
+    args.legacy_size = min(args.legacy_size, 64 * 1024)
+    args.timers = min(args.timers, 1000)
+    args.legacy_timers = min(args.legacy_timers, 100)
+    args.timer_spread_ms = min(args.timer_spread_ms, 200)
+    args.thresholds = min(args.thresholds, 10_000)
+    args.legacy_thresholds = min(args.legacy_thresholds, 100)
+    args.threshold_bytes = min(args.threshold_bytes, 128 * 1024 * 1024)
+    args.token_bytes = min(args.token_bytes, 8 * 1024 * 1024)
+    args.kill_rounds = min(args.kill_rounds, 10)
+
+
+def run(args: argparse.Namespace) -> int:
+    """Run the selected suites; returns the process exit status."""
+    if args.quick:
+        _quick(args)
+    suites = args.suite or list(SUITES)
+    quiet = args.json == "-"  # stdout is reserved for the JSON document
+    results: List[Dict[str, Any]] = []
+
+    def suite(name: str, rows: List[Dict[str, Any]], printer) -> None:
+        for row in rows:
+            row["suite"] = name
+        results.extend(rows)
+        if not quiet:
+            printer(rows)
+
+    if "pump" in suites:
+        suite("pump", run_pump_suite(args.size, args.legacy_size), _print_table)
+    if "timers" in suites:
+        suite(
+            "timers",
+            run_timer_suite(args.timers, args.legacy_timers, args.timer_spread_ms),
+            _print_timer_table,
+        )
+    if "thresholds" in suites:
+        suite(
+            "thresholds",
+            run_threshold_suite(
+                args.thresholds, args.legacy_thresholds, args.threshold_bytes, DEFAULT_CHUNK_SIZE
+            ),
+            _print_threshold_table,
+        )
+    if "tokens" in suites:
+        suite("tokens", run_token_suite(args.token_bytes, DEFAULT_CHUNK_SIZE), _print_token_table)
+    if "kill" in suites:
+        suite("kill", [bench_kill_resurrect(args.kill_rounds)], _print_kill_table)
+
+    report = {
+        "created": time.time(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "args": {k: v for k, v in vars(args).items() if k not in ("json", "baseline")},
+        "results": results,
+    }
+    if args.json == "-":
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    elif args.json:
+        with open(args.json, "w") as out:
+            json.dump(report, out, indent=2)
+
+    if not args.baseline:
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    rows = compare(results, baseline.get("results", []), args.tolerance)
+    if not quiet:
+        _print_comparison(rows, args.tolerance)
+    return 1 if any(row["regression"] for row in rows) else 0
+
+
+def main(argv: Optional[List[str]] = None, prog: str = "frac.bench") -> None:
+    parser = argparse.ArgumentParser(prog=prog, description=__doc__)
+    add_arguments(parser)
+    sys.exit(run(parser.parse_args(argv)))
+
+
+if __name__ == "__main__":
+    main()
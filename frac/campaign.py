@@ -0,0 +1,433 @@
+"""Fault campaigns: many inject/resurrect scenarios from one spec file.
+
+A campaign spec is a JSON (or, with PyYAML installed, YAML) document::
+
+    {
+      "plugin": "http_plugin.py",
+      "max_concurrent_kills": 2,
+      "timeout_s": 60,
+      "faults": [
+        {"node": "2", "event": {"type": "delay", "ms": 3000}, "action": "kill"},
+        {"node": "2", "event": {"type": "delay", "ms": 8000}, "action": "resurrect"},
+        {"node": "3",
+         "event": {"type": "repeat", "times": 6,
+                   "event": {"type": "bytes", "bytes": 500000000, "relative": true}},
+         "action": "cycle"}
+      ]
+    }
+
+The ``cycle`` action alternates kill and resurrect, starting with kill, on
+each fire of a repeating event.
+
+Probabilistic events (``poisson``, ``rate``) draw their schedule from a
+seed.  Events without one get a seed derived from the campaign ``seed``
+(random if not given); the timeline records every seed and the realized
+schedule, so putting the logged campaign seed back in the spec replays the
+run exactly.
+
+Each plugin is loaded once and each node is created once, so a kill and a
+later resurrect of the same node act on the same Node object.  All events
+are armed up front on the shared timer scheduler.  Actions run on worker
+pools so at most ``max_concurrent_kills`` kills are in flight at a time.
+"""
+
+from __future__ import annotations
+
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from .api import (
+    AllOf,
+    AnyOf,
+    ByteEvent,
+    DelayEvent,
+    Event,
+    PoissonEvent,
+    ProgressEvent,
+    RateEvent,
+    Repeat,
+    RuntimeHooks,
+    Sequence,
+    TimeEvent,
+    Timeout,
+    TokenEvent,
+    _ScopedHooks,
+)
+
+ACTIONS = ("kill", "resurrect", "cycle")
+
+
+class CampaignError(ValueError):
+    """Raised for malformed campaign specs."""
+
+
+def event_from_spec(spec: Dict[str, Any], rng: Optional[random.Random] = None) -> Event:
+    """Build an Event from its spec dict (``{"type": "delay", "ms": 500}``).
+
+    Composite events nest: ``{"type": "all", "events": [...]}`` (also
+    ``any`` and ``sequence``), ``{"type": "repeat", "times": 3, "event": {...}}``
+    and ``{"type": "timeout", "ms": 1000, "event": {...}}``.  Probabilistic
+    events without a ``seed`` take the next one from ``rng``, if given.
+    """
+    kind = spec.get("type")
+
+    def seed() -> Optional[int]:
+        if "seed" in spec:
+            return int(spec["seed"])
+        return rng.randrange(2**32) if rng is not None else None
+
+    def optional_int(key: str) -> Optional[int]:
+        return int(spec[key]) if spec.get(key) is not None else None
+
+    try:
+        if kind == "delay":
+            return DelayEvent(int(spec["ms"]))
+        if kind == "bytes":
+            return ByteEvent(int(spec["bytes"]), bool(spec.get("relative", False)))
+        if kind == "token":
+            return TokenEvent(str(spec["token"]))
+        if kind == "progress":
+            return ProgressEvent(float(spec["fraction"]))
+        if kind == "time":
+            return TimeEvent(datetime.fromisoformat(spec["at"]))
+        if kind in _COMPOSITES:
+            children = [event_from_spec(child, rng) for child in spec["events"]]
+            if not children:
+                raise CampaignError(f"{kind} event needs at least one child event")
+            return _COMPOSITES[kind](*children)
+        if kind == "repeat":
+            times = int(spec["times"])
+            if times < 1:
+                raise CampaignError("repeat event needs times >= 1")
+            return Repeat(event_from_spec(spec["event"], rng), times)
+        if kind == "timeout":
+            return Timeout(event_from_spec(spec["event"], rng), int(spec["ms"]))
+        if kind == "poisson":
+            return PoissonEvent(
+                float(spec["rate_per_s"]), seed(),
+                optional_int("count"), optional_int("duration_ms"),
+            )
+        if kind == "rate":
+            return RateEvent(
+                float(spec["per_gb"]), seed(),
+                optional_int("count"), optional_int("max_bytes"),
+            )
+    except KeyError as e:
+        raise CampaignError(f"{kind} event needs '{e.args[0]}'") from None
+    except ValueError as e:
+        raise CampaignError(f"{kind} event: {e}") from None
+    raise CampaignError(f"unknown event type: {kind}")
+
+
+_COMPOSITES = {"all": AllOf, "any": AnyOf, "sequence": Sequence}
+
+
+def realized_schedule(event: Event) -> List[Dict[str, Any]]:
+    """Seeds and drawn offsets of every probabilistic event in an event tree."""
+    if isinstance(event, PoissonEvent):
+        return [{"type": "poisson", "seed": event.seed, "offsets_ms": event.schedule_ms}]
+    if isinstance(event, RateEvent):
+        return [{"type": "rate", "seed": event.seed, "offsets_bytes": event.schedule_bytes}]
+    children = getattr(event, "events", None) or [getattr(event, "event", None)]
+    return [entry for child in children if child is not None for entry in realized_schedule(child)]
+
+
+def fire_bounds(event: Event) -> tuple[int, int]:
+    """Fewest and most times an event tree fires once armed.
+
+    Composites fire at most once and only take a child's first fire;
+    Repeat takes one fire per repetition; Timeout may expire instead.
+    Drawn schedules are known, so probabilistic events count exactly.
+    """
+    if isinstance(event, (PoissonEvent, RateEvent)):
+        return event.times, event.times
+    if isinstance(event, Timeout):
+        return 0, min(1, fire_bounds(event.event)[1])
+    if isinstance(event, Repeat):
+        low, high = fire_bounds(event.event)
+        return (event.times if low else 0), (event.times if high else 0)
+    if isinstance(event, AnyOf):
+        bounds = [fire_bounds(child) for child in event.events]
+        return int(any(low for low, _ in bounds)), int(any(high for _, high in bounds))
+    if isinstance(event, (AllOf, Sequence)):
+        bounds = [fire_bounds(child) for child in event.events]
+        return int(all(low for low, _ in bounds)), int(all(high for _, high in bounds))
+    times = getattr(event, "times", 1)
+    return times, times
+
+
+def load_spec(path: str) -> Dict[str, Any]:
+    """Read a campaign spec from a .json or .yaml/.yml file."""
+    text = Path(path).read_text()
+    if path.endswith((".yaml", ".yml")):
+        try:
+            import yaml  # type: ignore[import-not-found]
+        except ImportError:
+            raise CampaignError("YAML campaign specs need PyYAML (pip install pyyaml)") from None
+        return yaml.safe_load(text)
+    return json.loads(text)
+
+
+@dataclass
+class Fault:
+    """One (node, event, action) entry of a campaign."""
+
+    node: str
+    event: Event
+    action: str
+    plugin: str
+    spec: Dict[str, Any] = field(default_factory=dict)
+
+    # Timeline, filled in while the campaign runs (time.time() seconds)
+    armed_at: Optional[float] = None
+    fired_at: Optional[float] = None
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    error: Optional[str] = None
+    fires: int = 0
+    completed: int = 0
+    fire_times: List[float] = field(default_factory=list)
+
+    @property
+    def expected_fires(self) -> Optional[int]:
+        """How often the event fires, or None when that depends on the run (e.g. a Timeout)."""
+        low, high = fire_bounds(self.event)
+        return high if low == high else None
+
+    @property
+    def max_fires(self) -> int:
+        """Most times the event can fire; the fault is finished after that many actions."""
+        return fire_bounds(self.event)[1]
+
+    def record(self) -> Dict[str, Any]:
+        """Timeline entry for this fault."""
+        return {
+            "node": self.node,
+            "action": self.action,
+            "event": self.spec.get("event"),
+            "armed_at": self.armed_at,
+            "fired_at": self.fired_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "fires": self.fires,
+            "expected_fires": self.expected_fires,
+            "fire_times": self.fire_times,
+            "schedule": realized_schedule(self.event) or None,
+            "error": self.error,
+        }
+
+
+class _ArmThrough(Event):
+    """Arms the wrapped event against a fault's hooks proxy.
+
+    Used with the plugin's Frac.inject so that whatever it does to the real
+    hooks (e.g. binding fire to kill) still happens.
+    """
+
+    def __init__(self, event: Event, proxy: _ScopedHooks) -> None:
+        self.event = event
+        self.proxy = proxy
+
+    def arm(self, hooks: RuntimeHooks) -> None:
+        self.event.arm(self.proxy)  # type: ignore[arg-type]
+
+
+class Campaign:
+    """Run many faults end to end with shared plugins, nodes and scheduler."""
+
+    def __init__(
+        self,
+        faults: List[Fault],
+        max_concurrent_kills: int = 1,
+        plugin_loader: Optional[Callable[[str], Any]] = None,
+        seed: Optional[int] = None,
+    ) -> None:
+        if max_concurrent_kills < 1:
+            raise CampaignError("max_concurrent_kills must be at least 1")
+        self.faults = faults
+        self.max_concurrent_kills = max_concurrent_kills
+        self.seed = seed  # campaign seed the event seeds were derived from
+        self._plugin_loader = plugin_loader
+        self._plugins: Dict[str, Any] = {}
+        self._nodes: Dict[tuple[str, str], Any] = {}
+        self._cache_lock = threading.RLock()  # one plugin and one Node per key
+        # Per armed fault, keyed by id(fault): its hooks proxy and, for
+        # faults added with add(), what to call once it has finished
+        self._proxies: Dict[int, _ScopedHooks] = {}
+        self._on_done: Dict[int, Callable[[], None]] = {}
+        self._lock = threading.Lock()
+        # Faults whose drawn schedule is empty have nothing to wait for
+        self._remaining = sum(1 for fault in faults if fault.max_fires > 0)
+        self._all_done = threading.Event()
+
+    @classmethod
+    def from_spec(cls, spec: Dict[str, Any], base_dir: str = ".", **kwargs: Any) -> "Campaign":
+        """Build a campaign from a parsed spec; plugin paths are relative to base_dir."""
+        default_plugin = spec.get("plugin")
+        seed = kwargs.pop("seed", None)
+        if seed is None:
+            seed = int(spec["seed"]) if spec.get("seed") is not None else random.SystemRandom().randrange(2**32)
+        rng = random.Random(seed)
+        faults = []
+        for i, entry in enumerate(spec.get("faults", [])):
+            plugin = entry.get("plugin", default_plugin)
+            if not plugin:
+                raise CampaignError(f"fault {i}: no plugin given")
+            if "node" not in entry or "event" not in entry:
+                raise CampaignError(f"fault {i}: 'node' and 'event' are required")
+            action = entry.get("action", "kill")
+            if action not in ACTIONS:
+                raise CampaignError(f"fault {i}: unknown action: {action}")
+            faults.append(Fault(
+                node=str(entry["node"]),
+                event=event_from_spec(entry["event"], rng),
+                action=action,
+                plugin=str(Path(base_dir, plugin)),
+                spec=entry,
+            ))
+        kwargs.setdefault("max_concurrent_kills", int(spec.get("max_concurrent_kills", 1)))
+        return cls(faults, seed=seed, **kwargs)
+
+    def _plugin(self, path: str) -> Any:
+        with self._cache_lock:
+            if path not in self._plugins:
+                loader = self._plugin_loader
+                if loader is None:
+                    from .cli import load_plugin as loader
+                self._plugins[path] = loader(path)
+            return self._plugins[path]
+
+    def _node(self, plugin_path: str, node_id: str) -> Any:
+        key = (plugin_path, node_id)
+        with self._cache_lock:
+            if key not in self._nodes:
+                self._nodes[key] = self._plugin(plugin_path).create_node(node_id)
+            return self._nodes[key]
+
+    def run(self, timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Arm every fault, wait until all have run (or timeout), return the timeline."""
+        kill_pool = ThreadPoolExecutor(
+            max_workers=self.max_concurrent_kills, thread_name_prefix="frac-kill"
+        )
+        resurrect_pool = ThreadPoolExecutor(thread_name_prefix="frac-resurrect")
+        try:
+            for fault in self.faults:
+                self._arm(fault, resurrect_pool if fault.action == "resurrect" else kill_pool)
+            if self._remaining:
+                self._all_done.wait(timeout)
+        finally:
+            for proxy in list(self._proxies.values()):
+                proxy.close()
+            kill_pool.shutdown(wait=True)
+            resurrect_pool.shutdown(wait=True)
+        return [fault.record() for fault in self.faults]
+
+    def add(
+        self,
+        fault: Fault,
+        pool: ThreadPoolExecutor,
+        on_done: Optional[Callable[[], None]] = None,
+    ) -> _ScopedHooks:
+        """Arm one more fault on a running campaign (used by ``frac serve``).
+
+        Returns the fault's hooks proxy; closing it cancels the fault.
+        on_done is called (on a pool thread) once the fault's last action
+        has run; discard() the fault when it is no longer needed.
+        """
+        with self._lock:
+            self.faults.append(fault)
+            if fault.max_fires > 0:
+                self._remaining += 1
+                self._all_done.clear()
+            if on_done is not None:
+                self._on_done[id(fault)] = on_done
+        try:
+            return self._arm(fault, pool)
+        except BaseException:
+            self.discard(fault)
+            raise
+
+    def discard(self, fault: Fault) -> None:
+        """Cancel fault if it is still armed and forget it."""
+        with self._lock:
+            proxy = self._proxies.pop(id(fault), None)
+            self._on_done.pop(id(fault), None)
+            for i, other in enumerate(self.faults):
+                if other is fault:
+                    del self.faults[i]
+                    break
+            if 0 < fault.max_fires and fault.completed < fault.max_fires:
+                self._remaining -= 1
+                if self._remaining == 0:
+                    self._all_done.set()
+        if proxy is not None:
+            proxy.close()
+
+    def _arm(self, fault: Fault, pool: ThreadPoolExecutor) -> _ScopedHooks:
+        plugin = self._plugin(fault.plugin)
+        node = self._node(fault.plugin, fault.node)
+        hooks = plugin.create_hooks(node)
+        lock = threading.Lock()
+
+        def on_fire() -> None:
+            # Polling fallbacks may fire more often than asked; act at most
+            # max_fires times
+            with lock:
+                if fault.fires >= fault.max_fires:
+                    return
+                fault.fires += 1
+                fault.fire_times.append(time.time())
+                if fault.fired_at is None:
+                    fault.fired_at = fault.fire_times[0]
+                action = hooks.fire
+                if fault.action == "cycle":
+                    action = node.kill if fault.fires % 2 else node.resurrect
+            pool.submit(self._run_action, fault, action)
+
+        proxy = _ScopedHooks(hooks, on_fire)
+        with self._lock:
+            self._proxies[id(fault)] = proxy
+        fault.armed_at = time.time()
+
+        if fault.action == "kill":
+            plugin.create_frac().inject(node, _ArmThrough(fault.event, proxy), hooks)
+        elif fault.action == "cycle":
+            fault.event.arm(proxy)  # type: ignore[arg-type]
+        else:
+            # Bind fire to resurrect only; chaining the hooks' own fire would
+            # kill the node again for hooks whose fire callback is node.kill
+            hooks.fire = node.resurrect
+            fault.event.arm(proxy)  # type: ignore[arg-type]
+        return proxy
+
+    def _run_action(self, fault: Fault, action: Callable[[], None]) -> None:
+        if fault.started_at is None:
+            fault.started_at = time.time()
+        try:
+            action()
+        except Exception as e:
+            fault.error = repr(e)
+        fault.finished_at = time.time()
+        with self._lock:
+            fault.completed += 1
+            if fault.completed < fault.max_fires:
+                return
+            self._remaining -= 1
+            if self._remaining == 0:
+                self._all_done.set()
+            on_done = self._on_done.pop(id(fault), None)
+        if on_done is not None:
+            on_done()
+
+
+def write_timeline(records: List[Dict[str, Any]], out) -> None:
+    """Write timeline records as JSON lines."""
+    for record in records:
+        out.write(json.dumps(record) + "\n")
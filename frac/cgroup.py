@@ -0,0 +1,216 @@
+"""cgroup v2 resource faults: slow a local node down instead of killing it.
+
+A ThrottledNode wraps a LocalProcessNode.  Its ``kill()`` moves the process
+(or, for a ProcessGroupNode, its whole group) into a dedicated cgroup and
+applies the configured limits; ``resurrect()`` lifts them again.  Because it
+is a Node, any Event can trigger the slowdown and the recovery.
+
+Needs a writable cgroup v2 hierarchy (usually root, or a delegated subtree
+passed as ``root``) with the relevant controllers available.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+from .api import Node
+from .local import LocalProcessNode, ProcessGroupNode
+
+
+def default_cgroup_root() -> str:
+    """Mount point of the cgroup v2 hierarchy (pure or hybrid layout)."""
+    for root in ("/sys/fs/cgroup", "/sys/fs/cgroup/unified"):
+        if os.path.exists(os.path.join(root, "cgroup.controllers")):
+            return root
+    return "/sys/fs/cgroup"
+
+
+class CgroupError(RuntimeError):
+    """Raised when the cgroup cannot be created or configured."""
+
+
+@dataclass
+class CpuThrottle:
+    """Cap CPU time at ``percent`` of one CPU (cpu.max)."""
+
+    percent: float
+    period_us: int = 100_000
+
+    controller = "cpu"
+
+    def apply(self) -> Dict[str, str]:
+        quota = max(1000, int(self.period_us * self.percent / 100))
+        return {"cpu.max": f"{quota} {self.period_us}"}
+
+    def lift(self) -> Dict[str, str]:
+        return {"cpu.max": f"max {self.period_us}"}
+
+
+@dataclass
+class MemoryPressure:
+    """Reclaim memory above ``high_bytes`` aggressively (memory.high)."""
+
+    high_bytes: int
+
+    controller = "memory"
+
+    def apply(self) -> Dict[str, str]:
+        return {"memory.high": str(self.high_bytes)}
+
+    def lift(self) -> Dict[str, str]:
+        return {"memory.high": "max"}
+
+
+@dataclass
+class IoSlowdown:
+    """Limit block IO on one device, given as ``MAJ:MIN`` (io.max)."""
+
+    device: str
+    rbps: Optional[int] = None
+    wbps: Optional[int] = None
+    riops: Optional[int] = None
+    wiops: Optional[int] = None
+
+    controller = "io"
+
+    @classmethod
+    def parse(cls, spec: str) -> "IoSlowdown":
+        """Parse an io.max style line, e.g. ``"8:0 wbps=1048576"``."""
+        device, *pairs = spec.split()
+        kwargs = {}
+        for pair in pairs:
+            key, _, value = pair.partition("=")
+            if key not in ("rbps", "wbps", "riops", "wiops"):
+                raise ValueError(f"unknown io.max key: {key}")
+            kwargs[key] = int(value)
+        return cls(device, **kwargs)
+
+    def _line(self, values: Dict[str, Union[int, str]]) -> Dict[str, str]:
+        limits = " ".join(f"{key}={value}" for key, value in values.items())
+        return {"io.max": f"{self.device} {limits}"}
+
+    def apply(self) -> Dict[str, str]:
+        keys = ("rbps", "wbps", "riops", "wiops")
+        return self._line({k: getattr(self, k) for k in keys if getattr(self, k) is not None})
+
+    def lift(self) -> Dict[str, str]:
+        return self._line({k: "max" for k in ("rbps", "wbps", "riops", "wiops")})
+
+
+Limit = Union[CpuThrottle, MemoryPressure, IoSlowdown]
+
+
+class ThrottledNode(Node):
+    """Resource fault on a local node: kill() throttles, resurrect() restores."""
+
+    def __init__(
+        self,
+        target: LocalProcessNode,
+        limits: List[Limit],
+        root: Optional[str] = None,
+        name: Optional[str] = None,
+    ) -> None:
+        if not limits:
+            raise ValueError("ThrottledNode needs at least one limit")
+        self.target = target
+        self.limits = limits
+        self.root = Path(root or default_cgroup_root())
+        self.name = name
+        self.path: Optional[Path] = None
+        self.throttled = False
+
+    def _write(self, path: Path, value: str) -> None:
+        try:
+            path.write_text(value)
+        except OSError as e:
+            raise CgroupError(f"cannot write {value!r} to {path}: {e}") from e
+
+    def _pids(self) -> List[int]:
+        proc = self.target.proc
+        if proc is None:
+            return []
+        if not isinstance(self.target, ProcessGroupNode):
+            return [proc.pid]
+        # Move every live member of the node's process group
+        members = []
+        for entry in os.listdir("/proc"):
+            if not entry.isdigit():
+                continue
+            try:
+                if os.getpgid(int(entry)) == proc.pid:
+                    members.append(int(entry))
+            except OSError:
+                continue
+        return members
+
+    def prepare(self) -> Path:
+        """Create the node's cgroup and check its files can be written.
+
+        Called by kill() if need be; call it up front so that a missing or
+        read-only root fails before the fault is due rather than when it fires.
+        """
+        proc = self.target.proc
+        if proc is None:
+            raise CgroupError("node has no running process")
+        if self.path is None:
+            path = self.root / (self.name or f"frac-{proc.pid}")
+            controllers = " ".join(sorted({f"+{limit.controller}" for limit in self.limits}))
+            self._write(self.root / "cgroup.subtree_control", controllers)
+            try:
+                path.mkdir(exist_ok=True)
+            except OSError as e:
+                raise CgroupError(f"cannot create cgroup {path}: {e}") from e
+            self.path = path
+        filenames = ["cgroup.procs"] + [f for limit in self.limits for f in limit.apply()]
+        for filename in filenames:
+            if not os.access(self.path / filename, os.W_OK):
+                raise CgroupError(f"{self.path / filename} is missing or not writable")
+        return self.path
+
+    def _ensure_cgroup(self) -> Path:
+        """Create the node's cgroup and move its processes into it."""
+        path = self.prepare()
+        for pid in self._pids():
+            self._write(path / "cgroup.procs", str(pid))
+        return path
+
+    def kill(self) -> None:
+        """Apply the limits (the 'fault')."""
+        path = self._ensure_cgroup()
+        for limit in self.limits:
+            for filename, value in limit.apply().items():
+                self._write(path / filename, value)
+        self.throttled = True
+        sys.stderr.write(
+            f"[frac] throttled PID {self.target.proc.pid} in {path}: "  # type: ignore[union-attr]
+            + ", ".join(f"{k}={v}" for limit in self.limits for k, v in limit.apply().items())
+            + "\n"
+        )
+        sys.stderr.flush()
+
+    def resurrect(self) -> None:
+        """Lift the limits again."""
+        if self.path is None:
+            return
+        for limit in self.limits:
+            for filename, value in limit.lift().items():
+                self._write(self.path / filename, value)
+        self.throttled = False
+        sys.stderr.write(f"[frac] lifted limits on {self.path}\n")
+        sys.stderr.flush()
+
+    def remove(self) -> None:
+        """Move remaining processes back to the root cgroup and delete ours."""
+        if self.path is None:
+            return
+        try:
+            for pid in (self.path / "cgroup.procs").read_text().split():
+                self._write(self.root / "cgroup.procs", pid)
+            self.path.rmdir()
+        except (OSError, CgroupError):
+            pass
+        self.path = None
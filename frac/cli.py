@@ -4,51 +4,46 @@
 from __future__ import annotations
 
 import argparse
-import shlex
 import sys
-from typing import Any, Dict
+import time
+from typing import TYPE_CHECKING, Any, Callable, Dict
 
-from .api import ByteEvent, DelayEvent, TimeEvent, TokenEvent
-from .local import LocalProcessNode, LocalFrac, LocalStreamingHooks
+# Subcommands import what they need when they run, so that short-lived
+# invocations such as ``frac inject`` only pay for the modules they use
+if TYPE_CHECKING:
+    from .api import Node
+    from .local import LinkShaper
 
 
 def load_plugin(plugin_path: str):
-    """Load a plugin module from the given path."""
-    import importlib.util
-    import sys
-    from pathlib import Path
-    
-    plugin_path = Path(plugin_path).resolve()
-    if not plugin_path.exists():
-        sys.exit(f"frac: plugin file not found: {plugin_path}")
-    
-    # Load the module
-    spec = importlib.util.spec_from_file_location("plugin", plugin_path)
-    if spec is None or spec.loader is None:
-        sys.exit(f"frac: failed to load plugin: {plugin_path}")
-    
-    plugin = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(plugin)
-    
-    # Verify required functions exist
-    required_funcs = ['create_node', 'create_hooks', 'create_frac']
-    for func_name in required_funcs:
-        if not hasattr(plugin, func_name):
-            sys.exit(f"frac: plugin missing required function: {func_name}")
-    
-    return plugin
+    """Load a plugin from a file path, registry name or entry point (see frac.plugins)."""
+    from . import plugins
+
+    try:
+        return plugins.load(plugin_path)
+    except plugins.PluginError as e:
+        sys.exit(f"frac: {e}")
 
 
 def cmd_byte_kill(args: argparse.Namespace) -> None:
     """Execute byte-kill command for local processes."""
     if not args.cmd:
         sys.exit("frac byte-kill: --cmd is required")
+    if args.progress is not None and not 0 < args.progress <= 1:
+        sys.exit("frac byte-kill: --progress must be in (0, 1]")
+
+    from .api import ByteEvent, ProgressEvent
+    from .local import LocalFrac, LocalProcessNode, LocalStreamingHooks, ProcessGroupNode
+
+    import os
+    import shlex
 
     # Parse command string into argv
     cmd_args = shlex.split(args.cmd)
     
     # Create node and start process
-    node = LocalProcessNode(cmd_args)
+    node_cls = ProcessGroupNode if args.process_group else LocalProcessNode
+    node = node_cls(cmd_args, kill_timeout=args.kill_timeout)
     node.start()
     
     if not node.proc:
@@ -57,25 +52,329 @@ def cmd_byte_kill(args: argparse.Namespace) -> None:
     # Create hooks and frac
     hooks = LocalStreamingHooks(node)
     frac = LocalFrac()
-    
-    # Inject fault - this will kill the process once at N bytes
-    frac.inject(node, ByteEvent(args.bytes), hooks)
+    recorder = hooks.start_trace(args.trace) if args.trace else None
+
+    target, degrade = _degrade_target(args, node, hooks)
+    if degrade is not None:
+        hooks.set_fire_callback(degrade[1], degrade[0])
+
+    sampler = None
+    if args.input_size is not None:
+        hooks.set_input_size(args.input_size)
+    if args.input_file:
+        # The command reads the file itself: take progress from its IO counters
+        from .procfs import ProcIOProgress
+
+        try:
+            hooks.set_input_size(os.path.getsize(args.input_file))
+            sampler = ProcIOProgress(hooks, node.proc.pid)
+        except OSError as e:
+            node.stop()
+            sys.exit(f"frac byte-kill: {e}")
+
+    # Inject fault - this will kill (or degrade) the process once at N bytes
+    # (or at the given fraction of its input)
+    event = ByteEvent(args.bytes) if args.bytes is not None else ProgressEvent(args.progress)
+    frac.inject(target, event, hooks)
+    if sampler is not None:
+        try:
+            sampler.start()
+        except OSError as e:
+            sys.stderr.write(f"[frac] cannot sample /proc/{node.proc.pid}/io: {e}\n")
     
     # Pump data from stdin through process to stdout
     try:
-        hooks.pump_data(sys.stdin.buffer, sys.stdout.buffer)
+        hooks.pump_data(sys.stdin.buffer, sys.stdout.buffer, splice=args.splice)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if sampler is not None:
+            sampler.stop()
+        node.stop()
+        if hasattr(target, "remove"):
+            target.remove()  # ThrottledNode: delete its cgroup
+        if recorder:
+            recorder.close()
+    if hooks.fire_errors:
+        sys.exit(1)  # the fault was not injected (reported as it happened)
+
+
+def cmd_pipeline(args: argparse.Namespace) -> None:
+    """Run several local commands as one pipeline, pumped from a single loop."""
+    import shlex
+
+    from .pipeline import KillRule, Pipeline
+
+    try:
+        pipeline = Pipeline(
+            [shlex.split(stage) for stage in args.stages],
+            process_group=args.process_group,
+            kill_timeout=args.kill_timeout,
+            chunk_size=args.chunk_size,
+        )
+        for spec in args.kill or []:
+            pipeline.add_kill(KillRule.parse(spec))
+    except ValueError as e:
+        sys.exit(f"frac pipeline: {e}")
+
+    try:
+        pipeline.run(sys.stdin.fileno(), sys.stdout.fileno())
+    except KeyboardInterrupt:
+        pass
+    for stage in pipeline.summary():
+        killed = f", killed at {stage['killed_at']} bytes" if stage["killed_at"] is not None else ""
+        print(
+            f"[frac] stage {stage['stage']} ({shlex.join(stage['cmd'])}): "
+            f"{stage['bytes_out']} bytes out{killed}, exit {stage['returncode']}",
+            file=sys.stderr,
+        )
+
+
+def cmd_replay(args: argparse.Namespace) -> None:
+    """Re-run a local command, firing the faults of a trace at the same byte offsets."""
+    from .trace import TraceError, read_trace
+
+    try:
+        start_time, entries = read_trace(args.trace)
+    except (OSError, TraceError) as e:
+        sys.exit(f"frac replay: {e}")
+
+    if args.show or not args.cmd:
+        for entry in entries:
+            token = f" token={entry.token!r}" if entry.token else ""
+            print(f"{entry.elapsed_ms:12.3f} ms  byte {entry.offset:>14}  {entry.action}{token}")
+        return
+
+    import shlex
+
+    from .local import LocalProcessNode, LocalStreamingHooks, ProcessGroupNode
+
+    node_cls = ProcessGroupNode if args.process_group else LocalProcessNode
+    node = node_cls(shlex.split(args.cmd), kill_timeout=args.kill_timeout)
+    node.start()
+    if not node.proc:
+        sys.exit("frac: failed to start process")
+
+    hooks = LocalStreamingHooks(node)
+    target, degrade = _degrade_target(args, node, hooks)
+    # Restores of a degraded target are in the trace as "resurrect" entries,
+    # so replay has no --restore-* options and arms none of its own
+    actions: Dict[str, Callable[[], None]] = {
+        "fire": node.kill,
+        "kill": node.kill,
+        "resurrect": target.resurrect,
+    }
+    if degrade is not None:
+        actions[degrade[0]] = degrade[1]
+    missing = sorted({entry.action for entry in entries} - set(actions))
+    if missing:
+        node.stop()
+        sys.exit(
+            f"frac replay: the trace has {', '.join(missing)} faults; pass the "
+            "--throttle-*/--slow-* options the original byte-kill used"
+        )
+    recorder = hooks.start_trace(args.record) if args.record else None
+
+    def fire_as(name: str) -> Callable[[], None]:
+        # Go through hooks.fire_as() so the replay can itself be traced
+        return lambda: hooks.fire_as(actions[name], name)
+
+    for entry in entries:
+        action = fire_as(entry.action)
+        if entry.offset == 0:
+            action()  # fired before any output
+        else:
+            hooks.add_byte_threshold(entry.offset, action)
+    print(f"[frac] replaying {len(entries)} faults from {args.trace}", file=sys.stderr)
+
+    try:
+        hooks.pump_data(sys.stdin.buffer, sys.stdout.buffer, splice=args.splice)
     except KeyboardInterrupt:
         pass
     finally:
-        if node.proc:
-            node.proc.terminate()
-            node.proc.wait()
+        node.stop()
+        if hasattr(target, "remove"):
+            target.remove()
+        if recorder:
+            recorder.close()
+    if hooks.fire_errors:
+        sys.exit(1)
+
+
+def _degrade_target(args: argparse.Namespace, node: Any, hooks: Any) -> tuple:
+    """(target, degrade) for the --throttle-*/--slow-* options.
+
+    Without them target is node and degrade is None.  Otherwise target is
+    a ThrottledNode or SlowLink and degrade is (action name, callback):
+    the callback degrades the target and arranges for --restore-ms to lift
+    it; --restore-bytes is armed here.  Restores run through
+    hooks.fire_as() so traces record them as "resurrect".
+    """
+    limits = _throttle_limits(args)
+    shaper = _link_shaper(args)
+    if limits:
+        # Resource fault: throttle at N bytes instead of killing
+        from .cgroup import CgroupError, ThrottledNode
+
+        throttled = ThrottledNode(node, limits, root=args.cgroup_root)
+        try:
+            throttled.prepare()  # fail now, not silently when the fault fires
+        except CgroupError as e:
+            node.stop()
+            sys.exit(f"frac: {e}")
+        target: Node = throttled
+        action = "throttle"
+    elif shaper:
+        # Slow-link fault: degrade the pump at N bytes instead of killing
+        from .local import SlowLink
+
+        target = SlowLink(hooks, shaper)
+        action = "slow_link"
+    else:
+        return node, None
+
+    def restore() -> None:
+        hooks.fire_as(target.resurrect, "resurrect")
+
+    restore_ms = getattr(args, "restore_ms", None)  # replay takes restores from the trace
+    restore_bytes = getattr(args, "restore_bytes", None)
+
+    def degrade() -> None:
+        target.kill()
+        if restore_ms is not None:
+            hooks.call_later(restore_ms / 1000.0, restore)
+
+    if restore_bytes is not None:
+        hooks.add_byte_threshold(restore_bytes, restore)
+    return target, (action, degrade)
+
+
+def _add_degrade_arguments(parser: argparse.ArgumentParser, restore: bool = True) -> None:
+    """The --throttle-*/--slow-* options of byte-kill and replay, and --restore-*."""
+    parser.add_argument(
+        "--throttle-cpu", type=float, metavar="PERCENT",
+        help="Instead of killing, cap CPU at PERCENT of one core (cgroup v2 cpu.max)"
+    )
+    parser.add_argument(
+        "--throttle-memory", type=int, metavar="BYTES",
+        help="Instead of killing, apply memory.high=BYTES (cgroup v2)"
+    )
+    parser.add_argument(
+        "--throttle-io", metavar="'MAJ:MIN rbps=N wbps=N ...'",
+        help="Instead of killing, apply an io.max limit (cgroup v2)"
+    )
+    parser.add_argument(
+        "--slow-rate", type=float, metavar="BYTES_PER_S",
+        help="Instead of killing, rate-limit the output link (token bucket)"
+    )
+    parser.add_argument(
+        "--slow-latency-ms", type=float,
+        help="Instead of killing, add this latency to every forwarded chunk"
+    )
+    parser.add_argument(
+        "--slow-stall-ms", type=float,
+        help="Instead of killing, stall the link for this long periodically"
+    )
+    parser.add_argument(
+        "--slow-stall-every-ms", type=float, default=1000.0,
+        help="Interval between link stalls (default: 1000)"
+    )
+    if restore:
+        parser.add_argument(
+            "--restore-ms", type=int,
+            help="Lift throttling/slow-link faults this many milliseconds after they start"
+        )
+        parser.add_argument(
+            "--restore-bytes", type=int,
+            help="Lift throttling/slow-link faults once this many bytes have been sent"
+        )
+    parser.add_argument(
+        "--cgroup-root",
+        help="cgroup v2 directory to create the node's cgroup under"
+    )
+
+
+def _link_shaper(args: argparse.Namespace) -> LinkShaper | None:
+    """Slow-link model requested on the byte-kill command line, if any."""
+    if not (args.slow_rate or args.slow_latency_ms or args.slow_stall_ms):
+        return None
+    from .local import LinkShaper
+
+    return LinkShaper(
+        rate=args.slow_rate,
+        latency_ms=args.slow_latency_ms or 0.0,
+        stall_every_ms=args.slow_stall_every_ms or 0.0,
+        stall_ms=args.slow_stall_ms or 0.0,
+    )
+
+
+def _throttle_limits(args: argparse.Namespace) -> list:
+    """cgroup limits requested on the byte-kill command line, if any."""
+    limits: list = []
+    if args.throttle_cpu is None and args.throttle_memory is None and args.throttle_io is None:
+        return limits
+
+    from .cgroup import CpuThrottle, IoSlowdown, MemoryPressure
+
+    if args.throttle_cpu is not None:
+        limits.append(CpuThrottle(args.throttle_cpu))
+    if args.throttle_memory is not None:
+        limits.append(MemoryPressure(args.throttle_memory))
+    if args.throttle_io is not None:
+        try:
+            limits.append(IoSlowdown.parse(args.throttle_io))
+        except ValueError as e:
+            sys.exit(f"frac: --throttle-io: {e}")
+    return limits
+
+
+def daemon_client(args: argparse.Namespace) -> Any:
+    """Client for a running frac daemon, or None to act in this process.
+
+    An explicit --socket (or $FRAC_SOCKET) must reach a daemon; otherwise
+    the default socket is used only if a daemon is listening on it.
+    """
+    if getattr(args, "no_daemon", False):
+        return None
+    import os
+
+    from .control import Client, DaemonError, daemon_running, socket_path
+
+    explicit = args.socket or os.environ.get("FRAC_SOCKET")
+    path = explicit or socket_path()
+    if not explicit and not daemon_running(path):
+        return None
+    try:
+        return Client(path)
+    except DaemonError as e:
+        sys.exit(f"frac: {e}")
+
+
+def remote_arm(client: Any, args: argparse.Namespace, action: str) -> None:
+    """Arm a fault in the daemon instead of in this short-lived process."""
+    import os
+
+    from .control import DaemonError
+
+    plugin = os.path.abspath(args.plugin) if os.path.isfile(args.plugin) else args.plugin
+    try:
+        with client:
+            fault_id = client.inject(plugin, args.node, event_spec_from_args(args), action)
+    except DaemonError as e:
+        sys.exit(f"frac {args.command}: {e}")
+    what = "fault injection" if action == "kill" else "resurrection"
+    print(f"[frac] {what} armed for node {args.node} (daemon fault {fault_id})")
 
 
 def cmd_inject(args: argparse.Namespace) -> None:
     """Execute inject command for remote nodes (requires plugin)."""
     if not args.plugin:
         sys.exit("frac inject: --plugin is required for remote node injection")
+
+    client = daemon_client(args)
+    if client is not None:
+        remote_arm(client, args, "kill")
+        return
     
     # Load plugin
     plugin = load_plugin(args.plugin)
@@ -96,6 +395,11 @@ def cmd_resurrect(args: argparse.Namespace) -> None:
     """Execute resurrect command for remote nodes."""
     if not args.plugin:
         sys.exit("frac resurrect: --plugin is required for remote node resurrection")
+
+    client = daemon_client(args)
+    if client is not None:
+        remote_arm(client, args, "resurrect")
+        return
     
     # Load plugin
     plugin = load_plugin(args.plugin)
@@ -121,8 +425,192 @@ def cmd_resurrect(args: argparse.Namespace) -> None:
     print(f"[frac] resurrection armed for node {args.node}")
 
 
+def cmd_campaign(args: argparse.Namespace) -> None:
+    """Run a fault campaign from a spec file."""
+    from pathlib import Path
+
+    from .campaign import Campaign, CampaignError, load_spec, write_timeline
+
+    try:
+        spec = load_spec(args.spec)
+        campaign = Campaign.from_spec(
+            spec,
+            base_dir=str(Path(args.spec).resolve().parent),
+            seed=args.seed,
+            **({"max_concurrent_kills": args.max_concurrent_kills}
+               if args.max_concurrent_kills else {}),
+        )
+    except (OSError, ValueError) as e:
+        sys.exit(f"frac campaign: {e}")
+
+    timeout = args.timeout if args.timeout is not None else spec.get("timeout_s")
+    print(
+        f"[frac] campaign armed: {len(campaign.faults)} faults (seed {campaign.seed})",
+        file=sys.stderr,
+    )
+    records = campaign.run(timeout=timeout)
+
+    timeline_path = args.timeline or spec.get("timeline")
+    if timeline_path:
+        with open(timeline_path, "w") as out:
+            write_timeline(records, out)
+    else:
+        write_timeline(records, sys.stdout)
+
+    done = sum(1 for r in records if r["finished_at"] is not None)
+    failed = sum(1 for r in records if r["error"])
+    print(
+        f"[frac] campaign finished: {done}/{len(records)} faults ran, {failed} failed",
+        file=sys.stderr,
+    )
+
+
+def cmd_bench(args: argparse.Namespace) -> None:
+    """Run frac's benchmark suites."""
+    from .bench import main as bench_main
+
+    try:
+        bench_main(args.bench_args, prog="frac bench")
+    except (OSError, ValueError) as e:
+        sys.exit(f"frac bench: {e}")
+
+
+def cmd_serve(args: argparse.Namespace) -> None:
+    """Run the frac daemon until it is told to shut down."""
+    import signal
+
+    from .control import DaemonError
+    from .daemon import Daemon
+
+    if args.max_concurrent_kills < 1:
+        sys.exit("frac serve: --max-concurrent-kills must be at least 1")
+    daemon = Daemon(args.socket, max_concurrent_kills=args.max_concurrent_kills, seed=args.seed)
+    # SIGTERM shuts down as cleanly as Ctrl-C
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    try:
+        daemon.serve_forever()
+    except DaemonError as e:
+        sys.exit(f"frac serve: {e}")
+    except OSError as e:
+        sys.exit(f"frac serve: cannot listen on {daemon.path}: {e}")
+    except KeyboardInterrupt:
+        pass
+    print("[frac] daemon stopped", file=sys.stderr)
+
+
+def cmd_ctl(args: argparse.Namespace) -> None:
+    """Query or control a running frac daemon."""
+    import json
+
+    from .control import Client, DaemonError
+
+    if args.action == "cancel" and args.id is None:
+        sys.exit("frac ctl cancel: fault ID is required")
+    try:
+        with Client(args.socket) as client:
+            if args.action == "ping":
+                reply = client.request("ping")
+                print(f"[frac] daemon pid {reply['pid']}, {reply['faults']} faults, seed {reply['seed']}")
+            elif args.action == "status":
+                for record in client.status(args.id):
+                    print(json.dumps(record))
+            elif args.action == "cancel":
+                client.cancel(args.id)
+                print(f"[frac] cancelled fault {args.id}", file=sys.stderr)
+            else:
+                client.shutdown()
+                print("[frac] daemon shutting down", file=sys.stderr)
+    except DaemonError as e:
+        sys.exit(f"frac ctl: {e}")
+
+
+def cmd_plugins(args: argparse.Namespace) -> None:
+    """List, register or unregister plugins."""
+    from . import plugins
+
+    try:
+        registry = plugins.read_registry()
+        if args.action == "add":
+            if not args.name or not args.target:
+                sys.exit("frac plugins add: NAME and TARGET are required")
+            target = args.target
+            if target.endswith(".py") or "/" in target:
+                import os
+
+                target = os.path.abspath(target)
+            registry[args.name] = target
+            plugins.write_registry(registry)
+            print(f"[frac] registered plugin {args.name} -> {target}", file=sys.stderr)
+        elif args.action == "remove":
+            if registry.pop(args.name or "", None) is None:
+                sys.exit(f"frac plugins: no registered plugin named {args.name}")
+            plugins.write_registry(registry)
+            print(f"[frac] removed plugin {args.name}", file=sys.stderr)
+        else:
+            print(f"# registry: {plugins.registry_path()}")
+            for name, target in sorted(registry.items()):
+                print(f"{name}\t{target}")
+            for name, target in sorted(plugins.entry_points().items()):
+                if name not in registry:
+                    print(f"{name}\t{target}\t(entry point)")
+    except (plugins.PluginError, OSError) as e:
+        sys.exit(f"frac plugins: {e}")
+
+
+def report_startup(phases: Dict[str, float]) -> None:
+    """Print where startup time went (``frac --profile-startup``)."""
+    import frac
+
+    from . import plugins
+
+    out = sys.stderr
+    total = sum(phases.values())
+    try:
+        # Process age, to put frac's share next to interpreter startup
+        import os
+
+        with open("/proc/self/stat") as f:
+            started = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        age = uptime - started / os.sysconf("SC_CLK_TCK")
+        out.write(f"[frac] process age      {age * 1000:8.1f} ms (10 ms resolution)\n")
+    except (OSError, ValueError, IndexError):
+        pass
+    for phase, seconds in phases.items():
+        out.write(f"[frac] {phase:<16} {seconds * 1000:8.1f} ms\n")
+    if plugins.last_load:
+        load = plugins.last_load
+        how = "reused" if load["reused"] else "compiled" if load["compiled"] else "cached code"
+        out.write(
+            f"[frac]   plugin {load['ref']}: {load['seconds'] * 1000:.1f} ms ({how})\n"
+        )
+    out.write(f"[frac] {'total':<16} {total * 1000:8.1f} ms since frac was imported\n")
+    out.write(f"[frac] modules loaded since: {len(sys.modules) - frac._START_MODULES}\n")
+    out.flush()
+
+
+def event_spec_from_args(args: argparse.Namespace) -> Dict[str, Any]:
+    """Event spec (campaign format) from CLI arguments, for the daemon."""
+    if args.event == "delay":
+        if args.ms is None:
+            sys.exit(f"frac {args.command}: --ms required for delay event")
+        return {"type": "delay", "ms": args.ms}
+    elif args.event == "bytes":
+        if args.bytes is None:
+            sys.exit(f"frac {args.command}: --bytes required for bytes event")
+        return {"type": "bytes", "bytes": args.bytes}
+    elif args.event == "token":
+        if args.token is None:
+            sys.exit(f"frac {args.command}: --token required for token event")
+        return {"type": "token", "token": args.token}
+    sys.exit(f"frac {args.command}: unknown event type: {args.event}")
+
+
 def create_event_from_args(args: argparse.Namespace) -> Any:
     """Create Event object from CLI arguments."""
+    from .api import ByteEvent, DelayEvent, TimeEvent, TokenEvent
+
     if args.event == "delay":
         if not hasattr(args, "ms") or args.ms is None:
             sys.exit("frac inject: --ms required for delay event")
@@ -141,28 +629,102 @@ def create_event_from_args(args: argparse.Namespace) -> Any:
 
 def main(argv: list[str] | None = None) -> None:
     """Main CLI entry point."""
+    start = time.perf_counter()
     parser = argparse.ArgumentParser(
         prog="frac",
         description="Unified fault injection for local commands and remote nodes"
     )
     
+    parser.add_argument(
+        "--profile-startup", action="store_true",
+        help="Report import, parse, plugin load and command time on stderr"
+    )
+    parser.add_argument(
+        "--metrics-port", type=int,
+        help="Serve Prometheus metrics on 127.0.0.1:PORT/metrics while running"
+    )
+    parser.add_argument(
+        "--metrics-socket", metavar="PATH",
+        help="Serve Prometheus metrics over HTTP on a Unix socket"
+    )
+
     subparsers = parser.add_subparsers(dest="command", required=True)
     
     # byte-kill subcommand (local)
     byte_kill = subparsers.add_parser(
         "byte-kill",
-        help="Kill local command after N bytes"
+        help="Kill local command after N bytes or a fraction of its input"
     )
-    byte_kill.add_argument(
-        "--bytes", type=int, required=True,
+    when = byte_kill.add_mutually_exclusive_group(required=True)
+    when.add_argument(
+        "--bytes", type=int,
         help="Kill after this many bytes are sent"
     )
+    when.add_argument(
+        "--progress", type=float, metavar="FRACTION",
+        help="Kill once this fraction (0-1] of the input is consumed; the input "
+             "size comes from a regular-file stdin, --input-size or --input-file"
+    )
+    byte_kill.add_argument(
+        "--input-size", type=int, metavar="BYTES",
+        help="Input size for --progress when stdin is a pipe"
+    )
+    byte_kill.add_argument(
+        "--input-file", metavar="PATH",
+        help="For --progress: the command reads PATH itself; progress is sampled "
+             "from /proc/PID/io against its size"
+    )
     byte_kill.add_argument(
         "--cmd", required=True,
         help="Command to run (quoted string)"
     )
+    byte_kill.add_argument(
+        "--kill-timeout", type=float, default=1.0,
+        help="Seconds to wait after SIGTERM before sending SIGKILL (default: 1.0)"
+    )
+    byte_kill.add_argument(
+        "--process-group", action="store_true",
+        help="Run the command in its own process group and kill the whole tree"
+    )
+    _add_degrade_arguments(byte_kill)
+    byte_kill.add_argument(
+        "--splice", action="store_true",
+        help="Move data with splice(2) in the kernel when stdin/stdout are pipes (Linux)"
+    )
+    byte_kill.add_argument(
+        "--trace", metavar="PATH",
+        help="Record every fired fault to a binary trace (see frac replay)"
+    )
     byte_kill.set_defaults(func=cmd_byte_kill)
     
+    # pipeline subcommand (local, many stages)
+    pipeline = subparsers.add_parser(
+        "pipeline",
+        help="Run local commands as a pipeline from one loop, killing stages by index"
+    )
+    pipeline.add_argument(
+        "stages", nargs="+", metavar="STAGE",
+        help="Command of each stage, in order (stage 0 reads frac's stdin)"
+    )
+    pipeline.add_argument(
+        "--kill", action="append", metavar="STAGE:BYTES[:TARGET]",
+        help="Kill stage TARGET (default STAGE) once stage STAGE has written "
+             "BYTES bytes; stages count from 0; repeatable"
+    )
+    pipeline.add_argument(
+        "--chunk-size", type=int, default=64 * 1024,
+        help="Largest read per hop in bytes (default: 65536)"
+    )
+    pipeline.add_argument(
+        "--kill-timeout", type=float, default=1.0,
+        help="Seconds to wait after SIGTERM before sending SIGKILL (default: 1.0)"
+    )
+    pipeline.add_argument(
+        "--process-group", action="store_true",
+        help="Run each stage in its own process group and kill the whole group"
+    )
+    pipeline.set_defaults(func=cmd_pipeline)
+
     # inject subcommand (remote)
     inject = subparsers.add_parser(
         "inject", 
@@ -181,7 +743,16 @@ def main(argv: list[str] | None = None) -> None:
     inject.add_argument("--token", help="Token string for token event")
     inject.add_argument(
         "--plugin",
-        help="Path to plugin file defining Node/Hooks classes"
+        help="Plugin file, registry name or frac.plugins entry point"
+    )
+    inject.add_argument(
+        "--socket", metavar="PATH",
+        help="Arm the fault in the frac daemon on PATH (default: the daemon on "
+             "the default socket, if one is running)"
+    )
+    inject.add_argument(
+        "--no-daemon", action="store_true",
+        help="Arm in this process even if a daemon is running"
     )
     inject.set_defaults(func=cmd_inject)
     
@@ -203,13 +774,171 @@ def main(argv: list[str] | None = None) -> None:
     resurrect.add_argument("--token", help="Token string for token event")
     resurrect.add_argument(
         "--plugin",
-        help="Path to plugin file"
+        help="Plugin file, registry name or frac.plugins entry point"
+    )
+    resurrect.add_argument(
+        "--socket", metavar="PATH",
+        help="Arm the fault in the frac daemon on PATH (default: the daemon on "
+             "the default socket, if one is running)"
+    )
+    resurrect.add_argument(
+        "--no-daemon", action="store_true",
+        help="Arm in this process even if a daemon is running"
     )
     resurrect.set_defaults(func=cmd_resurrect)
     
+    # replay subcommand (local, from a byte-kill --trace file)
+    replay = subparsers.add_parser(
+        "replay",
+        help="Re-run a local command with the faults of a trace at the same byte offsets"
+    )
+    replay.add_argument(
+        "trace",
+        help="Trace file written by byte-kill --trace"
+    )
+    replay.add_argument(
+        "--cmd",
+        help="Command to run (quoted string); without it the trace is printed"
+    )
+    replay.add_argument(
+        "--show", action="store_true",
+        help="Print the trace entries and exit"
+    )
+    replay.add_argument(
+        "--kill-timeout", type=float, default=1.0,
+        help="Seconds to wait after SIGTERM before sending SIGKILL (default: 1.0)"
+    )
+    replay.add_argument(
+        "--process-group", action="store_true",
+        help="Run the command in its own process group and kill the whole tree"
+    )
+    replay.add_argument(
+        "--splice", action="store_true",
+        help="Move data with splice(2) in the kernel when stdin/stdout are pipes (Linux)"
+    )
+    replay.add_argument(
+        "--record", metavar="PATH",
+        help="Also trace the replay itself, e.g. to compare against the original"
+    )
+    _add_degrade_arguments(replay, restore=False)  # restores come from the trace
+    replay.set_defaults(func=cmd_replay)
+
+    # bench subcommand (frac's own overhead); frac.bench parses its own
+    # options so that other subcommands do not import it
+    bench = subparsers.add_parser(
+        "bench", add_help=False,
+        help="Benchmark frac's pump, timers, thresholds, token matching and kill latency"
+    )
+    bench.add_argument("bench_args", nargs=argparse.REMAINDER, help=argparse.SUPPRESS)
+    bench.set_defaults(func=cmd_bench)
+
+    # serve subcommand (daemon)
+    serve = subparsers.add_parser(
+        "serve",
+        help="Run a daemon that keeps nodes, hooks and timers between commands"
+    )
+    serve.add_argument(
+        "--socket", metavar="PATH",
+        help="Control socket (default $FRAC_SOCKET, $XDG_RUNTIME_DIR/frac.sock "
+             "or /tmp/frac-UID.sock)"
+    )
+    serve.add_argument(
+        "--max-concurrent-kills", type=int, default=1,
+        help="Kills allowed in flight at once (default 1)"
+    )
+    serve.add_argument(
+        "--seed", type=int,
+        help="Seed for probabilistic events without their own seed"
+    )
+    serve.set_defaults(func=cmd_serve)
+
+    # ctl subcommand (daemon client)
+    ctl = subparsers.add_parser(
+        "ctl",
+        help="Query or control a running frac daemon"
+    )
+    ctl.add_argument("action", choices=("ping", "status", "cancel", "shutdown"))
+    ctl.add_argument("id", type=int, nargs="?", help="Fault ID (status, cancel)")
+    ctl.add_argument("--socket", metavar="PATH", help="Daemon control socket")
+    ctl.set_defaults(func=cmd_ctl)
+
+    # plugins subcommand
+    plugins_cmd = subparsers.add_parser(
+        "plugins",
+        help="List plugins, or add/remove names in the plugin registry"
+    )
+    plugins_cmd.add_argument(
+        "action", nargs="?", choices=("list", "add", "remove"), default="list"
+    )
+    plugins_cmd.add_argument("name", nargs="?", help="Registry name")
+    plugins_cmd.add_argument(
+        "target", nargs="?",
+        help="Plugin file or importable module[:attr] (for add)"
+    )
+    plugins_cmd.set_defaults(func=cmd_plugins)
+
+    # campaign subcommand (batch of faults)
+    campaign = subparsers.add_parser(
+        "campaign",
+        help="Run many inject/resurrect faults from one spec file"
+    )
+    campaign.add_argument(
+        "spec",
+        help="Campaign spec (.json, or .yaml/.yml with PyYAML)"
+    )
+    campaign.add_argument(
+        "--timeline",
+        help="Write the per-fault timeline (JSON lines) here instead of stdout"
+    )
+    campaign.add_argument(
+        "--max-concurrent-kills", type=int,
+        help="Override the spec's limit on simultaneous kills"
+    )
+    campaign.add_argument(
+        "--timeout", type=float,
+        help="Give up on faults that have not run after this many seconds"
+    )
+    campaign.add_argument(
+        "--seed", type=int,
+        help="Seed for probabilistic events (overrides the spec; logged either way)"
+    )
+    campaign.set_defaults(func=cmd_campaign)
+
     # Parse and execute
-    args = parser.parse_args(argv)
-    args.func(args)
+    argv = sys.argv[1:] if argv is None else list(argv)
+    args, extra = parser.parse_known_args(argv)
+    if args.func is cmd_bench:
+        # Everything after "bench" belongs to frac.bench's own parser
+        args.bench_args = argv[argv.index("bench") + 1:]
+    elif extra:
+        parser.error(f"unrecognized arguments: {' '.join(extra)}")
+    if args.metrics_port is not None or args.metrics_socket:
+        from . import metrics
+
+        try:
+            if args.metrics_port is not None:
+                metrics.serve(port=args.metrics_port)
+            if args.metrics_socket:
+                metrics.serve(unix_path=args.metrics_socket)
+        except OSError as e:
+            sys.exit(f"frac: cannot serve metrics: {e}")
+    if not args.profile_startup:
+        args.func(args)
+        return
+
+    from . import _START, plugins
+
+    ran = time.perf_counter()
+    try:
+        args.func(args)
+    finally:
+        done = time.perf_counter()
+        phases = {"imports": start - _START, "argparse": ran - start}
+        load = plugins.last_load.get("seconds", 0.0)
+        if plugins.last_load:
+            phases["plugin load"] = load
+        phases["command"] = done - ran - load
+        report_startup(phases)
 
 
 if __name__ == "__main__":
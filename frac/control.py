@@ -0,0 +1,145 @@
+"""Control socket protocol and client for the frac daemon (see frac.daemon).
+
+Kept free of the heavier frac modules so that a CLI acting as a client
+starts quickly.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import socket
+import struct
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+_LENGTH = struct.Struct(">I")
+MAX_FRAME = 16 << 20
+
+
+class DaemonError(RuntimeError):
+    """Raised by the client for failed requests or an unreachable daemon."""
+
+
+def socket_path() -> str:
+    """Default control socket path."""
+    if os.environ.get("FRAC_SOCKET"):
+        return os.environ["FRAC_SOCKET"]
+    runtime = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime:
+        return os.path.join(runtime, "frac.sock")
+    return f"/tmp/frac-{os.getuid()}.sock"
+
+
+def send_frame(sock: socket.socket, message: Dict[str, Any]) -> None:
+    body = json.dumps(message, separators=(",", ":")).encode()
+    sock.sendall(_LENGTH.pack(len(body)) + body)
+
+
+def _recv_exact(sock: socket.socket, n: int) -> Optional[bytes]:
+    buf = bytearray()
+    while len(buf) < n:
+        chunk = sock.recv(n - len(buf))
+        if not chunk:
+            if buf:
+                raise ConnectionError("connection closed mid-frame")
+            return None
+        buf += chunk
+    return bytes(buf)
+
+
+def recv_frame(sock: socket.socket) -> Optional[Dict[str, Any]]:
+    """Read one frame; None on a clean end of stream."""
+    header = _recv_exact(sock, _LENGTH.size)
+    if header is None:
+        return None
+    (length,) = _LENGTH.unpack(header)
+    if length > MAX_FRAME:
+        raise ConnectionError(f"frame of {length} bytes exceeds {MAX_FRAME}")
+    body = _recv_exact(sock, length) if length else b""
+    if body is None:
+        raise ConnectionError("connection closed mid-frame")
+    return json.loads(body)
+
+
+class Client:
+    """Connection to a running daemon; requests may be pipelined."""
+
+    def __init__(self, path: Optional[str] = None, timeout: Optional[float] = 10.0) -> None:
+        self.path = path or socket_path()
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.settimeout(timeout)
+        try:
+            self._sock.connect(self.path)
+        except OSError as e:
+            self._sock.close()
+            raise DaemonError(f"no frac daemon on {self.path}: {e.strerror or e}") from None
+
+    def __enter__(self) -> "Client":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._sock.close()
+
+    def request(self, op: str, **fields: Any) -> Dict[str, Any]:
+        """Send one request and return its reply; raises DaemonError if it failed."""
+        return self.request_many([{"op": op, **fields}])[0]
+
+    def request_many(self, requests: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Send all requests before reading any reply (one round trip overall)."""
+        requests = list(requests)
+        try:
+            self._sock.sendall(b"".join(
+                _LENGTH.pack(len(body)) + body
+                for body in (json.dumps(r, separators=(",", ":")).encode() for r in requests)
+            ))
+            replies = [recv_frame(self._sock) for _ in requests]
+        except OSError as e:
+            raise DaemonError(f"frac daemon on {self.path}: {e}") from None
+        if any(reply is None for reply in replies):
+            raise DaemonError(f"frac daemon on {self.path} closed the connection")
+        for reply in replies:
+            if not reply.get("ok"):  # type: ignore[union-attr]
+                raise DaemonError(reply.get("error", "request failed"))  # type: ignore[union-attr]
+        return replies  # type: ignore[return-value]
+
+    def inject(
+        self, plugin: str, node: str, event: Dict[str, Any], action: str = "kill"
+    ) -> int:
+        """Arm a fault; returns its id."""
+        return self.request("inject", plugin=plugin, node=node, event=event, action=action)["id"]
+
+    def status(self, fault_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        return self.request("status", id=fault_id)["faults"]
+
+    def cancel(self, fault_id: int) -> None:
+        self.request("cancel", id=fault_id)
+
+    def shutdown(self) -> None:
+        self.request("shutdown")
+
+
+def daemon_running(path: Optional[str] = None) -> bool:
+    """True if a daemon accepts connections on the socket."""
+    path = path or socket_path()
+    if not os.path.exists(path):
+        return False
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(path)
+        except OSError:
+            return False
+    return True
+
+
+def wait_for_daemon(path: Optional[str] = None, timeout: float = 5.0) -> bool:
+    """Poll until a daemon listens on the socket (for scripts that just started one)."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if daemon_running(path):
+            return True
+        time.sleep(0.01)
+    return daemon_running(path)
@@ -0,0 +1,236 @@
+"""Long-running fault daemon (``frac serve``); the client is in frac.control.
+
+The daemon owns plugins, nodes, hooks and timers for as long as it runs, so
+a delay armed by one ``frac inject`` still fires after that command has
+exited, and a later ``frac resurrect`` of the same node acts on the same
+Node object.  Commands arrive over a Unix domain socket, by default
+``$FRAC_SOCKET``, ``$XDG_RUNTIME_DIR/frac.sock`` or ``/tmp/frac-<uid>.sock``.
+
+Every message in either direction is one frame (frac.control): a 4-byte
+big-endian length followed by that many bytes of UTF-8 JSON.  Requests
+carry an ``op``::
+
+    {"op": "inject", "plugin": "/srv/http_plugin.py", "node": "3",
+     "event": {"type": "delay", "ms": 500}, "action": "kill"}
+    {"op": "status"}            {"op": "status", "id": 7}
+    {"op": "cancel", "id": 7}   {"op": "ping"}   {"op": "shutdown"}
+
+and every reply is ``{"ok": true, ...}`` or ``{"ok": false, "error": "..."}``.
+Events use the campaign spec format (see frac.campaign), actions are
+``kill``, ``resurrect`` and ``cycle``.  A connection may carry any number of
+requests and a client may pipeline them: replies come back in order.
+
+Faults are retired once they have finished, failed or been cancelled; the
+records of the last ``history`` of them stay available to ``status``.
+"""
+
+from __future__ import annotations
+
+import os
+import random
+import socket
+import socketserver
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+from . import plugins
+from .campaign import ACTIONS, Campaign, CampaignError, Fault, event_from_spec
+from .control import DaemonError, recv_frame, send_frame, socket_path
+
+
+class Daemon:
+    """Faults armed over the control socket, kept alive between commands."""
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_concurrent_kills: int = 1,
+        seed: Optional[int] = None,
+        history: int = 1000,
+    ) -> None:
+        self.path = path or socket_path()
+        self.history = history
+        self.seed = seed if seed is not None else random.SystemRandom().randrange(2**32)
+        self._rng = random.Random(self.seed)
+        self._campaign = Campaign(
+            [], max_concurrent_kills=max_concurrent_kills,
+            plugin_loader=plugins.load, seed=self.seed,
+        )
+        self._kill_pool = ThreadPoolExecutor(
+            max_workers=max_concurrent_kills, thread_name_prefix="frac-kill"
+        )
+        self._resurrect_pool = ThreadPoolExecutor(thread_name_prefix="frac-resurrect")
+        self._faults: Dict[int, Fault] = {}  # armed, not finished yet
+        self._finished: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()  # id -> record
+        self._next_id = 1
+        self._lock = threading.Lock()
+        self._server: Optional[socketserver.BaseServer] = None
+
+    # Request handling
+
+    def handle(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Run one request and return its reply."""
+        op = request.get("op")
+        handler = getattr(self, f"_op_{op}", None) if isinstance(op, str) else None
+        if handler is None:
+            return {"ok": False, "error": f"unknown op: {op}"}
+        try:
+            return {"ok": True, **handler(request)}
+        except (CampaignError, plugins.PluginError, KeyError, TypeError, ValueError) as e:
+            message = f"missing '{e.args[0]}'" if isinstance(e, KeyError) else str(e)
+            return {"ok": False, "error": message}
+        except Exception as e:  # plugin code: report it, keep serving
+            return {"ok": False, "error": repr(e)}
+
+    def _op_ping(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        return {"pid": os.getpid(), "seed": self.seed, "faults": len(self._faults)}
+
+    def _op_inject(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        action = request.get("action", "kill")
+        if action not in ACTIONS:
+            raise ValueError(f"unknown action: {action}")
+        with self._lock:
+            event = event_from_spec(request["event"], self._rng)
+            fault_id = self._next_id
+            self._next_id += 1
+        fault = Fault(
+            node=str(request["node"]),
+            event=event,
+            action=action,
+            plugin=str(request["plugin"]),
+            spec={"event": request["event"]},
+        )
+        pool = self._resurrect_pool if action == "resurrect" else self._kill_pool
+        with self._lock:
+            self._faults[fault_id] = fault  # before arming: it may finish at once
+        try:
+            self._campaign.add(fault, pool, on_done=lambda: self._retire(fault_id))
+        except BaseException:
+            with self._lock:
+                del self._faults[fault_id]
+            raise
+        if fault.max_fires == 0:
+            self._retire(fault_id)  # empty drawn schedule: nothing will fire
+        return {"id": fault_id}
+
+    def _op_status(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock:
+            if request.get("id") is not None:
+                ids = [int(request["id"])]
+                if ids[0] not in self._faults and ids[0] not in self._finished:
+                    raise ValueError(f"no fault {ids[0]}")
+            else:
+                ids = sorted([*self._faults, *self._finished])
+            return {
+                "faults": [
+                    self._finished[fault_id] if fault_id in self._finished
+                    else self._record(fault_id, self._faults[fault_id])
+                    for fault_id in ids
+                ]
+            }
+
+    def _op_cancel(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        fault_id = int(request["id"])
+        with self._lock:
+            if fault_id not in self._faults:
+                if fault_id in self._finished:
+                    raise ValueError(f"fault {fault_id} is already {self._finished[fault_id]['state']}")
+                raise ValueError(f"no fault {fault_id}")
+        self._retire(fault_id, "cancelled")
+        return {"id": fault_id}
+
+    def _op_shutdown(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        if self._server is not None:
+            # shutdown() waits for serve_forever, which this handler runs under
+            threading.Thread(target=self._server.shutdown, daemon=True).start()
+        return {}
+
+    def _record(self, fault_id: int, fault: Fault, state: Optional[str] = None) -> Dict[str, Any]:
+        if fault.error:
+            state = "failed"
+        elif state is None:
+            if fault.completed >= fault.max_fires:
+                state = "done"
+            elif fault.fires:
+                state = "fired"
+            else:
+                state = "armed"
+        return {"id": fault_id, "state": state, "plugin": fault.plugin, **fault.record()}
+
+    def _retire(self, fault_id: int, state: Optional[str] = None) -> None:
+        """Drop a finished (or cancel an armed) fault, keeping its record for status."""
+        with self._lock:
+            fault = self._faults.pop(fault_id, None)
+            if fault is None:
+                return
+            self._finished[fault_id] = self._record(fault_id, fault, state)
+            while len(self._finished) > self.history:
+                self._finished.popitem(last=False)
+        self._campaign.discard(fault)  # cancels it if still armed
+
+    # Serving
+
+    def serve_forever(self) -> None:
+        """Bind the control socket and serve until a shutdown request."""
+        if os.path.exists(self.path):
+            try:
+                with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+                    probe.connect(self.path)
+            except OSError:
+                os.unlink(self.path)  # left behind by a daemon that died
+            else:
+                raise DaemonError(f"a frac daemon is already listening on {self.path}")
+
+        daemon = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self) -> None:
+                while True:
+                    try:
+                        request = recv_frame(self.request)
+                    except (OSError, ValueError):
+                        return
+                    if request is None:
+                        return
+                    if not isinstance(request, dict):
+                        reply = {"ok": False, "error": "request must be a JSON object"}
+                    else:
+                        reply = daemon.handle(request)
+                    try:
+                        send_frame(self.request, reply)
+                    except OSError:
+                        return
+
+        class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+            daemon_threads = True
+
+        old_umask = os.umask(0o177)  # socket is for this user only
+        try:
+            self._server = Server(self.path, Handler)
+        finally:
+            os.umask(old_umask)
+        sys.stderr.write(f"[frac] daemon listening on {self.path} (pid {os.getpid()}, seed {self.seed})\n")
+        sys.stderr.flush()
+        try:
+            self._server.serve_forever(poll_interval=0.5)
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        """Cancel pending faults, finish running actions, remove the socket."""
+        with self._lock:
+            fault_ids = list(self._faults)
+        for fault_id in fault_ids:
+            self._retire(fault_id, "cancelled")
+        self._kill_pool.shutdown(wait=True)
+        self._resurrect_pool.shutdown(wait=True)
+        if self._server is not None:
+            self._server.server_close()
+            self._server = None
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
@@ -8,35 +8,11 @@ The plugin reads PID files to find the actual process ID.
 from __future__ import annotations
 import os
 import signal
-import subprocess
 import time
-from pathlib import Path
 from typing import Any
 
 from frac.api import Node, RuntimeHooks, Frac
-
-
-class TimerHooks(RuntimeHooks):
-    """Simple RuntimeHooks implementation that only supports delay events."""
-    
-    def call_at(self, when, fn):
-        pass  # Not needed for delay events
-        
-    def call_later(self, secs: float, fn):
-        import threading
-        threading.Timer(secs, fn).start()
-        
-    def elapsed_ms(self) -> int:
-        return 0
-        
-    def bytes_sent(self) -> int:
-        return 0
-        
-    def seen_token(self, tok: str) -> bool:
-        return False
-        
-    def fire(self):
-        pass  # DelayEvent will call the node's kill/resurrect method directly
+from frac.procfs import ProcHooks
 
 
 class WorkerNode(Node):
@@ -46,15 +22,18 @@ class WorkerNode(Node):
         self.worker_id = worker_id
         self.port = 8000 + int(worker_id)  # worker-1 -> 8001, worker-2 -> 8002, etc.
     
-    def _pid_file(self) -> Path:
-        return Path(f"worker-{self.worker_id}.pid")
+    # os.path rather than pathlib: every `frac inject` loads this plugin,
+    # and pathlib is among the slowest imports on that path
+    def _pid_file(self) -> str:
+        return f"worker-{self.worker_id}.pid"
     
     def _get_pid(self) -> int:
         """Read PID from the worker's PID file."""
         pid_file = self._pid_file()
-        if not pid_file.exists():
+        if not os.path.exists(pid_file):
             raise FileNotFoundError(f"PID file {pid_file} not found - is worker-{self.worker_id} running?")
-        return int(pid_file.read_text().strip())
+        with open(pid_file) as f:
+            return int(f.read().strip())
     
     def kill(self) -> None:
         """Kill the worker process."""
@@ -73,11 +52,13 @@ class WorkerNode(Node):
     
     def resurrect(self) -> None:
         """Restart the worker process."""
+        import subprocess  # only needed here, so not paid by every inject
+
         try:
             # Start the worker process
             subprocess.Popen([
                 "node", "worker.js", self.worker_id, str(self.port)
-            ], cwd=Path(__file__).parent)
+            ], cwd=os.path.dirname(os.path.abspath(__file__)))
             
             print(f"[frac] node worker-{self.worker_id} resurrected on port {self.port}")
             
@@ -90,7 +71,7 @@ class SimpleFrac(Frac):
     
     def inject(self, target: Node, event, hooks: RuntimeHooks) -> None:
         """Arm the event to trigger on the target."""
-        # For DelayEvent, we need to bind the target's kill method to the event
+        # Events call hooks.fire(); bind the target's kill method to it
         original_fire = hooks.fire
         
         def fire_with_kill():
@@ -108,8 +89,13 @@ def create_node(node_str: str, **kwargs: Any) -> Node:
 
 
 def create_hooks(node: Node, **kwargs: Any) -> RuntimeHooks:
-    """Create RuntimeHooks for the node."""
-    return TimerHooks()
+    """Create RuntimeHooks for the node.
+
+    bytes_sent() is what the worker has written, its sockets included, per
+    /proc/<pid>/io; the PID file is re-read on every sample, so counting
+    follows the worker across restarts.
+    """
+    return ProcHooks.for_pid(node._get_pid)
 
 
 def create_frac(**kwargs: Any) -> Frac:
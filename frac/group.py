@@ -0,0 +1,100 @@
+"""Multi-target nodes: kill/resurrect many nodes in parallel."""
+
+from __future__ import annotations
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Iterable, List, Optional
+
+from .api import Node
+
+# Default number of nodes acted on at once
+DEFAULT_PARALLELISM = 8
+
+
+@dataclass
+class NodeResult:
+    """Outcome of one kill/resurrect on one member of a NodeGroup."""
+
+    node: Node
+    action: str
+    seconds: float
+    error: Optional[BaseException] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class NodeGroupError(RuntimeError):
+    """Raised by NodeGroup.kill/resurrect when some members failed."""
+
+    def __init__(self, action: str, results: List[NodeResult]) -> None:
+        self.action = action
+        self.results = results
+        self.failures = [r for r in results if not r.ok]
+        super().__init__(
+            f"{action} failed on {len(self.failures)}/{len(results)} nodes: "
+            + ", ".join(f"{r.node}: {r.error!r}" for r in self.failures)
+        )
+
+
+class NodeGroup(Node):
+    """A Node made of several nodes, acted on concurrently.
+
+    ``kill()``/``resurrect()`` run the action on every member using at most
+    ``parallelism`` threads and raise NodeGroupError if any member failed.
+    ``kill_all()``/``resurrect_all()`` return per-node results with timings
+    instead of raising.  Because a NodeGroup is a Node, it can be passed to
+    Frac.inject / Frac.schedule_resurrection unchanged.
+    """
+
+    def __init__(self, nodes: Iterable[Node], parallelism: int = DEFAULT_PARALLELISM) -> None:
+        if parallelism < 1:
+            raise ValueError("parallelism must be at least 1")
+        self.nodes = list(nodes)
+        self.parallelism = parallelism
+        self.last_results: List[NodeResult] = []
+        self.last_seconds = 0.0  # wall time of the last group action
+
+    def kill_all(self) -> List[NodeResult]:
+        """Kill every member; never raises."""
+        return self._run("kill")
+
+    def resurrect_all(self) -> List[NodeResult]:
+        """Resurrect every member; never raises."""
+        return self._run("resurrect")
+
+    def kill(self) -> None:
+        """Kill every member, raising NodeGroupError on any failure."""
+        self._check("kill", self.kill_all())
+
+    def resurrect(self) -> None:
+        """Resurrect every member, raising NodeGroupError on any failure."""
+        self._check("resurrect", self.resurrect_all())
+
+    def _run(self, action: str) -> List[NodeResult]:
+        def one(node: Node) -> NodeResult:
+            start = time.perf_counter()
+            try:
+                getattr(node, action)()
+            except Exception as e:
+                return NodeResult(node, action, time.perf_counter() - start, e)
+            return NodeResult(node, action, time.perf_counter() - start)
+
+        start = time.perf_counter()
+        if not self.nodes:
+            results: List[NodeResult] = []
+        else:
+            workers = min(self.parallelism, len(self.nodes))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"frac-{action}") as pool:
+                results = list(pool.map(one, self.nodes))
+        self.last_seconds = time.perf_counter() - start
+        self.last_results = results
+        return results
+
+    @staticmethod
+    def _check(action: str, results: List[NodeResult]) -> None:
+        if any(not r.ok for r in results):
+            raise NodeGroupError(action, results)
@@ -2,24 +2,189 @@
 
 from __future__ import annotations
 
+import mmap
 import os
+import select
 import signal
+import stat
 import subprocess
 import sys
+import tempfile
+import threading
+import time
 from typing import List, Optional
 
+from . import metrics
 from .api import Frac, Node, Event, RuntimeHooks
 from .observers import BaseRuntimeHooks
 
+# Default read size for the stdout pump
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+# Default grace period between SIGTERM and SIGKILL when killing a node
+DEFAULT_KILL_TIMEOUT = 1.0
+
+# Default in-memory cap for input buffered while a node is suspended
+DEFAULT_BUFFER_LIMIT = 64 * 1024 * 1024
+
+# Maximum number of buffers per writev(2) call
+try:
+    _IOV_MAX = max(os.sysconf("SC_IOV_MAX"), 1)
+except (AttributeError, ValueError, OSError):
+    _IOV_MAX = 1024
+# Size of the mmap slices handed to writev when replaying the spill file
+_SPILL_SLICE = 1024 * 1024
+
+
+def _wait_exit(proc: subprocess.Popen, timeout: float) -> bool:
+    """Wait up to timeout seconds for proc to exit without reaping it.
+
+    Uses a pidfd (Linux 5.3+) so the wait is a single poll instead of the
+    sleep loop Popen.wait(timeout) falls back to.
+    """
+    if hasattr(os, "pidfd_open"):
+        try:
+            fd = os.pidfd_open(proc.pid)
+        except ProcessLookupError:
+            return True  # already reaped
+        except OSError:
+            fd = None
+        if fd is not None:
+            try:
+                ready, _, _ = select.select([fd], [], [], timeout)
+                return bool(ready)
+            finally:
+                os.close(fd)
+    try:
+        proc.wait(timeout=timeout)
+        return True
+    except subprocess.TimeoutExpired:
+        return False
+
+
+def _writev_all(fd: int, buffers) -> int:
+    """Write every buffer to fd with as few writev(2) calls as possible."""
+    views = [memoryview(b) for b in buffers if len(b)]
+    written = 0
+    i = 0
+    while i < len(views):
+        n = os.writev(fd, views[i:i + _IOV_MAX])
+        written += n
+        # Skip fully written buffers, trim a partially written one
+        while n:
+            if n >= len(views[i]):
+                n -= len(views[i])
+                i += 1
+            else:
+                views[i] = views[i][n:]
+                n = 0
+    return written
+
+
+class SpillBuffer:
+    """Input buffer with a memory cap that spills to a temporary file.
+
+    Chunks stay in memory until ``memory_limit`` bytes are buffered; from then
+    on they are appended to an anonymous temp file.  ``replay()`` writes
+    everything to a file descriptor in arrival order using os.writev, mapping
+    the spill file with mmap rather than reading it back into Python.
+    """
+
+    def __init__(self, memory_limit: int = DEFAULT_BUFFER_LIMIT) -> None:
+        self.memory_limit = memory_limit
+        self._chunks: List[bytes] = []
+        self._memory_bytes = 0
+        self._spill = None  # temp file, created on first overflow
+        self._spilled_bytes = 0
+        self._lock = threading.Lock()
+        self.replayed_bytes = 0
+        self.replay_seconds = 0.0
+
+    def __len__(self) -> int:
+        return self._memory_bytes + self._spilled_bytes
+
+    def append(self, chunk: bytes) -> None:
+        """Buffer chunk, spilling to disk once the memory cap is reached."""
+        with self._lock:
+            # Once spilling has started everything goes to disk to keep order
+            if self._spill is None and self._memory_bytes + len(chunk) <= self.memory_limit:
+                self._chunks.append(bytes(chunk))
+                self._memory_bytes += len(chunk)
+                return
+            if self._spill is None:
+                self._spill = tempfile.TemporaryFile(prefix="frac-spill-")
+            self._spill.write(chunk)
+            self._spilled_bytes += len(chunk)
+
+    def replay(self, fd: int) -> int:
+        """Write all buffered data to fd, then empty the buffer.
+
+        Returns the number of bytes written.
+        """
+        with self._lock:
+            start = time.perf_counter()
+            written = _writev_all(fd, self._chunks)
+            if self._spill is not None and self._spilled_bytes:
+                self._spill.flush()
+                with mmap.mmap(
+                    self._spill.fileno(), self._spilled_bytes, access=mmap.ACCESS_READ
+                ) as mapped:
+                    view = memoryview(mapped)
+                    try:
+                        written += _writev_all(fd, [
+                            view[off:off + _SPILL_SLICE]
+                            for off in range(0, self._spilled_bytes, _SPILL_SLICE)
+                        ])
+                    finally:
+                        view.release()
+            self.replay_seconds = time.perf_counter() - start
+            self.replayed_bytes = written
+            self._clear()
+            return written
+
+    def clear(self) -> None:
+        """Drop all buffered data."""
+        with self._lock:
+            self._clear()
+
+    def _clear(self) -> None:
+        self._chunks = []
+        self._memory_bytes = 0
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
+        self._spilled_bytes = 0
+
+    def metrics(self) -> dict:
+        """Buffered/spilled byte counts and throughput of the last replay."""
+        return {
+            "buffered_bytes": len(self),
+            "memory_bytes": self._memory_bytes,
+            "spilled_bytes": self._spilled_bytes,
+            "replayed_bytes": self.replayed_bytes,
+            "replay_seconds": self.replay_seconds,
+            "replay_mb_per_s": (
+                self.replayed_bytes / self.replay_seconds / 1e6 if self.replay_seconds else 0.0
+            ),
+        }
+
 
 class LocalProcessNode(Node):
     """A Node that represents a local subprocess with fault simulation via suspension."""
 
-    def __init__(self, cmd: List[str]) -> None:
+    def __init__(
+        self,
+        cmd: List[str],
+        buffer_limit: int = DEFAULT_BUFFER_LIMIT,
+        kill_timeout: float = DEFAULT_KILL_TIMEOUT,
+    ) -> None:
         self.cmd = cmd
+        self.kill_timeout = kill_timeout  # seconds between SIGTERM and SIGKILL
+        self.kill_stats: dict = {}  # latencies of the last kill()
+        self._kill_start: Optional[float] = None  # until the pump sees EOF
         self.proc: Optional[subprocess.Popen[bytes]] = None
         self._is_suspended = False
-        self._input_buffer: List[bytes] = []  # Buffer input during "death"
+        self._input_buffer = SpillBuffer(buffer_limit)  # Buffer input during "death"
         self._output_stream = None  # Reference to downstream for draining
         self._hooks = None  # Reference to hooks for byte counting
 
@@ -44,7 +209,6 @@ class LocalProcessNode(Node):
             # Read all remaining data from stdout pipe
             while True:
                 # Use non-blocking read to avoid hanging
-                import select
                 ready, _, _ = select.select([self.proc.stdout], [], [], 0.1)
                 if not ready:
                     break
@@ -69,28 +233,80 @@ class LocalProcessNode(Node):
         return drained_bytes
 
     def kill(self) -> None:
-        """Kill the process permanently (for local command-level fault injection)."""
-        if self.proc and self.proc.poll() is None:
-            sys.stderr.write(f"[frac] killing PID {self.proc.pid}\n")
+        """Kill the process permanently (for local command-level fault injection).
+
+        Does not block: SIGTERM is sent and the pipes are closed at once so
+        downstream sees EOF; a reaper thread waits for the exit and escalates
+        to SIGKILL after ``kill_timeout`` seconds.  Latencies end up in
+        ``kill_stats``: ``kill_to_eof_ms`` once the pump reading the output
+        has seen it end (see note_eof()), ``kill_to_reap_ms`` once the
+        process is reaped.
+        """
+        if self.proc and self._running():
+            proc = self.proc
+            sys.stderr.write(f"[frac] killing PID {proc.pid}\n")
             sys.stderr.flush()
-            
+
+            start = time.perf_counter()
             # Terminate the process permanently
-            self.proc.terminate()
-            try:
-                self.proc.wait(timeout=1.0)
-            except subprocess.TimeoutExpired:
-                self.proc.kill()
-                self.proc.wait()
-            
-            # Close streams to signal EOF downstream
-            if self.proc.stdout:
-                self.proc.stdout.close()
-            if self.proc.stdin:
-                self.proc.stdin.close()
+            self._signal(proc, signal.SIGTERM)
+
+            # Close streams to signal EOF downstream without waiting for exit
+            for stream in (proc.stdout, proc.stdin):
+                if stream:
+                    try:
+                        stream.close()
+                    except OSError:
+                        pass
+
+            stats = {"pid": proc.pid}
+            self.kill_stats = stats
+            self._kill_start = start
+            threading.Thread(
+                target=self._reap, args=(proc, start, stats), name=f"frac-reap-{proc.pid}"
+            ).start()
+
+    def note_eof(self) -> None:
+        """Called by the pump when the node's output ends.
+
+        After a kill() this is when downstream stops receiving data, so it
+        records ``kill_to_eof_ms``; otherwise it does nothing.
+        """
+        start, self._kill_start = self._kill_start, None
+        if start is not None:
+            eof_ms = (time.perf_counter() - start) * 1000
+            self.kill_stats["kill_to_eof_ms"] = eof_ms
+            metrics.observe("frac_kill_to_eof_seconds", eof_ms / 1000)
+            sys.stderr.write(
+                f"[frac] PID {self.kill_stats['pid']} output ended: kill-to-EOF {eof_ms:.3f} ms\n"
+            )
+            sys.stderr.flush()
+
+    def _signal(self, proc: subprocess.Popen, sig: int) -> None:
+        """Deliver a kill signal to the node."""
+        try:
+            proc.send_signal(sig)
+        except ProcessLookupError:
+            pass
+
+    def _reap(self, proc: subprocess.Popen, start: float, stats: dict) -> None:
+        """Wait for a killed process, escalating to SIGKILL after kill_timeout."""
+        escalated = not _wait_exit(proc, self.kill_timeout)
+        if escalated:
+            self._signal(proc, signal.SIGKILL)
+        proc.wait()
+        stats["kill_to_reap_ms"] = (time.perf_counter() - start) * 1000
+        metrics.observe("frac_kill_to_reap_seconds", stats["kill_to_reap_ms"] / 1000)
+        stats["escalated"] = escalated
+        sys.stderr.write(
+            f"[frac] PID {proc.pid} reaped: kill-to-reap {stats['kill_to_reap_ms']:.3f} ms"
+            f"{' (SIGKILL)' if escalated else ''}\n"
+        )
+        sys.stderr.flush()
 
     def resurrect(self) -> None:
         """Simulate resurrection by flushing buffered input and resuming the suspended process."""
-        if self.proc and self.proc.poll() is None and self._is_suspended:
+        if self.proc and self._running() and self._is_suspended:
             # First flush any buffered input
             self.flush_buffer_to_stdin()
             
@@ -98,7 +314,7 @@ class LocalProcessNode(Node):
             sys.stderr.flush()
             
             # Resume the process
-            os.kill(self.proc.pid, signal.SIGCONT)
+            self._signal(self.proc, signal.SIGCONT)
             self._is_suspended = False
         else:
             # If process actually died or doesn't exist, create a new one
@@ -109,9 +325,7 @@ class LocalProcessNode(Node):
                 except:
                     pass
 
-            self.proc = subprocess.Popen(
-                self.cmd, stdout=subprocess.PIPE, stdin=subprocess.PIPE, bufsize=0
-            )
+            self.proc = self._spawn()
             self._is_suspended = False
             sys.stderr.write(f"[frac] resurrected as PID {self.proc.pid}\n")
             sys.stderr.flush()
@@ -119,11 +333,26 @@ class LocalProcessNode(Node):
     def start(self) -> None:
         """Start the subprocess initially."""
         if self.proc is None:
-            self.proc = subprocess.Popen(
-                self.cmd, stdout=subprocess.PIPE, stdin=subprocess.PIPE, bufsize=0
-            )
+            self.proc = self._spawn()
             self._is_suspended = False
 
+    def stop(self) -> None:
+        """Terminate and reap the process when the harness shuts down."""
+        if self.proc:
+            if self._running():
+                self._signal(self.proc, signal.SIGTERM)
+            self.proc.wait()
+
+    def _spawn(self) -> subprocess.Popen:
+        """Launch the command with piped stdin/stdout."""
+        return subprocess.Popen(
+            self.cmd, stdout=subprocess.PIPE, stdin=subprocess.PIPE, bufsize=0
+        )
+
+    def _running(self) -> bool:
+        """True while the process has not exited."""
+        return self.proc is not None and self.proc.poll() is None
+
     def is_suspended(self) -> bool:
         """Check if process is currently suspended (simulating death)."""
         return self._is_suspended
@@ -132,7 +361,7 @@ class LocalProcessNode(Node):
         """Check if process is alive and not suspended."""
         return (self.proc and 
                 not self._is_suspended and 
-                self.proc.poll() is None)
+                self._running())
     
     def add_to_buffer(self, chunk: bytes) -> None:
         """Add chunk to input buffer during suspension."""
@@ -140,15 +369,244 @@ class LocalProcessNode(Node):
     
     def flush_buffer_to_stdin(self) -> None:
         """Send all buffered input to process stdin."""
-        if self.proc and self.proc.stdin and self._input_buffer:
+        if self.proc and self.proc.stdin and len(self._input_buffer):
             try:
-                for buffered_chunk in self._input_buffer:
-                    self.proc.stdin.write(buffered_chunk)
-                    self.proc.stdin.flush()
-                self._input_buffer.clear()
+                self.proc.stdin.flush()
+                self._input_buffer.replay(self.proc.stdin.fileno())
             except:
                 pass
 
+    def buffer_metrics(self) -> dict:
+        """Buffered/spilled bytes and replay throughput of the input buffer."""
+        return self._input_buffer.metrics()
+
+
+class ProcessGroupNode(LocalProcessNode):
+    """A LocalProcessNode that kills and resurrects the whole process tree.
+
+    The command runs as the leader of its own session/process group, so
+    signals reach every helper it spawned (e.g. the stages of a shell
+    pipeline), and no grandchild survives to hold the pipes open.  Liveness
+    is tracked with a pidfd where the kernel supports it instead of
+    polling with waitpid.
+    """
+
+    def __init__(self, cmd: List[str], **kwargs) -> None:
+        super().__init__(cmd, **kwargs)
+        self._pidfd: Optional[int] = None
+        self._pidfd_lock = threading.Lock()  # the reaper thread closes it
+        self._reaped_group: Optional[subprocess.Popen] = None  # last group _reap saw go
+
+    def _spawn(self) -> subprocess.Popen:
+        proc = subprocess.Popen(
+            self.cmd,
+            stdout=subprocess.PIPE,
+            stdin=subprocess.PIPE,
+            bufsize=0,
+            start_new_session=True,
+        )
+        pidfd = None
+        if hasattr(os, "pidfd_open"):
+            try:
+                pidfd = os.pidfd_open(proc.pid)
+            except OSError:
+                pass
+        with self._pidfd_lock:
+            if self._pidfd is not None:
+                os.close(self._pidfd)
+            self._pidfd = pidfd
+        return proc
+
+    def _close_pidfd(self, proc: subprocess.Popen) -> None:
+        """Close the pidfd once proc is reaped, unless it has been replaced."""
+        with self._pidfd_lock:
+            if self._pidfd is not None and self.proc is proc:
+                os.close(self._pidfd)
+                self._pidfd = None
+
+    def _running(self) -> bool:
+        if self.proc is None:
+            return False
+        with self._pidfd_lock:
+            if self._pidfd is not None:
+                # A pidfd becomes readable once the leader has exited
+                ready, _, _ = select.select([self._pidfd], [], [], 0)
+                return not ready
+        return self.proc.poll() is None
+
+    def stop(self) -> None:
+        proc = self.proc
+        super().stop()
+        if proc is not None:
+            self._close_pidfd(proc)
+
+    def _signal(self, proc: subprocess.Popen, sig: int) -> None:
+        """Signal every process in the node's group (pgid == leader pid)."""
+        try:
+            os.killpg(proc.pid, sig)
+        except ProcessLookupError:
+            pass
+
+    def _reap(self, proc: subprocess.Popen, start: float, stats: dict) -> None:
+        """Wait for the whole group to exit, escalating to SIGKILL on timeout."""
+        deadline = time.monotonic() + self.kill_timeout
+        escalated = not _wait_exit(proc, self.kill_timeout)
+        if not escalated:
+            proc.wait()
+            escalated = not _wait_group_exit(proc.pid, deadline - time.monotonic())
+        if escalated:
+            self._signal(proc, signal.SIGKILL)
+        proc.wait()
+        self._close_pidfd(proc)
+        self._reaped_group = proc  # its pgid may be recycled from now on
+        stats["kill_to_reap_ms"] = (time.perf_counter() - start) * 1000
+        metrics.observe("frac_kill_to_reap_seconds", stats["kill_to_reap_ms"] / 1000)
+        stats["escalated"] = escalated
+        sys.stderr.write(
+            f"[frac] process group {proc.pid} reaped: kill-to-reap {stats['kill_to_reap_ms']:.3f} ms"
+            f"{' (SIGKILL)' if escalated else ''}\n"
+        )
+        sys.stderr.flush()
+
+    def resurrect(self) -> None:
+        """Restart the whole tree; leftovers of the old group are killed first."""
+        proc = self.proc
+        if proc and not self._is_suspended and self._owns_group(proc):
+            self._signal(proc, signal.SIGKILL)
+        super().resurrect()
+
+    def _owns_group(self, proc: subprocess.Popen) -> bool:
+        """True while proc's pgid can only name the group it leads.
+
+        The pgid stays taken while the leader is unreaped or any member is
+        left; once the group is gone the number may be given to an
+        unrelated process group, which must not be signalled.
+        """
+        if proc is self._reaped_group:
+            return False
+        return proc.returncode is None or _group_alive(proc.pid)
+
+
+def _wait_group_exit(pgid: int, timeout: float) -> bool:
+    """Wait until no live process is left in group pgid; False on timeout.
+
+    Polls with killpg(pgid, 0), backing off from 0.5 ms to 50 ms.  killpg
+    also finds zombies, which linger when init is slow to reap orphans, so
+    once the backoff tops out each poll asks procfs whether anything but
+    zombies is left instead.
+    """
+    deadline = time.monotonic() + max(0.0, timeout)
+    delay = 0.0005
+    while True:
+        try:
+            os.killpg(pgid, 0)
+        except ProcessLookupError:
+            return True
+        except PermissionError:
+            pass  # still there, just not ours to signal
+        if delay >= _GROUP_POLL_MAX and not _group_alive(pgid):
+            return True
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 2, _GROUP_POLL_MAX)
+
+
+_GROUP_POLL_MAX = 0.05
+
+
+def _group_alive(pgid: int) -> bool:
+    """True if any non-zombie process is left in group pgid (scans /proc)."""
+    try:
+        pids = [entry for entry in os.listdir("/proc") if entry.isdigit()]
+    except OSError:
+        return True  # no procfs: zombies cannot be told apart
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/stat") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+        except (OSError, IndexError):
+            continue
+        # fields: state, ppid, pgrp, ...
+        if int(fields[2]) == pgid and fields[0] != "Z":
+            return True
+    return False
+
+
+class LinkShaper:
+    """Slow-link model applied per chunk by LocalStreamingHooks' pump.
+
+    Combines a token-bucket rate limit (``rate`` bytes/s with bursts of up
+    to ``burst`` bytes), a fixed added latency per chunk, and periodic
+    stalls of ``stall_ms`` every ``stall_every_ms``.  All costs are paid
+    per chunk, and only while a shaper is installed.
+    """
+
+    def __init__(
+        self,
+        rate: Optional[float] = None,
+        burst: int = DEFAULT_CHUNK_SIZE,
+        latency_ms: float = 0.0,
+        stall_every_ms: float = 0.0,
+        stall_ms: float = 0.0,
+    ) -> None:
+        if burst < 1:
+            raise ValueError("burst must be at least 1 byte")
+        self.rate = rate
+        self.burst = burst
+        self.latency = latency_ms / 1000.0
+        self.stall_every = stall_every_ms / 1000.0
+        self.stall = stall_ms / 1000.0
+        self.reset()
+
+    def reset(self) -> None:
+        """Start from a full bucket with the next stall one period away."""
+        now = time.monotonic()
+        self._tokens = float(self.burst)
+        self._last = now
+        self._next_stall = now + self.stall_every if self.stall_every and self.stall else None
+
+    def delay(self, n: int) -> None:
+        """Sleep as needed before n more bytes may pass."""
+        pause = self.pause(n)
+        if pause > 0:
+            time.sleep(pause)
+
+    def pause(self, n: int) -> float:
+        """Seconds to wait before n more bytes may pass (without sleeping)."""
+        pause = self.latency
+        now = time.monotonic()
+        if self.rate:
+            self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= n
+            if self._tokens < 0:
+                pause += -self._tokens / self.rate
+        if self._next_stall is not None and now >= self._next_stall:
+            pause += self.stall
+            self._next_stall = now + self.stall + self.stall_every
+        return pause
+
+
+class SlowLink(Node):
+    """Link-degradation fault: kill() slows the pump down, resurrect() restores it."""
+
+    def __init__(self, hooks: "LocalStreamingHooks", shaper: LinkShaper) -> None:
+        self.hooks = hooks
+        self.shaper = shaper
+
+    def kill(self) -> None:
+        sys.stderr.write("[frac] degrading link\n")
+        sys.stderr.flush()
+        self.shaper.reset()
+        self.hooks.set_shaper(self.shaper)
+
+    def resurrect(self) -> None:
+        sys.stderr.write("[frac] link restored to full speed\n")
+        sys.stderr.flush()
+        self.hooks.set_shaper(None)
+
 
 class LocalStreamingHooks(BaseRuntimeHooks):
     """RuntimeHooks that monitors a LocalProcessNode's stdout."""
@@ -160,22 +618,55 @@ class LocalStreamingHooks(BaseRuntimeHooks):
         self.set_fire_callback(node.kill)
         # Set hooks reference for byte counting during drainage
         node.set_hooks(self)
+        # Link degradation applied by the pump, None at full speed
+        self._shaper: Optional[LinkShaper] = None
+
+    def set_shaper(self, shaper: Optional[LinkShaper]) -> None:
+        """Degrade the output link with shaper, or restore full speed with None."""
+        self._shaper = shaper
+
+    def pump_data(
+        self,
+        input_stream,
+        output_stream,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        splice: bool = False,
+    ) -> None:
+        """Stream data through process with precise byte monitoring.
+
+        Output is read into a reusable buffer ``chunk_size`` bytes at a time;
+        reads are shortened so that no chunk crosses a pending byte threshold.
+        ``chunk_size=1`` reproduces the original byte-at-a-time pump.
+
+        With ``splice=True`` and both streams being pipes, data is moved with
+        splice(2) and never enters Python (Linux only); otherwise the
+        buffered pump is used.  Every forwarded chunk is scanned for tokens
+        armed with TokenEvent, so those fire as soon as the token passes.
+        """
+        self._detect_input_size(input_stream)
+
+        # Spliced bytes never reach Python, so token watches need the buffered pump
+        if splice and not self.watches_tokens() and can_splice(input_stream, output_stream):
+            self._splice_data(input_stream, output_stream, chunk_size)
+            return
 
-    def pump_data(self, input_stream, output_stream) -> None:
-        """Stream data through process with precise byte monitoring."""
-        
         # Start feeding input in a simple thread
+        read = getattr(input_stream, "read1", input_stream.read)
+
         def feed_input():
             try:
                 while True:
-                    chunk = input_stream.read(8192)
+                    chunk = read(DEFAULT_CHUNK_SIZE)
                     if not chunk:
                         break
-                    if self.node.proc and self.node.proc.stdin:
+                    if self.node.is_suspended():
+                        self.node.add_to_buffer(chunk)
+                    elif self.node.proc and self.node.proc.stdin:
                         self.node.proc.stdin.write(chunk)
                         self.node.proc.stdin.flush()
                     else:
                         break
+                    self.add_input_bytes(len(chunk))
             except Exception:
                 pass
             finally:
@@ -185,32 +676,116 @@ class LocalStreamingHooks(BaseRuntimeHooks):
                     except:
                         pass
         
-        import threading
         input_thread = threading.Thread(target=feed_input, daemon=True)
         input_thread.start()
         
-        # Monitor output bytes precisely and kill at threshold
+        # Monitor output in large chunks, capping each read at the next threshold
+        buf = bytearray(chunk_size)
+        view = memoryview(buf)
         while True:
             if not (self.node.proc and self.node.proc.stdout):
                 break
-                
+
+            # Never read past a pending threshold so the kill lands on the exact byte
+            limit = chunk_size
+            remaining = self.bytes_until_threshold()
+            if remaining is not None and remaining < limit:
+                limit = remaining
+            shaper = self._shaper
+            if shaper is not None and shaper.burst < limit:
+                limit = shaper.burst
+
             try:
-                # Read in small chunks for precise byte counting
-                chunk = self.node.proc.stdout.read(1)  # Read 1 byte at a time for precision
-                if not chunk:
+                n = self.node.proc.stdout.readinto(view[:limit])
+                if not n:
                     # Process ended normally
                     break
-                
-                # Count this byte
-                self.add_bytes(chunk)
-                
-                # Forward to output
+
+                chunk = view[:n]
+                if shaper is not None:
+                    shaper.delay(n)
+
+                # Forward to output, then count (may fire the kill at the threshold)
                 output_stream.write(chunk)
                 output_stream.flush()
-                
+                self.add_bytes(chunk)
+
             except Exception:
                 # Process was killed or other error
                 break
+        self.node.note_eof()
+
+    def _detect_input_size(self, input_stream) -> None:
+        """Take the input size from a regular-file input unless one was set."""
+        if self.input_size() is not None:
+            return
+        try:
+            fd = input_stream.fileno()
+            st = os.fstat(fd)
+            if stat.S_ISREG(st.st_mode):
+                self.set_input_size(st.st_size - os.lseek(fd, 0, os.SEEK_CUR))
+        except (AttributeError, OSError, ValueError):
+            pass
+
+    def _splice_data(self, input_stream, output_stream, chunk_size: int) -> None:
+        """Kernel pass-through pump: Python only tracks byte counts."""
+        in_fd = input_stream.fileno()
+        out_fd = output_stream.fileno()
+        # Anything already buffered in the Python stream must go out first
+        output_stream.flush()
+
+        def feed_input():
+            try:
+                while self.node.proc and self.node.proc.stdin and not self.node.proc.stdin.closed:
+                    n = os.splice(in_fd, self.node.proc.stdin.fileno(), chunk_size)
+                    if not n:
+                        break
+                    self.add_input_bytes(n)
+            except (OSError, ValueError):
+                pass
+            finally:
+                if self.node.proc and self.node.proc.stdin:
+                    try:
+                        self.node.proc.stdin.close()
+                    except:
+                        pass
+
+        input_thread = threading.Thread(target=feed_input, daemon=True)
+        input_thread.start()
+
+        while self.node.proc and self.node.proc.stdout and not self.node.proc.stdout.closed:
+            # Cap every call at the next threshold so the kill offset stays exact
+            limit = chunk_size
+            remaining = self.bytes_until_threshold()
+            if remaining is not None and remaining < limit:
+                limit = remaining
+            shaper = self._shaper
+            if shaper is not None and shaper.burst < limit:
+                limit = shaper.burst
+
+            try:
+                n = os.splice(self.node.proc.stdout.fileno(), out_fd, limit)
+            except (OSError, ValueError):
+                # Process was killed or downstream went away
+                break
+            if not n:
+                break
+            if shaper is not None:
+                shaper.delay(n)
+            self.add_byte_count(n)
+        self.node.note_eof()
+
+
+def _is_pipe(stream) -> bool:
+    try:
+        return stat.S_ISFIFO(os.fstat(stream.fileno()).st_mode)
+    except (AttributeError, OSError, ValueError):
+        return False
+
+
+def can_splice(input_stream, output_stream) -> bool:
+    """True if splice(2) pass-through is available for these streams."""
+    return hasattr(os, "splice") and _is_pipe(input_stream) and _is_pipe(output_stream)
 
 
 class LocalFrac(Frac):
@@ -0,0 +1,321 @@
+"""Token watches on log files, followed like ``tail -F``.
+
+LogTail follows one or more files and feeds what is appended to them
+into a hooks object's token watches, so TokenEvent fires as soon as a
+worker logs its token instead of on the next 50 ms ``seen_token()`` poll,
+and each poll does not re-read the whole log.  Only bytes appended since
+the last read are scanned, with one streaming TokenMatcher per file, so
+memory is a read chunk plus the longest watched token whatever the log
+size.  Nothing is read while no watch is pending: the offset just moves
+to the end of the file.
+
+On Linux the parent directories are watched with inotify (through ctypes,
+no extra dependency) and a write is scanned as soon as the kernel reports
+it; elsewhere, or if a directory cannot be watched, the files are polled
+every ``poll_interval``.  A rotated file (renamed, a new one created at
+the path) is read to its end before the new file is followed from its
+start; a truncated file (copytruncate, ``> log``) is followed from its
+new start.  Truncation is spotted by the size dropping below the read
+offset or, if the file has already been rewritten past it, by the bytes
+just before the offset having changed.
+
+    hooks = LogTailHooks(["/var/log/worker-7.log"])
+    hooks.set_fire_callback(node.kill)
+    TokenEvent("checkpoint done").arm(hooks)
+"""
+
+from __future__ import annotations
+
+import os
+import select
+import struct
+import sys
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .observers import BaseRuntimeHooks, TimerScheduler, TokenMatcher
+
+READ_SIZE = 64 * 1024
+_MARK_SIZE = 64  # bytes before the offset re-checked to spot a rewritten file
+_RESCAN_INTERVAL = 1.0  # safety re-check of inotify-watched files (e.g. on NFS)
+
+# <sys/inotify.h>
+_IN_MODIFY = 0x002
+_IN_ATTRIB = 0x004
+_IN_MOVED_FROM = 0x040
+_IN_MOVED_TO = 0x080
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+_IN_Q_OVERFLOW = 0x4000
+_IN_NONBLOCK = os.O_NONBLOCK
+_IN_CLOEXEC = os.O_CLOEXEC
+_WATCH_MASK = _IN_MODIFY | _IN_ATTRIB | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+_EVENT = struct.Struct("iIII")  # wd, mask, cookie, len; then len bytes of name
+
+
+class _Inotify:
+    """Minimal inotify(7) binding over libc."""
+
+    def __init__(self) -> None:
+        import ctypes
+
+        libc = ctypes.CDLL(None, use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self._get_errno = ctypes.get_errno
+        fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if fd < 0:
+            raise OSError(self._get_errno(), "inotify_init1 failed")
+        self.fd = fd
+
+    def add_watch(self, path: str, mask: int) -> int:
+        wd = self._add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            errno = self._get_errno()
+            raise OSError(errno, os.strerror(errno), path)
+        return wd
+
+    def read_events(self) -> List[Tuple[int, int, bytes]]:
+        """Pending (wd, mask, name) events; [] if there are none."""
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        events = []
+        pos = 0
+        while pos + _EVENT.size <= len(data):
+            wd, mask, _, length = _EVENT.unpack_from(data, pos)
+            pos += _EVENT.size
+            events.append((wd, mask, data[pos:pos + length].rstrip(b"\0")))
+            pos += length
+        return events
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class _Followed:
+    """One followed path: the open file, how far it was read, its matcher."""
+
+    __slots__ = ("path", "name", "fd", "ident", "offset", "mark", "matcher", "tokens")
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.name = os.fsencode(os.path.basename(path))
+        self.fd: Optional[int] = None
+        self.ident: Optional[Tuple[int, int]] = None  # (st_dev, st_ino) of fd
+        self.offset = 0
+        self.mark = b""  # the bytes just before offset
+        self.matcher = TokenMatcher()
+        self.tokens: set[str] = set()  # tokens the matcher looks for
+
+    def restart(self) -> None:
+        """Forget the stream position: a new file or a truncated one."""
+        self.offset = 0
+        self.mark = b""
+        self.matcher = TokenMatcher()
+        self.tokens = set()
+
+
+class LogTail:
+    """Feed bytes appended to files into the token watches of hooks.
+
+    hooks is a BaseRuntimeHooks; found tokens go through its add_token(),
+    so watch callbacks run on the tail thread.  With ``from_start`` the
+    files' existing contents are scanned too; by default only what is
+    written after the LogTail was created.  Files that do not exist yet
+    are followed from their start once they appear.
+    """
+
+    def __init__(
+        self,
+        hooks: BaseRuntimeHooks,
+        paths: Sequence[str],
+        from_start: bool = False,
+        poll_interval: float = 0.05,
+        use_inotify: bool = True,
+    ) -> None:
+        if not paths:
+            raise ValueError("LogTail needs at least one path")
+        self.hooks = hooks
+        self.poll_interval = poll_interval
+        self.files = [_Followed(os.path.abspath(path)) for path in paths]
+        self.reads = 0  # read(2) calls that returned data
+        self._lock = threading.RLock()  # serialises checks; close() may run in a callback
+        self._closed = False
+        self._wake_r, self._wake_w = os.pipe()
+        self._inotify: Optional[_Inotify] = None
+        self._watched: Dict[int, str] = {}  # wd -> directory
+        self._polled: List[_Followed] = []  # files inotify does not cover
+        for f in self.files:
+            self._open(f, at_end=not from_start)
+        if use_inotify and sys.platform.startswith("linux"):
+            self._setup_inotify()
+        else:
+            self._polled = list(self.files)
+        self._thread = threading.Thread(target=self._run, name="frac-logtail", daemon=True)
+        self._thread.start()
+
+    def _setup_inotify(self) -> None:
+        try:
+            self._inotify = _Inotify()
+        except (OSError, AttributeError):
+            self._polled = list(self.files)
+            return
+        by_dir: Dict[str, List[_Followed]] = {}
+        for f in self.files:
+            by_dir.setdefault(os.path.dirname(f.path), []).append(f)
+        for directory, followed in by_dir.items():
+            try:
+                self._watched[self._inotify.add_watch(directory, _WATCH_MASK)] = directory
+            except OSError:
+                self._polled.extend(followed)  # no such directory, watch limit, ...
+
+    def check(self) -> None:
+        """Read whatever was appended to every file (the tail thread does this)."""
+        self._check(self.files)
+
+    def close(self) -> None:
+        """Stop following and close the files."""
+        if self._closed:
+            return
+        self._closed = True
+        os.write(self._wake_w, b"x")
+        if threading.current_thread() is not self._thread:  # e.g. from a watch callback
+            self._thread.join()
+        with self._lock:
+            for f in self.files:
+                if f.fd is not None:
+                    os.close(f.fd)
+                    f.fd = None
+        if self._inotify is not None:
+            self._inotify.close()
+        os.close(self._wake_r)
+        os.close(self._wake_w)
+
+    def _run(self) -> None:
+        poller = select.poll()
+        poller.register(self._wake_r, select.POLLIN)
+        if self._inotify is not None:
+            poller.register(self._inotify.fd, select.POLLIN)
+        timeout = self.poll_interval if self._polled else _RESCAN_INTERVAL
+        while not self._closed:
+            ready = {fd for fd, _ in poller.poll(timeout * 1000)}
+            if self._closed:
+                return
+            try:
+                if self._inotify is not None and self._inotify.fd in ready:
+                    self._check(self._changed(self._inotify.read_events()))
+                    if self._polled:
+                        self._check(self._polled)
+                else:
+                    self.check()  # timeout: poll (or the periodic rescan)
+            except Exception as e:  # keep following after a bad callback
+                sys.stderr.write(f"[frac] log tail failed: {e!r}\n")
+                sys.stderr.flush()
+
+    def _changed(self, events: List[Tuple[int, int, bytes]]) -> List[_Followed]:
+        changed = []
+        for wd, mask, name in events:
+            if mask & _IN_Q_OVERFLOW:
+                return self.files  # events were lost: check everything
+            directory = self._watched.get(wd)
+            for f in self.files:
+                if f not in changed and f.name == name and os.path.dirname(f.path) == directory:
+                    changed.append(f)
+        return changed
+
+    def _check(self, files: List[_Followed]) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            for f in files:
+                self._follow(f)
+
+    def _follow(self, f: _Followed) -> None:
+        try:
+            st = os.stat(f.path)
+            ident: Optional[Tuple[int, int]] = (st.st_dev, st.st_ino)
+        except OSError:
+            ident = None
+        if f.fd is not None:
+            self._drain(f)  # rotated or not, finish what was written to it
+            if ident != f.ident:
+                os.close(f.fd)  # rotated away or deleted
+                f.fd = None
+        if f.fd is None and ident is not None:
+            # A new file at the path: everything in it is new
+            if self._open(f, at_end=False):
+                self._drain(f)
+
+    def _open(self, f: _Followed, at_end: bool) -> bool:
+        try:
+            fd = os.open(f.path, os.O_RDONLY | os.O_CLOEXEC)
+        except OSError:
+            return False
+        st = os.fstat(fd)
+        f.fd = fd
+        f.ident = (st.st_dev, st.st_ino)
+        f.restart()
+        if at_end:
+            self._skip(f, st.st_size)
+        return True
+
+    def _drain(self, f: _Followed) -> None:
+        fd = f.fd
+        assert fd is not None
+        size = os.fstat(fd).st_size
+        mark = f.mark
+        if size < f.offset or (mark and os.pread(fd, len(mark), f.offset - len(mark)) != mark):
+            f.restart()  # truncated, and maybe rewritten past the old offset
+        if not self.hooks.watches_tokens():
+            self._skip(f, size)  # nothing to look for: skip without scanning
+            return
+        while not self._closed:
+            data = os.pread(fd, READ_SIZE, f.offset)
+            if not data:
+                return
+            self.reads += 1
+            f.offset += len(data)
+            f.mark = (f.mark + data[-_MARK_SIZE:])[-_MARK_SIZE:]
+            self._scan(f, data)
+
+    def _skip(self, f: _Followed, offset: int) -> None:
+        """Move to offset without scanning what comes before it."""
+        keep = min(offset, _MARK_SIZE)
+        f.offset = offset
+        f.mark = os.pread(f.fd, keep, offset - keep)  # type: ignore[arg-type]
+
+    def _scan(self, f: _Followed, data: bytes) -> None:
+        watched = self.hooks.watched_tokens()
+        if f.tokens != watched:
+            for token in f.tokens - watched:
+                f.matcher.remove(token)
+            for token in watched - f.tokens:
+                f.matcher.add(token)
+            f.tokens = set(watched)
+        for token in f.matcher.feed(data):  # the matcher is only used under self._lock
+            self.hooks.add_token(token)
+
+
+class LogTailHooks(BaseRuntimeHooks):
+    """RuntimeHooks whose tokens come from followed log files (see LogTail).
+
+    Byte counts are not tracked; pair it with ProcHooks (frac.procfs) or
+    other hooks for ByteEvent.  Call close() when done.
+    """
+
+    def __init__(
+        self,
+        paths: Sequence[str],
+        from_start: bool = False,
+        poll_interval: float = 0.05,
+        use_inotify: bool = True,
+        scheduler: Optional[TimerScheduler] = None,
+    ) -> None:
+        super().__init__(scheduler)
+        self.tail = LogTail(self, paths, from_start, poll_interval, use_inotify)
+
+    def close(self) -> None:
+        """Stop following the files."""
+        self.tail.close()
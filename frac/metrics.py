@@ -0,0 +1,317 @@
+"""Optional metrics export for live hooks (Prometheus text format).
+
+Nothing here costs anything until ``enable()`` is called.  After that every
+BaseRuntimeHooks gets a chunk-size histogram, a fire counter and a fire
+duration histogram, and process-wide histograms record timer lateness and
+kill latencies.  Hot-path updates go to per-thread shards that only their
+own thread writes, so observing takes no lock; the exporter sums the
+shards when it is scraped.  A thread's shard is folded into a base value
+when the thread exits, so short-lived threads (one per reaped kill) do not
+accumulate.
+
+``serve(port=..., unix_path=...)`` exposes ``/metrics`` over HTTP on
+127.0.0.1 or on a Unix socket (``curl --unix-socket PATH http://x/metrics``).
+"""
+
+from __future__ import annotations
+
+import itertools
+import os
+import threading
+import time
+import weakref
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Histogram bucket upper bounds
+CHUNK_BUCKETS = tuple(2**i for i in range(0, 25, 2))  # 1 B .. 16 MiB
+SECONDS_BUCKETS = (
+    1e-5, 5e-5, 1e-4, 5e-4, 1e-3, 5e-3, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0,
+)
+
+
+class _ThreadExit:
+    """Held only by a thread's locals; collected when the thread exits."""
+
+    __slots__ = ("__weakref__",)
+
+
+class _Sharded:
+    """Per-thread lists of ``size`` numbers, summed on read.
+
+    Each live thread has its own shard; when a thread exits its shard is
+    added into ``_base`` and dropped, so memory tracks live threads only.
+    """
+
+    def __init__(self, size: int) -> None:
+        self._size = size
+        self._local = threading.local()
+        self._shards: List[List[float]] = []
+        self._base = [0] * size  # shards of threads that have exited
+        self._lock = threading.RLock()  # not taken on the hot path
+
+    def _shard(self) -> List[float]:
+        shard = [0] * self._size
+        with self._lock:
+            self._shards.append(shard)
+        exit_token = _ThreadExit()
+        weakref.finalize(exit_token, self._fold, shard)
+        self._local.shard = shard
+        self._local.exit_token = exit_token
+        return shard
+
+    def _fold(self, shard: List[float]) -> None:
+        with self._lock:
+            for i, value in enumerate(shard):
+                self._base[i] += value
+            for i, other in enumerate(self._shards):
+                if other is shard:
+                    del self._shards[i]
+                    break
+
+    def _sum(self) -> List[float]:
+        with self._lock:
+            totals = list(self._base)
+            for shard in self._shards:
+                for i, value in enumerate(shard):
+                    totals[i] += value
+        return totals
+
+
+class Counter(_Sharded):
+    """Monotonic counter sharded per thread."""
+
+    def __init__(self) -> None:
+        super().__init__(1)
+
+    def inc(self, n: float = 1) -> None:
+        shard = getattr(self._local, "shard", None) or self._shard()
+        shard[0] += n
+
+    def value(self) -> float:
+        return self._sum()[0]
+
+
+class Histogram(_Sharded):
+    """Cumulative-bucket histogram sharded per thread."""
+
+    def __init__(self, bounds: Iterable[float]) -> None:
+        self.bounds = tuple(bounds)
+        # Shard layout: one count per bucket (last is +Inf), then sum, count
+        super().__init__(len(self.bounds) + 3)
+
+    def observe(self, value: float) -> None:
+        shard = getattr(self._local, "shard", None) or self._shard()
+        shard[bisect_left(self.bounds, value)] += 1
+        shard[-2] += value
+        shard[-1] += 1
+
+    def snapshot(self) -> Tuple[List[float], float, float]:
+        """(per-bucket counts, sum, count) summed over all shards."""
+        totals = self._sum()
+        return totals[:-2], totals[-2], totals[-1]
+
+
+class HooksMetrics:
+    """Instruments attached to one hooks object while metrics are enabled."""
+
+    def __init__(self, label: str) -> None:
+        self.label = label
+        self.chunks = Histogram(CHUNK_BUCKETS)
+        self.fires = Counter()
+        self.fire_seconds = Histogram(SECONDS_BUCKETS)
+        # Previous scrape, for the bytes/s gauge
+        self.last_scrape: Optional[Tuple[float, int]] = None
+
+
+class Registry:
+    """Live hooks objects plus process-wide histograms."""
+
+    def __init__(self) -> None:
+        self._hooks: "weakref.WeakSet[Any]" = weakref.WeakSet()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self.histograms: Dict[str, Histogram] = {
+            "frac_timer_latency_seconds": Histogram(SECONDS_BUCKETS),
+            "frac_kill_to_eof_seconds": Histogram(SECONDS_BUCKETS),
+            "frac_kill_to_reap_seconds": Histogram(SECONDS_BUCKETS),
+        }
+
+    def track(self, hooks: Any) -> None:
+        """Attach instruments to hooks and include it in every scrape (idempotent)."""
+        with self._lock:
+            if getattr(hooks, "_metrics", None) is not None:
+                return
+            hooks._metrics = HooksMetrics(f"{type(hooks).__name__}-{next(self._ids)}")
+            self._hooks.add(hooks)
+
+    def render(self) -> str:
+        """All metrics in Prometheus text exposition format (0.0.4)."""
+        out: List[str] = []
+        with self._lock:
+            hooks_list = list(self._hooks)
+        now = time.monotonic()
+
+        def family(name: str, kind: str, help_text: str) -> None:
+            out.append(f"# HELP {name} {help_text}")
+            out.append(f"# TYPE {name} {kind}")
+
+        family("frac_bytes_sent_total", "counter", "Bytes counted by the hooks")
+        for hooks in hooks_list:
+            out.append(f'frac_bytes_sent_total{{hooks="{hooks._metrics.label}"}} {hooks.bytes_sent()}')
+
+        family("frac_bytes_per_second", "gauge", "Throughput since the previous scrape")
+        for hooks in hooks_list:
+            m = hooks._metrics
+            sent = hooks.bytes_sent()
+            if m.last_scrape is None:
+                rate = sent / max(hooks.elapsed_ms() / 1000.0, 1e-9)
+            else:
+                then, before = m.last_scrape
+                rate = (sent - before) / max(now - then, 1e-9)
+            m.last_scrape = (now, sent)
+            out.append(f'frac_bytes_per_second{{hooks="{m.label}"}} {rate:.3f}')
+
+        family("frac_elapsed_seconds", "gauge", "Time since the hooks were created")
+        for hooks in hooks_list:
+            out.append(f'frac_elapsed_seconds{{hooks="{hooks._metrics.label}"}} {hooks.elapsed_ms() / 1000.0}')
+
+        family("frac_pending_thresholds", "gauge", "Byte thresholds not reached yet")
+        for hooks in hooks_list:
+            pending = len(getattr(hooks, "_byte_thresholds", ()))
+            out.append(f'frac_pending_thresholds{{hooks="{hooks._metrics.label}"}} {pending}')
+
+        family("frac_buffered_bytes", "gauge", "Input held back while the node is down")
+        for hooks in hooks_list:
+            node = getattr(hooks, "node", None)
+            if node is not None and hasattr(node, "buffer_metrics"):
+                buffered = node.buffer_metrics()["buffered_bytes"]
+                out.append(f'frac_buffered_bytes{{hooks="{hooks._metrics.label}"}} {buffered}')
+
+        family("frac_fires_total", "counter", "Faults fired through the hooks")
+        for hooks in hooks_list:
+            out.append(f'frac_fires_total{{hooks="{hooks._metrics.label}"}} {_num(hooks._metrics.fires.value())}')
+
+        family("frac_chunk_bytes", "histogram", "Size of chunks counted by the hooks")
+        for hooks in hooks_list:
+            _histogram(out, "frac_chunk_bytes", hooks._metrics.chunks, f'hooks="{hooks._metrics.label}"')
+
+        family("frac_fire_seconds", "histogram", "Time spent in the fire callback")
+        for hooks in hooks_list:
+            _histogram(out, "frac_fire_seconds", hooks._metrics.fire_seconds, f'hooks="{hooks._metrics.label}"')
+
+        for name, histogram in self.histograms.items():
+            family(name, "histogram", name.replace("frac_", "").replace("_", " "))
+            _histogram(out, name, histogram, "")
+        return "\n".join(out) + "\n"
+
+
+def _num(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _histogram(out: List[str], name: str, histogram: Histogram, labels: str) -> None:
+    counts, total, count = histogram.snapshot()
+    sep = "," if labels else ""
+    cumulative = 0.0
+    for bound, n in zip(histogram.bounds + (float("inf"),), counts):
+        cumulative += n
+        le = "+Inf" if bound == float("inf") else repr(bound)
+        out.append(f'{name}_bucket{{{labels}{sep}le="{le}"}} {_num(cumulative)}')
+    suffix = f"{{{labels}}}" if labels else ""
+    out.append(f"{name}_sum{suffix} {_num(total)}")
+    out.append(f"{name}_count{suffix} {_num(count)}")
+
+
+_registry: Optional[Registry] = None
+_pending_hooks: "weakref.WeakSet[Any]" = weakref.WeakSet()
+_registry_lock = threading.Lock()
+
+
+def enable() -> Registry:
+    """Turn metrics on (idempotent) and instrument every live hooks object."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            reg = Registry()
+            # Published first: hooks registered from now on track themselves
+            _registry = reg
+            while True:
+                try:
+                    pending = list(_pending_hooks)
+                    break
+                except RuntimeError:  # added to concurrently; copy again
+                    continue
+            for hooks in pending:
+                reg.track(hooks)
+            _pending_hooks.clear()
+        return _registry
+
+
+def registry() -> Optional[Registry]:
+    """The active registry, or None while metrics are disabled."""
+    return _registry
+
+
+def register_hooks(hooks: Any) -> None:
+    """Called by BaseRuntimeHooks on creation; takes no lock while metrics are off."""
+    if _registry is None:
+        _pending_hooks.add(hooks)  # for enable() to instrument later
+        if _registry is None:
+            return
+        # enable() ran meanwhile and may have cleared the pending set
+    _registry.track(hooks)
+
+
+def observe(name: str, value: float) -> None:
+    """Record value in a process-wide histogram; no-op while disabled."""
+    if _registry is not None:
+        _registry.histograms[name].observe(value)
+
+
+def _make_server(port: Optional[int], unix_path: Optional[str]) -> Any:
+    # http.server is only imported when metrics are actually served
+    import socketserver
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            if self.path.split("?")[0] not in ("/", "/metrics"):
+                self.send_error(404)
+                return
+            body = self.server.registry.render().encode()  # type: ignore[attr-defined]
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass  # scrapes would otherwise clutter stderr
+
+    class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+        def get_request(self):
+            # Unix socket peers have no (host, port) address; the handler wants one
+            request, _ = super().get_request()
+            return request, ("unix", 0)
+
+    if unix_path is not None:
+        if os.path.exists(unix_path):
+            os.unlink(unix_path)
+        return UnixHTTPServer(unix_path, Handler)
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    server.daemon_threads = True
+    return server
+
+
+def serve(port: Optional[int] = None, unix_path: Optional[str] = None) -> Any:
+    """Enable metrics and serve them from a daemon thread; returns the server."""
+    if (port is None) == (unix_path is None):
+        raise ValueError("give exactly one of port or unix_path")
+    reg = enable()
+    server = _make_server(port, unix_path)
+    server.registry = reg
+    threading.Thread(target=server.serve_forever, name="frac-metrics", daemon=True).start()
+    return server
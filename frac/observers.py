@@ -2,10 +2,22 @@
 
 from __future__ import annotations
 
+import heapq
+import itertools
+import math
+import re
+import sys
 import threading
 import time
-from datetime import datetime
-from typing import Callable, Optional
+from typing import TYPE_CHECKING, Callable, Optional
+
+from . import metrics
+
+# Only needed for annotations and traces; not imported by every plugin load
+if TYPE_CHECKING:
+    from datetime import datetime
+
+    from .trace import TraceRecorder
 
 
 class ByteCounter:
@@ -15,16 +27,30 @@ class ByteCounter:
         self._bytes = 0
         self._lock = threading.Lock()
 
-    def add(self, chunk: bytes) -> None:
-        """Add bytes to the counter."""
+    def add(self, chunk: bytes) -> int:
+        """Add bytes to the counter; returns the new total."""
+        return self.add_count(len(chunk))
+
+    def add_count(self, n: int) -> int:
+        """Add a byte count without the data (e.g. bytes moved by the kernel).
+
+        Returns the new total, read in the same critical section as the add.
+        """
         with self._lock:
-            self._bytes += len(chunk)
+            self._bytes += n
+            return self._bytes
 
     def total(self) -> int:
         """Get current byte count."""
         with self._lock:
             return self._bytes
 
+    def set(self, n: int) -> int:
+        """Jump to an absolute count (e.g. a sampled kernel counter); returns it."""
+        with self._lock:
+            self._bytes = n
+            return n
+
     def reset(self) -> None:
         """Reset counter to zero."""
         with self._lock:
@@ -41,30 +67,358 @@ class Timer:
         """Get elapsed time in milliseconds."""
         return int((time.time() - self._start) * 1000)
 
+    def elapsed_ns(self) -> int:
+        """Get elapsed time in nanoseconds."""
+        return int((time.time() - self._start) * 1e9)
+
+    def start_time(self) -> float:
+        """Wall-clock time (time.time()) the timer counts from."""
+        return self._start
+
     def reset(self) -> None:
         """Reset timer to current time."""
         self._start = time.time()
 
 
+class TokenMatcher:
+    """Streaming multi-pattern matcher over a byte stream.
+
+    ``feed()`` may be called with arbitrary chunks and finds matches that
+    straddle a chunk boundary.  Up to FIND_MAX_TOKENS tokens are searched
+    with ``bytes.find`` (C speed, one pass per token), plus a search of the
+    last ``len(longest token) - 1`` bytes joined to the head of the chunk
+    for matches across the boundary.  Beyond that an Aho-Corasick automaton
+    is used, whose state carries across chunks and whose cost is linear in
+    the bytes fed, independent of the number of tokens.  Only those last
+    bytes are retained, so the matcher can be rebuilt mid-stream when
+    tokens are added or removed.
+    """
+
+    FIND_MAX_TOKENS = 64
+
+    def __init__(self) -> None:
+        self._tokens: dict[bytes, str] = {}
+        self._goto: list[dict[int, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._out: list[tuple[str, ...]] = [()]
+        self._state = 0
+        self._tail = b""
+        self._keep = 0  # bytes of tail worth retaining
+        self._skip = re.compile(b"(?!)")  # finds the next possible token start
+        self._keys: Optional[list[tuple[bytes, str]]] = None  # set in find mode
+        self._dirty = False
+
+    def __len__(self) -> int:
+        return len(self._tokens)
+
+    def add(self, token: str) -> None:
+        """Start matching token (str tokens are matched as UTF-8)."""
+        key = token.encode()
+        if key and key not in self._tokens:
+            self._tokens[key] = token
+            self._dirty = True
+
+    def remove(self, token: str) -> None:
+        """Stop matching token."""
+        if self._tokens.pop(token.encode(), None) is not None:
+            self._dirty = True
+
+    def feed(self, data) -> list[str]:
+        """Scan the next chunk of the stream; return tokens that ended in it."""
+        if self._dirty:
+            self._rebuild()
+        if not self._tokens:
+            return []
+        if self._keys is not None:
+            found = self._find(data)
+        else:
+            found = []
+            self._advance(data, found)
+        self._remember_tail(data)
+        return found
+
+    def _find(self, data) -> list[str]:
+        if isinstance(data, memoryview):
+            data = data.tobytes()
+        tail = self._tail
+        n = len(tail)
+        # Matches starting in the retained tail and ending in data
+        window = tail + data[:self._keep] if n else b""
+        found = []
+        for key, token in self._keys:  # type: ignore[union-attr]
+            if data.find(key) != -1 or (n and -1 < window.find(key, max(0, n - len(key) + 1)) < n):
+                found.append(token)
+        return found
+
+    def _advance(self, data, found: Optional[list[str]]) -> None:
+        goto, fail, out = self._goto, self._fail, self._out
+        skip = self._skip.search
+        state = self._state
+        pos, end = 0, len(data)
+        while pos < end:
+            if state == 0:
+                # At the root only a token's first byte matters: jump to it in C
+                m = skip(data, pos)
+                if m is None:
+                    break
+                pos = m.start()
+            byte = data[pos]
+            pos += 1
+            while True:
+                nxt = goto[state].get(byte)
+                if nxt is not None:
+                    state = nxt
+                    break
+                if state == 0:
+                    break
+                state = fail[state]
+            if found is not None and out[state]:
+                found.extend(out[state])
+        self._state = state
+
+    def _remember_tail(self, data) -> None:
+        keep = self._keep
+        if keep <= 0:
+            self._tail = b""
+        elif len(data) >= keep:
+            self._tail = bytes(data[-keep:])
+        else:
+            self._tail = (self._tail + bytes(data))[-keep:]
+
+    def _rebuild(self) -> None:
+        self._keep = max((len(key) for key in self._tokens), default=1) - 1
+        self._dirty = False
+        if len(self._tokens) <= self.FIND_MAX_TOKENS:
+            self._keys = list(self._tokens.items())
+            return
+        self._keys = None
+
+        goto: list[dict[int, int]] = [{}]
+        out: list[list[str]] = [[]]
+        for key, token in self._tokens.items():
+            state = 0
+            for byte in key:
+                nxt = goto[state].get(byte)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][byte] = nxt
+                    goto.append({})
+                    out.append([])
+                state = nxt
+            out[state].append(token)
+
+        # Breadth-first pass computing failure links and merged outputs
+        fail = [0] * len(goto)
+        queue = list(goto[0].values())
+        for state in queue:
+            for byte, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and byte not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(byte, 0)
+                out[nxt].extend(out[fail[nxt]])
+
+        self._goto, self._fail = goto, fail
+        self._out = [tuple(o) for o in out]
+        self._skip = re.compile(b"[" + b"".join(re.escape(bytes([b])) for b in goto[0]) + b"]")
+
+        # Re-scan the retained tail (without reporting) to restore the state
+        self._state = 0
+        tail, self._tail = self._tail, b""
+        if self._tokens:
+            self._advance(tail, None)
+            self._remember_tail(tail)
+
+
+class TimerHandle:
+    """Cancellation handle for a callback scheduled on a TimerScheduler."""
+
+    __slots__ = ("when", "fn", "cancelled", "latency", "_scheduler")
+
+    def __init__(
+        self, when: float, fn: Callable[[], None], scheduler: Optional["TimerScheduler"] = None
+    ) -> None:
+        self.when = when  # time.monotonic() deadline
+        self.fn = fn
+        self.cancelled = False
+        self.latency: Optional[float] = None  # seconds late, set once fired
+        self._scheduler = scheduler
+
+    def cancel(self) -> None:
+        """Prevent the callback from running if it has not fired yet."""
+        self.cancelled = True
+        if self._scheduler is not None:
+            self._scheduler._wake()
+
+
+class TimerScheduler:
+    """A single heap-backed timer thread shared by many hooks objects.
+
+    Replaces one ``threading.Timer`` per callback.  The worker thread is
+    started on demand and exits once no timers are pending; it is not a
+    daemon, so pending timers keep the process alive just as
+    ``threading.Timer`` did.  Callbacks run on the worker thread one after
+    another, so they should not block for long.
+    """
+
+    def __init__(self) -> None:
+        self._heap: list[tuple[float, int, TimerHandle]] = []
+        self._cond = threading.Condition()
+        self._seq = itertools.count()
+        self._thread: Optional[threading.Thread] = None
+        self._fired = 0
+        self._latency_total = 0.0
+        self._latency_max = 0.0
+
+    def call_later(self, secs: float, fn: Callable[[], None]) -> TimerHandle:
+        """Run fn after secs seconds."""
+        return self.call_at_monotonic(time.monotonic() + max(0.0, secs), fn)
+
+    def call_at_monotonic(self, when: float, fn: Callable[[], None]) -> TimerHandle:
+        """Run fn once time.monotonic() reaches when."""
+        handle = TimerHandle(when, fn, self)
+        with self._cond:
+            heapq.heappush(self._heap, (when, next(self._seq), handle))
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="frac-timers", daemon=False
+                )
+                self._thread.start()
+            elif self._heap[0][2] is handle:
+                # New earliest deadline - wake the worker to re-arm its wait
+                self._cond.notify()
+        return handle
+
+    def _wake(self) -> None:
+        # A cancelled head would otherwise keep the worker (and the process)
+        # waiting until its deadline
+        with self._cond:
+            self._cond.notify()
+
+    def pending(self) -> int:
+        """Number of scheduled (possibly cancelled) callbacks not yet run."""
+        with self._cond:
+            return len(self._heap)
+
+    def stats(self) -> dict:
+        """Fire count and fire latency (how late callbacks ran) in milliseconds."""
+        with self._cond:
+            fired = self._fired
+            return {
+                "fired": fired,
+                "pending": len(self._heap),
+                "mean_latency_ms": self._latency_total / fired * 1000 if fired else 0.0,
+                "max_latency_ms": self._latency_max * 1000,
+            }
+
+    def _next_due(self) -> Optional[TimerHandle]:
+        """Block until a callback is due; None means the queue drained."""
+        with self._cond:
+            while True:
+                while self._heap and self._heap[0][2].cancelled:
+                    heapq.heappop(self._heap)
+                if not self._heap:
+                    self._thread = None
+                    return None
+                when, _, handle = self._heap[0]
+                delay = when - time.monotonic()
+                if delay <= 0:
+                    heapq.heappop(self._heap)
+                    return handle
+                self._cond.wait(delay)
+
+    def _run(self) -> None:
+        while True:
+            handle = self._next_due()
+            if handle is None:
+                return
+            if handle.cancelled:
+                continue
+            latency = time.monotonic() - handle.when
+            handle.latency = latency
+            metrics.observe("frac_timer_latency_seconds", latency)
+            with self._cond:
+                self._fired += 1
+                self._latency_total += latency
+                if latency > self._latency_max:
+                    self._latency_max = latency
+            try:
+                handle.fn()
+            except Exception as e:
+                sys.stderr.write(f"[frac] timer callback failed: {e!r}\n")
+                sys.stderr.flush()
+
+
+_default_scheduler: Optional[TimerScheduler] = None
+_default_scheduler_lock = threading.Lock()
+
+
+def default_scheduler() -> TimerScheduler:
+    """The process-wide TimerScheduler shared by all hooks."""
+    global _default_scheduler
+    with _default_scheduler_lock:
+        if _default_scheduler is None:
+            _default_scheduler = TimerScheduler()
+        return _default_scheduler
+
+
+def _heap_remove(heap: list, key: float, callback: Callable[[], None]) -> bool:
+    """Remove the (key, seq, callback) entry for callback from heap, O(n)."""
+    for i, (entry_key, _, entry_callback) in enumerate(heap):
+        if entry_key == key and entry_callback == callback:
+            heap[i] = heap[-1]
+            heap.pop()
+            heapq.heapify(heap)
+            return True
+    return False
+
+
 class BaseRuntimeHooks:
     """Base RuntimeHooks implementation with common functionality."""
 
-    def __init__(self) -> None:
+    def __init__(self, scheduler: Optional[TimerScheduler] = None) -> None:
+        self._scheduler = scheduler or default_scheduler()
         self._timer = Timer()
         self._byte_counter = ByteCounter()
         self._tokens_seen: set[str] = set()
         self._fire_callback: Optional[Callable[[], None]] = None
-        self._byte_thresholds: list[tuple[int, Callable[[], None]]] = []  # (threshold, callback) pairs
+        self._fire_action: Optional[str] = None  # name traced for the callback
+        self.fire_errors: list[Exception] = []  # raised by the fire callback
+        # Min-heap of (threshold, seq, callback); _next_threshold caches its head
+        self._byte_thresholds: list[tuple[int, int, Callable[[], None]]] = []
+        self._threshold_seq = itertools.count()
+        self._threshold_lock = threading.Lock()
+        self._next_threshold: float = math.inf
+        self._token_watches: dict[str, list[Callable[[], None]]] = {}
+        self._token_matcher = TokenMatcher()
+        self._token_lock = threading.Lock()
+        # Progress: input consumed out of a known total; min-heap of
+        # (fraction, seq, callback) watches, _next_progress caches the byte
+        # count at which the head fires
+        self._input_counter = ByteCounter()
+        self._input_total: Optional[int] = None
+        self._progress_watches: list[tuple[float, int, Callable[[], None]]] = []
+        self._progress_seq = itertools.count()
+        self._progress_lock = threading.Lock()
+        self._next_progress: float = math.inf
+        # Trace of fires (see frac.trace); _cause holds the token whose
+        # watch callbacks are running on the current thread
+        self._trace: Optional[TraceRecorder] = None
+        self._cause = threading.local()
+        # Instruments (frac.metrics.HooksMetrics) once metrics are enabled
+        self._metrics: Optional[metrics.HooksMetrics] = None
+        metrics.register_hooks(self)
 
     # Timer methods
-    def call_at(self, when: datetime, fn: Callable[[], None]) -> None:
+    def call_at(self, when: datetime, fn: Callable[[], None]) -> TimerHandle:
         """Schedule function to run at specific time."""
         delay = max(0.0, when.timestamp() - time.time())
-        threading.Timer(delay, fn).start()
+        return self._scheduler.call_later(delay, fn)
 
-    def call_later(self, secs: float, fn: Callable[[], None]) -> None:
+    def call_later(self, secs: float, fn: Callable[[], None]) -> TimerHandle:
         """Schedule function to run after delay."""
-        threading.Timer(secs, fn).start()
+        return self._scheduler.call_later(secs, fn)
 
     # Metrics
     def elapsed_ms(self) -> int:
@@ -81,32 +435,267 @@ class BaseRuntimeHooks:
 
     # Action
     def fire(self) -> None:
-        """Default fire action - calls registered callback if any."""
-        if self._fire_callback:
-            self._fire_callback()
+        """Default fire action - calls registered callback if any.
+
+        Errors from the callback are reported and kept in fire_errors.
+        """
+        callback = self._fire_callback
+        self.fire_as(callback, self._fire_action or getattr(callback, "__name__", "fire"))
+
+    def fire_as(self, callback: Optional[Callable[[], None]], action: str) -> None:
+        """Run callback as a fault action, traced under the name action.
+
+        fire() goes through here with the fire callback; use it directly for
+        a second action of the same fault, e.g. lifting a throttle, so that
+        the trace records it too.
+        """
+        if self._trace is not None:
+            self._trace.record(
+                self._timer.elapsed_ns(),
+                self._byte_counter.total(),
+                action,
+                getattr(self._cause, "token", None),
+            )
+        m = self._metrics
+        if m is not None:
+            m.fires.inc()
+        if callback:
+            start = time.perf_counter() if m is not None else 0.0
+            try:
+                callback()
+            except Exception as e:
+                # Raising would unwind into whatever counted the bytes (the
+                # pump), stopping it and cutting the output off silently
+                self.fire_errors.append(e)
+                sys.stderr.write(f"[frac] fault action failed: {e}\n")
+                sys.stderr.flush()
+            finally:
+                if m is not None:
+                    m.fire_seconds.observe(time.perf_counter() - start)
+
+    def set_trace_recorder(self, recorder: Optional[TraceRecorder]) -> None:
+        """Record every fire() to recorder (None stops recording)."""
+        self._trace = recorder
+
+    def start_trace(self, path: str) -> TraceRecorder:
+        """Start recording fires to a new trace file at path."""
+        from .trace import TraceRecorder
+
+        recorder = TraceRecorder(path, self._timer.start_time())
+        self.set_trace_recorder(recorder)
+        return recorder
 
     # Helper methods for subclasses
     def add_bytes(self, chunk: bytes) -> None:
-        """Add bytes to counter and check for threshold triggers."""
-        old_total = self._byte_counter.total()
-        self._byte_counter.add(chunk)
-        new_total = self._byte_counter.total()
-        
-        # Check if any byte thresholds were crossed
-        for threshold, callback in self._byte_thresholds[:]:  # Copy list to allow modification
-            if old_total < threshold <= new_total:
-                callback()
-                # Remove triggered threshold to prevent multiple firing
-                self._byte_thresholds.remove((threshold, callback))
+        """Add bytes to counter and check for threshold and token triggers."""
+        # Count first, so a token fire sees bytes_sent() include its chunk
+        self.add_byte_count(len(chunk))
+        if self._token_watches:
+            self.scan_tokens(chunk)
+
+    def add_byte_count(self, n: int) -> None:
+        """Like add_bytes() when only the number of bytes is known.
+
+        O(1) unless a threshold is crossed; k crossed thresholds cost O(k log n).
+        """
+        new_total = self._byte_counter.add_count(n)
+        m = self._metrics
+        if m is not None:
+            m.chunks.observe(n)
+        if new_total < self._next_threshold:
+            return
+        self._fire_thresholds(new_total)
+
+    def _fire_thresholds(self, total: int) -> None:
+        """Pop and run every pending threshold at or below total.
+
+        Thresholds already passed are refused when registered, so any found
+        here were crossed by this count or by one that raced with their
+        registration; either way they are due.  Popping under the lock makes
+        sure each fires once.
+        """
+        fired = []
+        with self._threshold_lock:
+            heap = self._byte_thresholds
+            while heap and heap[0][0] <= total:
+                fired.append(heapq.heappop(heap)[2])
+            self._next_threshold = heap[0][0] if heap else math.inf
+
+        # Callbacks run outside the lock so they may register new thresholds
+        for callback in fired:
+            callback()
 
     def add_token(self, token: str) -> None:
         """Mark token as seen (call this when token appears)."""
-        self._tokens_seen.add(token)
+        with self._token_lock:
+            self._tokens_seen.add(token)
+            callbacks = self._token_watches.pop(token, [])
+            if callbacks:
+                self._token_matcher.remove(token)
+        if not callbacks:
+            return
+        self._cause.token = token
+        try:
+            for callback in callbacks:
+                callback()
+        finally:
+            self._cause.token = None
 
-    def set_fire_callback(self, callback: Callable[[], None]) -> None:
-        """Set what happens when fire() is called."""
+    def add_token_watch(self, token: str, callback: Callable[[], None]) -> None:
+        """Register a callback to fire as soon as token appears in the stream.
+
+        Fires immediately if the token has already been seen.
+        """
+        with self._token_lock:
+            if token not in self._tokens_seen:
+                self._token_watches.setdefault(token, []).append(callback)
+                self._token_matcher.add(token)
+                return
+        callback()
+
+    def remove_token_watch(self, token: str, callback: Callable[[], None]) -> bool:
+        """Unregister a watch added with add_token_watch(); False if it is not waiting."""
+        with self._token_lock:
+            callbacks = self._token_watches.get(token)
+            if not callbacks or callback not in callbacks:
+                return False
+            callbacks.remove(callback)
+            if not callbacks:
+                del self._token_watches[token]
+                self._token_matcher.remove(token)
+            return True
+
+    def scan_tokens(self, chunk: bytes) -> None:
+        """Scan stream data for watched tokens, firing their callbacks on a match."""
+        with self._token_lock:
+            found = self._token_matcher.feed(chunk)
+        for token in found:
+            self.add_token(token)
+
+    # Progress
+    def set_input_size(self, total: int) -> None:
+        """Declare how many input bytes make up the whole job."""
+        with self._progress_lock:
+            self._input_total = total
+        self._check_progress()
+
+    def input_size(self) -> Optional[int]:
+        """Total input size, or None if unknown."""
+        return self._input_total
+
+    def add_input_bytes(self, n: int) -> None:
+        """Count n more input bytes consumed by the node (O(1) unless a watch is due)."""
+        if self._input_counter.add_count(n) >= self._next_progress:
+            self._check_progress()
+
+    def set_input_consumed(self, consumed: int) -> None:
+        """Set the consumed input to an absolute count (for samplers)."""
+        if self._input_counter.set(consumed) >= self._next_progress:
+            self._check_progress()
+
+    def input_consumed(self) -> int:
+        """Input bytes consumed so far."""
+        return self._input_counter.total()
+
+    def progress(self) -> Optional[float]:
+        """Fraction of the input consumed, or None while the input size is unknown."""
+        total = self._input_total
+        if total is None:
+            return None
+        if total <= 0:
+            return 1.0
+        return min(1.0, self._input_counter.total() / total)
+
+    def add_progress_watch(self, fraction: float, callback: Callable[[], None]) -> None:
+        """Register a callback to fire once progress() reaches fraction.
+
+        Fires immediately if it already has; waits for set_input_size() if
+        the input size is not known yet.
+        """
+        with self._progress_lock:
+            heapq.heappush(self._progress_watches, (fraction, next(self._progress_seq), callback))
+        self._check_progress()
+
+    def remove_progress_watch(self, fraction: float, callback: Callable[[], None]) -> bool:
+        """Unregister a watch added with add_progress_watch(); False if it is not waiting."""
+        with self._progress_lock:
+            if not _heap_remove(self._progress_watches, fraction, callback):
+                return False
+        self._check_progress()  # recomputes _next_progress
+        return True
+
+    def progress_target(self) -> Optional[int]:
+        """Consumed-byte count at which the next progress watch fires, if any.
+
+        Samplers use it to sample faster as the target gets close.
+        """
+        target = self._next_progress
+        return None if target == math.inf else int(target)
+
+    def _check_progress(self) -> None:
+        fired = []
+        with self._progress_lock:
+            heap = self._progress_watches
+            total = self._input_total
+            if total is not None:
+                consumed = self._input_counter.total()
+                while heap and math.ceil(heap[0][0] * total) <= consumed:
+                    fired.append(heapq.heappop(heap)[2])
+            self._next_progress = (
+                math.ceil(heap[0][0] * total) if heap and total is not None else math.inf
+            )
+        for callback in fired:
+            callback()
+
+    def watches_tokens(self) -> bool:
+        """True while any token watch is still waiting for its token."""
+        return bool(self._token_watches)
+
+    def watched_tokens(self) -> frozenset[str]:
+        """Snapshot of the tokens whose watches are still waiting."""
+        with self._token_lock:
+            return frozenset(self._token_watches)
+
+    def set_fire_callback(self, callback: Callable[[], None], action: Optional[str] = None) -> None:
+        """Set what happens when fire() is called.
+
+        action names it in traces (see frac.trace.ACTIONS); by default the
+        callback's __name__ is used, e.g. "kill" for node.kill.
+        """
         self._fire_callback = callback
+        self._fire_action = action
     
     def add_byte_threshold(self, threshold: int, callback: Callable[[], None]) -> None:
         """Register a callback to fire immediately when byte count reaches threshold."""
-        self._byte_thresholds.append((threshold, callback)) 
\ No newline at end of file
+        with self._threshold_lock:
+            if threshold <= self._byte_counter.total():
+                return  # already passed; such thresholds never fire
+            heapq.heappush(
+                self._byte_thresholds, (threshold, next(self._threshold_seq), callback)
+            )
+            self._next_threshold = self._byte_thresholds[0][0]
+        # A concurrent add_byte_count() may have passed threshold before it
+        # could see it in _next_threshold; then it is up to us to fire it
+        total = self._byte_counter.total()
+        if total >= threshold:
+            self._fire_thresholds(total)
+
+    def remove_byte_threshold(self, threshold: int, callback: Callable[[], None]) -> bool:
+        """Unregister a threshold added with add_byte_threshold(); False if it is not pending."""
+        with self._threshold_lock:
+            if not _heap_remove(self._byte_thresholds, threshold, callback):
+                return False
+            heap = self._byte_thresholds
+            self._next_threshold = heap[0][0] if heap else math.inf
+            return True
+
+    def bytes_until_threshold(self) -> Optional[int]:
+        """Bytes left before the next pending threshold fires, or None if none is armed.
+
+        Streaming hooks use this to cap reads so a chunk never crosses a threshold.
+        """
+        remaining = self._next_threshold - self._byte_counter.total()
+        if remaining == math.inf or remaining <= 0:
+            # Nothing armed, or a concurrent add_byte_count() is firing it now
+            return None
+        return int(remaining) 
\ No newline at end of file
@@ -0,0 +1,288 @@
+"""Local pipelines: many LocalProcessNodes pumped by one selector loop.
+
+``frac byte-kill`` wraps one command and costs a Python process and two
+threads per stage.  A Pipeline wires N stages together (frac's input ->
+stage 0 -> stage 1 -> ... -> frac's output) and moves every byte between
+them from a single ``selectors`` (epoll) loop over non-blocking fds, so a
+wide pipeline costs one process and one thread however many stages it has.
+
+Each stage's output is counted by its own LocalStreamingHooks, so byte
+thresholds are per stage, and a kill rule names the stage whose output is
+counted and the stage (by index, from 0) that is killed.  Reads are capped
+at the next threshold, so kills land on the exact byte as with byte-kill.
+
+A killed stage behaves like a crashed process in a shell pipeline: the
+next stage sees EOF once the data already read has been delivered, and
+the previous stage gets EPIPE/SIGPIPE on its next write.
+"""
+
+from __future__ import annotations
+
+import os
+import selectors
+import stat
+import subprocess
+from dataclasses import dataclass
+from typing import List, Optional
+
+from .api import ByteEvent, _ScopedHooks
+from .local import (
+    DEFAULT_CHUNK_SIZE,
+    DEFAULT_KILL_TIMEOUT,
+    LocalFrac,
+    LocalProcessNode,
+    LocalStreamingHooks,
+    ProcessGroupNode,
+)
+
+
+@dataclass
+class KillRule:
+    """Kill stage ``target`` once stage ``stage`` has written ``bytes_out`` bytes."""
+
+    stage: int
+    bytes_out: int
+    target: Optional[int] = None  # defaults to stage
+
+    @classmethod
+    def parse(cls, spec: str) -> "KillRule":
+        """Parse ``STAGE:BYTES[:TARGET]``, e.g. ``"2:1000000"`` or ``"0:5000:3"``."""
+        parts = spec.split(":")
+        if len(parts) not in (2, 3):
+            raise ValueError(f"kill rule must be STAGE:BYTES[:TARGET], got {spec!r}")
+        stage, bytes_out = int(parts[0]), int(parts[1])
+        target = int(parts[2]) if len(parts) == 3 else None
+        return cls(stage, bytes_out, target)
+
+
+class _Link:
+    """One hop: bytes read from src are written to dst."""
+
+    __slots__ = ("name", "src", "dst", "src_file", "dst_file", "hooks", "pending", "eof", "broken", "alive")
+
+    def __init__(self, name, src, dst, src_file, dst_file, hooks) -> None:
+        self.name = name
+        self.src: Optional[int] = src
+        self.dst: Optional[int] = dst
+        self.src_file = src_file  # stage stdout (None for frac's input)
+        self.dst_file = dst_file  # stage stdin (None for frac's output)
+        self.hooks: Optional[LocalStreamingHooks] = hooks  # counts what src produces
+        self.pending = memoryview(b"")
+        self.eof = False
+        self.broken = False  # dst refused data (EPIPE)
+        self.alive = True
+
+
+def _is_regular(fd: int) -> bool:
+    try:
+        return stat.S_ISREG(os.fstat(fd).st_mode)
+    except OSError:
+        return False
+
+
+class Pipeline:
+    """N local commands connected in series and pumped from one loop."""
+
+    def __init__(
+        self,
+        cmds: List[List[str]],
+        process_group: bool = False,
+        kill_timeout: float = DEFAULT_KILL_TIMEOUT,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> None:
+        if not cmds:
+            raise ValueError("a pipeline needs at least one stage")
+        node_cls = ProcessGroupNode if process_group else LocalProcessNode
+        self.nodes = [node_cls(cmd, kill_timeout=kill_timeout) for cmd in cmds]
+        self.hooks = [LocalStreamingHooks(node) for node in self.nodes]
+        self.chunk_size = chunk_size
+        self.killed: List[Optional[int]] = [None] * len(cmds)  # bytes out at kill
+        self._frac = LocalFrac()
+
+    def add_kill(self, rule: KillRule) -> None:
+        """Arm a kill rule (before run())."""
+        target = rule.stage if rule.target is None else rule.target
+        for index in (rule.stage, target):
+            if not 0 <= index < len(self.nodes):
+                raise ValueError(f"no stage {index} (stages are 0..{len(self.nodes) - 1})")
+
+        def kill() -> None:
+            if self.killed[target] is None:
+                self.killed[target] = self.hooks[target].bytes_sent()
+            self.nodes[target].kill()
+
+        # A scoped proxy per rule, so several rules can share one stage's hooks
+        self._frac.inject(
+            self.nodes[target], ByteEvent(rule.bytes_out), _ScopedHooks(self.hooks[rule.stage], kill)
+        )
+
+    def run(self, input_fd: int = 0, output_fd: int = 1) -> None:
+        """Start every stage and pump until all data has flowed through."""
+        for node in self.nodes:
+            node.start()
+        links = [_Link("input", input_fd, None, None, None, None)]
+        for i, node in enumerate(self.nodes):
+            proc = node.proc
+            assert proc is not None and proc.stdin is not None and proc.stdout is not None
+            links[-1].dst = proc.stdin.fileno()
+            links[-1].dst_file = proc.stdin
+            links.append(_Link(f"stage {i}", proc.stdout.fileno(), None, proc.stdout, None, self.hooks[i]))
+        links[-1].dst = output_fd
+
+        restore = {}
+        for fd in (input_fd, output_fd):
+            restore[fd] = os.get_blocking(fd)
+        try:
+            for link in links:
+                os.set_blocking(link.src, False)  # type: ignore[arg-type]
+                os.set_blocking(link.dst, False)  # type: ignore[arg-type]
+            self._loop(links)
+            # Every output reached EOF: let the stages exit on their own
+            # before stop() would SIGTERM them
+            for node in self.nodes:
+                if node.proc is not None:
+                    try:
+                        node.proc.wait(timeout=node.kill_timeout)
+                    except subprocess.TimeoutExpired:
+                        pass
+        finally:
+            for fd, blocking in restore.items():
+                try:
+                    os.set_blocking(fd, blocking)
+                except OSError:
+                    pass
+            for node in self.nodes:
+                node.stop()
+
+    def _loop(self, links: List[_Link]) -> None:
+        sel = selectors.DefaultSelector()
+        registered: dict[int, int] = {}  # fd -> events
+        # Regular files cannot be polled; they are always ready
+        always = {fd for link in links for fd in (link.src, link.dst) if _is_regular(fd)}
+
+        def want(fd: Optional[int], events: int, link: _Link) -> None:
+            if fd is None or fd in always:
+                return
+            if registered.get(fd) == events:
+                return
+            if fd in registered:
+                sel.unregister(fd)
+                del registered[fd]
+            if events:
+                sel.register(fd, events, link)
+                registered[fd] = events
+
+        def drop(fd: Optional[int]) -> None:
+            if fd is not None and fd in registered:
+                sel.unregister(fd)  # ignores fds a kill has already closed
+                del registered[fd]
+
+        live = list(links)
+        try:
+            while live:
+                for link in live:
+                    want(link.src, 0 if link.pending or link.eof else selectors.EVENT_READ, link)
+                    want(link.dst, selectors.EVENT_WRITE if link.pending else 0, link)
+                ready = [
+                    link for link in live
+                    if (link.src in always and not link.pending and not link.eof)
+                    or (link.dst in always and link.pending)
+                ]
+                events = sel.select(0 if ready else None)
+                for link in ready + [key.data for key, _ in events]:
+                    if link.alive:
+                        self._step(link)
+                    # A fire may have closed other stages' pipes: settle all links
+                    for other in live:
+                        if other.alive:
+                            self._settle(other, drop)
+                live = [link for link in live if link.alive]
+        finally:
+            sel.close()
+
+    def _step(self, link: _Link) -> None:
+        """Read from src if there is room, then write what is pending."""
+        if not link.pending and not link.eof and not _closed(link.src_file):
+            limit = self.chunk_size
+            if link.hooks is not None:
+                remaining = link.hooks.bytes_until_threshold()
+                if remaining is not None and remaining < limit:
+                    limit = remaining
+            try:
+                data = os.read(link.src, limit)  # type: ignore[arg-type]
+            except BlockingIOError:
+                data = None
+            except OSError:
+                data = b""
+            if data == b"":
+                link.eof = True
+            elif data:
+                link.pending = memoryview(data)
+                if link.hooks is not None:
+                    # May fire a kill rule, closing some stage's pipes
+                    link.hooks.add_bytes(data)
+        if link.pending and not _closed(link.dst_file):
+            try:
+                n = os.write(link.dst, link.pending)  # type: ignore[arg-type]
+                link.pending = link.pending[n:]
+            except BlockingIOError:
+                pass
+            except OSError:
+                # Downstream is gone; _settle passes that upstream
+                link.broken = True
+
+    def _settle(self, link: _Link, drop) -> None:
+        """Retire links whose ends were closed by a kill or that are done."""
+        if link.broken or _closed(link.dst_file):
+            # The stage this link feeds was killed or has exited: like a
+            # shell pipe, close upstream's output so it gets EPIPE too
+            drop(link.dst)
+            self._close_dst(link)
+            link.pending = memoryview(b"")
+            drop(link.src)
+            self._close_src(link)
+        elif _closed(link.src_file) and not link.eof:
+            # The stage this link drains was killed; deliver what was read
+            drop(link.src)
+            link.src = None
+            link.eof = True
+        if link.eof and not link.pending:
+            drop(link.src)
+            drop(link.dst)
+            self._close_dst(link)  # downstream sees EOF now
+            if link.hooks is not None:
+                link.hooks.node.note_eof()
+            link.alive = False
+        elif link.dst is None:
+            link.alive = False
+
+    def _close_src(self, link: _Link) -> None:
+        if link.src_file is not None and not link.src_file.closed:
+            link.src_file.close()
+        link.src = None
+        link.eof = True
+
+    def _close_dst(self, link: _Link) -> None:
+        if link.dst_file is not None and not link.dst_file.closed:
+            try:
+                link.dst_file.close()
+            except OSError:
+                pass
+        link.dst = None
+
+    def summary(self) -> List[dict]:
+        """Per-stage bytes out, kill offset and exit status (after run())."""
+        return [
+            {
+                "stage": i,
+                "cmd": node.cmd,
+                "bytes_out": hooks.bytes_sent(),
+                "killed_at": self.killed[i],
+                "returncode": node.proc.returncode if node.proc else None,
+            }
+            for i, (node, hooks) in enumerate(zip(self.nodes, self.hooks))
+        ]
+
+
+def _closed(file) -> bool:
+    return file is not None and file.closed
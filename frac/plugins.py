@@ -0,0 +1,207 @@
+"""Plugin lookup and loading for the frac CLI.
+
+``--plugin`` accepts a path to a plugin file (as before), a name from the
+plugin registry file, or the name of a ``frac.plugins`` entry point.  The
+registry (``$FRAC_PLUGIN_REGISTRY``, default
+``~/.config/frac/plugins.json``) maps names to a file path or an importable
+module::
+
+    {"plugins": {"http": "/srv/frac/http_plugin.py", "k8s": "acme.frac_k8s"}}
+
+Lookups are lazy: the registry is read, and entry points are scanned, only
+when a subcommand actually needs a plugin and only as far as needed.  The
+entry-point scan and the compiled code of plugin files are cached under
+``$FRAC_CACHE_DIR`` (default ``~/.cache/frac``) and revalidated by mtime,
+so repeated ``frac inject`` calls skip both the scan and the compile.
+"""
+
+from __future__ import annotations
+
+import marshal
+import os
+import sys
+import time
+import zlib
+from types import ModuleType
+from typing import Dict, Optional
+
+ENTRY_POINT_GROUP = "frac.plugins"
+REQUIRED = ("create_node", "create_hooks", "create_frac")
+
+# Plugins loaded by this process, keyed by resolved target
+_loaded: Dict[str, ModuleType] = {}
+
+# Filled in by load() for ``frac --profile-startup``
+last_load: Dict[str, object] = {}
+
+
+class PluginError(RuntimeError):
+    """Raised when a plugin cannot be found, loaded or is incomplete."""
+
+
+def registry_path() -> str:
+    config = os.environ.get("XDG_CONFIG_HOME") or os.path.expanduser("~/.config")
+    return os.environ.get("FRAC_PLUGIN_REGISTRY") or os.path.join(config, "frac", "plugins.json")
+
+
+def cache_dir() -> str:
+    cache = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.environ.get("FRAC_CACHE_DIR") or os.path.join(cache, "frac")
+
+
+def read_registry() -> Dict[str, str]:
+    """Name -> target mapping from the registry file (empty if there is none)."""
+    import json
+
+    try:
+        with open(registry_path()) as f:
+            return dict(json.load(f).get("plugins", {}))
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError, AttributeError) as e:
+        raise PluginError(f"bad plugin registry {registry_path()}: {e}") from None
+
+
+def write_registry(plugins: Dict[str, str]) -> None:
+    import json
+
+    path = registry_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    _atomic_write(path, json.dumps({"plugins": plugins}, indent=2, sort_keys=True).encode())
+
+
+def entry_points() -> Dict[str, str]:
+    """Name -> module of installed ``frac.plugins`` entry points (cached)."""
+    import json
+
+    signature = [
+        [entry, os.stat(entry).st_mtime_ns] for entry in sys.path if entry and os.path.isdir(entry)
+    ]
+    cache = os.path.join(cache_dir(), "entry_points.json")
+    try:
+        with open(cache) as f:
+            cached = json.load(f)
+        if cached.get("signature") == signature:
+            return cached["plugins"]
+    except (OSError, ValueError, KeyError):
+        pass
+
+    from importlib.metadata import entry_points as scan
+
+    plugins = {ep.name: ep.value for ep in scan(group=ENTRY_POINT_GROUP)}
+    try:
+        os.makedirs(cache_dir(), exist_ok=True)
+        _atomic_write(cache, json.dumps({"signature": signature, "plugins": plugins}).encode())
+    except OSError:
+        pass
+    return plugins
+
+
+def resolve(ref: str) -> str:
+    """Turn a --plugin argument into a file path or a module name."""
+    if ref.endswith(".py") or os.sep in ref or os.path.exists(ref):
+        return os.path.abspath(ref)
+    registry = read_registry()
+    if ref in registry:
+        return registry[ref]
+    found = entry_points()
+    if ref in found:
+        return found[ref]
+    raise PluginError(f"plugin not found: {ref} (not a file, registry name or entry point)")
+
+
+def load(ref: str) -> ModuleType:
+    """Resolve and load a plugin once per process, checking its factories."""
+    start = time.perf_counter()
+    target = resolve(ref)
+    cached = target in _loaded
+    compiled = None
+    if not cached:
+        if target.endswith(".py") or os.sep in target:
+            plugin, compiled = _load_file(target)
+        else:
+            plugin = _load_module(target)
+        missing = [name for name in REQUIRED if not hasattr(plugin, name)]
+        if missing:
+            raise PluginError(f"plugin {ref} missing required function: {', '.join(missing)}")
+        _loaded[target] = plugin
+    last_load.update(
+        ref=ref, target=target, seconds=time.perf_counter() - start,
+        reused=cached, compiled=compiled,
+    )
+    return _loaded[target]
+
+
+def _load_module(target: str) -> ModuleType:
+    import importlib
+
+    module_name, _, attr = target.partition(":")
+    try:
+        plugin = importlib.import_module(module_name)
+    except ImportError as e:
+        raise PluginError(f"cannot import plugin {module_name}: {e}") from None
+    return getattr(plugin, attr) if attr else plugin
+
+
+def _load_file(path: str) -> tuple[ModuleType, bool]:
+    """Execute a plugin file; also returns whether it had to be compiled."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        raise PluginError(f"plugin file not found: {path}") from None
+
+    try:
+        code, compiled = _cached_code(path, st)
+    except (OSError, SyntaxError, ValueError) as e:
+        raise PluginError(f"cannot compile plugin {path}: {e}") from None
+    # Same-named plugins in different directories must not share a module
+    name = f"frac_plugin_{_stem(path)}_{_path_hash(path)}"
+    module = ModuleType(name)
+    module.__file__ = path
+    # Registered so dataclasses, pickling etc. can find the plugin module
+    sys.modules[name] = module
+    try:
+        exec(code, module.__dict__)
+    except Exception as e:
+        del sys.modules[name]
+        raise PluginError(f"cannot load plugin {path}: {type(e).__name__}: {e}") from None
+    return module, compiled
+
+
+def _stem(path: str) -> str:
+    return os.path.splitext(os.path.basename(path))[0].replace("-", "_").replace(".", "_")
+
+
+def _path_hash(path: str) -> str:
+    return f"{zlib.crc32(path.encode()):08x}"
+
+
+def _cached_code(path: str, st: os.stat_result):
+    """Code object for a plugin file, from the compile cache when still valid."""
+    # Marshal data is only valid for the interpreter version that wrote it
+    header = sys.hexversion.to_bytes(4, "little") + st.st_mtime_ns.to_bytes(8, "little") + st.st_size.to_bytes(8, "little")
+    cache = os.path.join(cache_dir(), "plugins", f"{_stem(path)}-{_path_hash(path)}.pyc")
+    try:
+        with open(cache, "rb") as f:
+            data = f.read()
+        if data.startswith(header):
+            return marshal.loads(data[len(header):]), False
+    except (OSError, ValueError, EOFError, TypeError):
+        pass
+
+    with open(path, "rb") as f:
+        code = compile(f.read(), path, "exec", dont_inherit=True)
+    if not os.environ.get("FRAC_NO_CACHE"):
+        try:
+            os.makedirs(os.path.dirname(cache), exist_ok=True)
+            _atomic_write(cache, header + marshal.dumps(code))
+        except OSError:
+            pass
+    return code, True
+
+
+def _atomic_write(path: str, data: bytes) -> None:
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
@@ -0,0 +1,288 @@
+"""Linux /proc readers that feed hooks from kernel counters.
+
+ProcIOProgress samples ``/proc/<pid>/io`` of a node's process and reports
+the bytes it has read as consumed input, so ProgressEvent works for
+commands that open their input themselves (``sort big.txt``) rather than
+reading it from frac's pump.  ProcHooks is a RuntimeHooks backend whose
+bytes_sent() is such a counter: what a process has written
+(``/proc/<pid>/io``) or what an interface has transmitted
+(``/proc/net/dev``), so ByteEvent works on worker processes frac does not
+pump, e.g. in plugins.
+
+Sampling is adaptive: while a watch or threshold is pending the next
+sample is due at half the estimated time to reach it, clamped to
+[min_interval, max_interval], so the fault lands within about
+``min_interval`` worth of IO of its target while an idle wait costs a few
+reads per second.  Nothing is sampled while nothing is pending; arming a
+threshold on ProcHooks restarts it, and ProcIOProgress.kick() does the
+same after arming a progress watch.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .observers import BaseRuntimeHooks, TimerScheduler
+
+
+def read_proc_io(pid: int) -> Dict[str, int]:
+    """Counters of /proc/<pid>/io (rchar, wchar, read_bytes, write_bytes, ...)."""
+    with open(f"/proc/{pid}/io", "rb") as f:
+        data = f.read()
+    counters = {}
+    for line in data.splitlines():
+        key, _, value = line.partition(b":")
+        counters[key.decode()] = int(value)
+    return counters
+
+
+def read_net_dev(pid: Optional[int] = None) -> Dict[str, Tuple[int, int]]:
+    """(rx_bytes, tx_bytes) per interface from /proc/net/dev.
+
+    With pid, the interfaces of that process's network namespace
+    (``/proc/<pid>/net/dev``), e.g. a container's eth0.
+    """
+    path = "/proc/net/dev" if pid is None else f"/proc/{pid}/net/dev"
+    with open(path, "rb") as f:
+        data = f.read()
+    counters = {}
+    for line in data.splitlines()[2:]:  # two header lines
+        name, _, fields = line.partition(b":")
+        values = fields.split()
+        # 8 receive columns (bytes first), then 8 transmit columns
+        counters[name.strip().decode()] = (int(values[0]), int(values[8]))
+    return counters
+
+
+class _AdaptiveSampler:
+    """Calls sample() on a timer, faster as its count nears target().
+
+    sample() returns the current count, or None while the source cannot
+    be read; target() returns the count that matters next, or None when
+    nothing is pending.  An unreadable source (a worker restarting, its
+    pid file missing) is retried every max_interval while something is
+    pending; sampling stops when nothing is, until kick(), or on stop().
+    """
+
+    def __init__(
+        self,
+        call_later: Callable[[float, Callable[[], None]], Any],
+        sample: Callable[[], Optional[int]],
+        target: Callable[[], Optional[int]],
+        min_interval: float,
+        max_interval: float,
+    ) -> None:
+        self.call_later = call_later
+        self.sample = sample
+        self.target = target
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self._last: Optional[tuple[float, int]] = None  # (time, count) of last sample
+        self._idle = min_interval  # backoff while the count does not move
+        self._scheduled = False
+        self._stopped = False
+        self._lock = threading.Lock()
+
+    def kick(self) -> None:
+        """Sample now and keep sampling while something is pending."""
+        with self._lock:
+            if self._scheduled or self._stopped:
+                return
+            self._scheduled = True
+        self.call_later(0, self._run)
+
+    def stop(self) -> None:
+        self._stopped = True
+
+    def resume(self) -> None:
+        self._stopped = False
+        self.kick()
+
+    def _run(self) -> None:
+        with self._lock:
+            self._scheduled = False
+            if self._stopped:
+                return
+        count = self.sample()
+        target = self.target()
+        if target is None:
+            self._last = None
+            return  # nothing left to wait for
+        if count is None:
+            self._last = None
+            interval = self.max_interval  # retry until the source is back
+        else:
+            interval = self._interval(count, target)
+        with self._lock:
+            if self._scheduled or self._stopped:
+                return  # a kick() got in first
+            self._scheduled = True
+        self.call_later(interval, self._run)
+
+    def _interval(self, count: int, target: int) -> float:
+        """Half the estimated time to target, clamped; backs off while idle."""
+        now = time.monotonic()
+        then, before = self._last or (now, count)
+        self._last = (now, count)
+        rate = (count - before) / (now - then) if now > then else 0.0
+        if rate > 0:
+            interval = (target - count) / rate / 2
+            interval = min(self.max_interval, max(self.min_interval, interval))
+            self._idle = self.min_interval
+        else:
+            self._idle = min(self.max_interval, self._idle * 2)
+            interval = self._idle
+        return interval
+
+
+class ProcIOProgress:
+    """Report a process's read bytes as the consumed input of hooks.
+
+    ``field`` is the /proc/<pid>/io counter to use: ``rchar`` (bytes
+    returned by read(2) and friends, cached or not) or ``read_bytes``
+    (bytes fetched from storage).  Counting starts from the value at
+    start(), and the hooks must know the input size (set_input_size).
+    """
+
+    def __init__(
+        self,
+        hooks: Any,
+        pid: int,
+        field: str = "rchar",
+        min_interval: float = 0.001,
+        max_interval: float = 0.25,
+    ) -> None:
+        self.hooks = hooks
+        self.pid = pid
+        self.field = field
+        self.samples = 0
+        self._baseline = 0
+        self._sampler = _AdaptiveSampler(
+            hooks.call_later, self.sample, hooks.progress_target, min_interval, max_interval
+        )
+
+    def start(self) -> "ProcIOProgress":
+        """Take the baseline and begin sampling."""
+        self._baseline = read_proc_io(self.pid)[self.field]
+        self._sampler.resume()
+        return self
+
+    def stop(self) -> None:
+        self._sampler.stop()
+
+    def kick(self) -> None:
+        """Resume sampling, e.g. after arming a new watch."""
+        self._sampler.kick()
+
+    def sample(self) -> Optional[int]:
+        """Read the counter once and report it; None if the process is gone."""
+        try:
+            value = read_proc_io(self.pid)[self.field]
+        except (OSError, KeyError, ValueError):
+            return None
+        self.samples += 1
+        consumed = value - self._baseline
+        self.hooks.set_input_consumed(consumed)
+        return consumed
+
+
+class ProcHooks(BaseRuntimeHooks):
+    """RuntimeHooks whose bytes_sent() is a sampled kernel byte counter.
+
+    ``read`` returns the counter's current absolute value; bytes_sent()
+    counts from its value when the hooks were created.  If the counter
+    goes backwards (the process was restarted, the interface re-created)
+    counting continues from the new value.  Byte thresholds fire from the
+    sampler, so a fault overshoots its target by at most what the source
+    moves in one interval: about ``min_interval`` worth of IO once the
+    rate is known, ``max_interval`` worth for a burst after a quiet spell.
+
+    Use for_pid() or for_interface() for the usual counters.
+    """
+
+    def __init__(
+        self,
+        read: Callable[[], int],
+        min_interval: float = 0.001,
+        max_interval: float = 0.05,
+        scheduler: Optional[TimerScheduler] = None,
+    ) -> None:
+        super().__init__(scheduler)
+        self._read = read
+        self.samples = 0
+        self._baseline: Optional[int] = None
+        self._counted = 0  # bytes handed to add_byte_count so far
+        self._sample_lock = threading.Lock()
+        self._sampler = _AdaptiveSampler(
+            self.call_later, self.sample, self._threshold_target, min_interval, max_interval
+        )
+        self.sample()  # baseline
+
+    @classmethod
+    def for_pid(cls, pid: Any, field: str = "wchar", **kwargs: Any) -> "ProcHooks":
+        """Count a process's /proc/<pid>/io ``field``.
+
+        ``wchar`` (the default) is every byte passed to write(2), send(2)
+        and friends, so it includes what the process sends on its sockets
+        and pipes; ``write_bytes`` is only what reaches storage.  pid may
+        be a callable returning the current pid, e.g. read from a pid
+        file, to follow a worker across restarts.
+        """
+        get_pid = pid if callable(pid) else lambda: pid
+        return cls(lambda: read_proc_io(get_pid())[field], **kwargs)
+
+    @classmethod
+    def for_interface(
+        cls, name: str, direction: str = "tx", pid: Any = None, **kwargs: Any
+    ) -> "ProcHooks":
+        """Count bytes transmitted (``tx``) or received (``rx``) on interface name.
+
+        With pid (an int or a callable returning one), the interface is
+        looked up in that process's network namespace.
+        """
+        if direction not in ("rx", "tx"):
+            raise ValueError(f"direction must be 'rx' or 'tx', got {direction!r}")
+        column = 0 if direction == "rx" else 1
+        get_pid = pid if callable(pid) else lambda: pid
+        return cls(lambda: read_net_dev(get_pid())[name][column], **kwargs)
+
+    def bytes_sent(self) -> int:
+        """Bytes the counter has moved since the hooks were created (sampled now)."""
+        self.sample()
+        return self._byte_counter.total()
+
+    def sample(self) -> Optional[int]:
+        """Read the counter once and count its progress; None if it cannot be read."""
+        try:
+            value = self._read()
+        except (OSError, KeyError, ValueError, IndexError):
+            return None
+        with self._sample_lock:
+            self.samples += 1
+            if self._baseline is None or value < self._baseline + self._counted:
+                self._baseline = value - self._counted  # first sample, or counter reset
+            delta = value - self._baseline - self._counted
+            self._counted += delta
+            counted = self._counted
+        if delta:
+            self.add_byte_count(delta)  # fires crossed thresholds
+        return counted
+
+    def add_byte_threshold(self, threshold: int, callback: Callable[[], None]) -> None:
+        """Register a threshold and make sure the sampler is running."""
+        super().add_byte_threshold(threshold, callback)
+        self._sampler.kick()
+
+    def stop(self) -> None:
+        """Stop sampling; pending thresholds no longer fire.
+
+        Like pending timers, a pending threshold keeps sampling (and so the
+        process) alive, even while the counter cannot be read.
+        """
+        self._sampler.stop()
+
+    def _threshold_target(self) -> Optional[int]:
+        remaining = self.bytes_until_threshold()
+        return None if remaining is None else self._byte_counter.total() + remaining
@@ -18,7 +18,7 @@ import sys
 from typing import Any, Dict
 
 from frac.api import Node, Frac, RuntimeHooks, Event
-from frac.observers import BaseRuntimeHooks
+from frac.procfs import ProcHooks
 
 
 # ===========================================================================
@@ -71,29 +71,36 @@ class MyCustomNode(Node):
 # ===========================================================================
 # TODO 2: Define your RuntimeHooks class 
 # ===========================================================================
-class MyCustomHooks(BaseRuntimeHooks):
+class MyCustomHooks(ProcHooks):
     """
     TODO: Implement RuntimeHooks for monitoring your node's state.
     
-    The base class provides timer functionality and basic byte/token tracking.
-    You need to override the metrics methods to query your actual systems.
+    The base classes provide timers, token tracking and byte thresholds.
+    ProcHooks samples read_counter() below, faster as a ByteEvent's
+    threshold gets close, so you only say where the byte count comes from.
+    For a process or network interface on this host you need no subclass:
+    use ProcHooks.for_pid(pid) or ProcHooks.for_interface("eth0").
     """
     
     def __init__(self, node: MyCustomNode) -> None:
-        super().__init__()
-        self.node = node
+        self.node = node  # before super(): it takes the first sample
+        # Remote queries cost more than /proc reads: sample every 20 ms to 1 s
+        super().__init__(self.read_counter, min_interval=0.02, max_interval=1.0)
         # Set what happens when fire() is called
         self.set_fire_callback(node.kill)
     
-    def bytes_sent(self) -> int:
+    def read_counter(self) -> int:
         """
-        TODO: Return how many bytes this node has sent.
+        TODO: Return a running total of bytes this node has sent.
+        
+        Any counter that only grows will do; bytes_sent() counts from its
+        value when the hooks were created.  Raise OSError (or return the
+        last value) while it cannot be read.
         
         Examples:
         - Query Prometheus metrics
-        - Parse log files  
         - Call REST API on the node
-        - Read /proc/net/dev on Linux
+        - Parse `ssh HOST cat /proc/net/dev` (tx bytes are the 9th number)
         """
         # Example: Prometheus query
         # import requests
@@ -108,20 +115,18 @@ class MyCustomHooks(BaseRuntimeHooks):
         """
         TODO: Check if a specific token has appeared in the node's output.
         
-        Examples:
-        - Check log files for the token
-        - Query a message queue
-        - Check a shared file system
-        """
-        # Example: Check log file
-        # try:
-        #     with open(f"/logs/{self.node.node_id}.log", "r") as f:
-        #         return token in f.read()
-        # except FileNotFoundError:
-        #     return False
+        While this method is overridden TokenEvent polls it every 50 ms.
+        Pushing tokens in is cheaper and fires at once: delete this method
+        and call self.add_token(token) when the token appears, e.g.
         
+        - Log file readable from this host (local, shared file system):
+          follow it from __init__, scanning only appended bytes
+              from frac.logtail import LogTail
+              self.log_tail = LogTail(self, [f"/logs/{node.node_id}.log"])
+        - Message queue: call self.add_token(token) for each message
+        """
         # TODO: Replace with your actual token detection
-        return False
+        return super().seen_token(token)
 
 
 # ===========================================================================
@@ -0,0 +1,70 @@
+"""The asyncio pump counts input like the thread-based one."""
+
+import asyncio
+import warnings
+
+from frac.aio import AsyncProcessNode, AsyncStreamingHooks
+
+
+class _Sink:
+    def __init__(self):
+        self.data = bytearray()
+
+    def write(self, chunk):
+        self.data += chunk
+
+    async def drain(self):
+        pass
+
+
+def _child_watcher():
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        try:
+            return asyncio.get_event_loop_policy().get_child_watcher()
+        except (AttributeError, NotImplementedError):
+            return None
+
+
+def test_pump_counts_input_and_fires_progress():
+    payload = b"x" * 100_000
+    fired = []
+
+    async def main():
+        node = AsyncProcessNode(["cat"])
+        hooks = AsyncStreamingHooks(node)
+        hooks.set_input_size(len(payload))
+        hooks.add_progress_watch(0.5, lambda: fired.append(hooks.input_consumed()))
+        reader = asyncio.StreamReader()
+        reader.feed_data(payload)
+        reader.feed_eof()
+        sink = _Sink()
+        await node.start()
+        try:
+            await hooks.pump(reader, sink)
+        finally:
+            await node.stop()
+        return hooks, sink
+
+    hooks, sink = asyncio.run(main())
+    assert bytes(sink.data) == payload
+    assert hooks.input_consumed() == len(payload)
+    assert hooks.progress() == 1.0
+    assert len(fired) == 1 and fired[0] >= len(payload) // 2
+
+
+def test_node_leaves_child_watcher_policy_alone():
+    saved = asyncio.get_event_loop_policy()
+    asyncio.set_event_loop_policy(asyncio.DefaultEventLoopPolicy())
+    try:
+        before = _child_watcher()
+
+        async def main():
+            node = AsyncProcessNode(["true"])
+            await node.start()
+            await node.stop()
+
+        asyncio.run(main())
+        assert _child_watcher() is before
+    finally:
+        asyncio.set_event_loop_policy(saved)
@@ -0,0 +1,109 @@
+"""Campaign fire counting, and cancelled faults releasing their hooks."""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from frac.api import AnyOf, ByteEvent, DelayEvent, PoissonEvent, Repeat, Sequence, Timeout, TokenEvent
+from frac.campaign import Campaign, Fault, fire_bounds
+from frac.local import LocalFrac
+from frac.observers import BaseRuntimeHooks, TimerScheduler
+from frac.procfs import ProcHooks
+
+
+class _Node:
+    def kill(self):
+        pass
+
+    def resurrect(self):
+        pass
+
+
+class _Plugin:
+    def __init__(self, make_hooks):
+        self.make_hooks = make_hooks
+        self.hooks = []
+
+    def create_node(self, node_id):
+        return _Node()
+
+    def create_hooks(self, node):
+        hooks = self.make_hooks()
+        self.hooks.append(hooks)
+        return hooks
+
+    def create_frac(self):
+        return LocalFrac()
+
+
+def _wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.005)
+    return True
+
+
+def test_discarded_bytes_fault_stops_the_sampler():
+    scheduler = TimerScheduler()
+    plugin = _Plugin(lambda: ProcHooks(lambda: 0, scheduler=scheduler))
+    campaign = Campaign([], plugin_loader=lambda path: plugin)
+    fault = Fault(node="n", event=ByteEvent(1000), action="kill", plugin="p")
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        campaign.add(fault, pool)
+        hooks = plugin.hooks[0]
+        try:
+            assert hooks.bytes_until_threshold() == 1000
+            assert scheduler._thread is not None  # sampling towards the threshold
+
+            campaign.discard(fault)
+            assert hooks.bytes_until_threshold() is None
+            assert _wait_for(lambda: scheduler._thread is None)
+            assert scheduler.pending() == 0
+        finally:
+            hooks.stop()  # a leaked sampler would keep the test process alive
+
+
+def test_discarded_token_fault_drops_its_watch():
+    plugin = _Plugin(BaseRuntimeHooks)
+    campaign = Campaign([], plugin_loader=lambda path: plugin)
+    fault = Fault(node="n", event=TokenEvent("ready"), action="kill", plugin="p")
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        campaign.add(fault, pool)
+        hooks = plugin.hooks[0]
+        assert hooks.watched_tokens() == {"ready"}
+        campaign.discard(fault)
+        assert not hooks.watches_tokens()
+
+
+def _fault(event):
+    return Fault(node="1", event=event, action="kill", plugin="p")
+
+
+def test_expected_fires_follows_the_event_tree():
+    poisson = PoissonEvent(rate_per_s=100, count=3, seed=1)
+    never = PoissonEvent(rate_per_s=0.001, duration_ms=1, seed=1)
+    assert never.times == 0
+    assert _fault(poisson).expected_fires == 3
+    assert _fault(Repeat(AnyOf(DelayEvent(10), TokenEvent(b"x")), times=4)).expected_fires == 4
+    assert _fault(Repeat(poisson, times=2)).expected_fires == 2
+    assert _fault(Sequence(DelayEvent(10), poisson)).expected_fires == 1
+    assert _fault(Sequence(DelayEvent(10), never)).expected_fires == 0
+    assert _fault(AnyOf(never, DelayEvent(10))).expected_fires == 1
+    # A Timeout may expire, so the count is only known as a bound
+    timeout = _fault(Repeat(Timeout(DelayEvent(10), ms=5), times=3))
+    assert timeout.expected_fires is None
+    assert timeout.max_fires == 3
+    assert fire_bounds(timeout.event) == (0, 3)
+
+
+def test_campaign_does_not_wait_for_a_fault_that_cannot_fire():
+    plugin = _Plugin(BaseRuntimeHooks)
+    never = PoissonEvent(rate_per_s=0.001, duration_ms=1, seed=1)
+    fault = Fault(node="1", event=Sequence(DelayEvent(10), never), action="kill", plugin="p")
+    campaign = Campaign([fault], plugin_loader=lambda path: plugin)
+    start = time.monotonic()
+    records = campaign.run(timeout=5)
+    assert time.monotonic() - start < 1
+    assert records[0]["expected_fires"] == 0
+    assert records[0]["fires"] == 0
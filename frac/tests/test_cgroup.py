@@ -0,0 +1,67 @@
+"""ThrottledNode setup errors surface before the fault is due."""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+from frac.cgroup import CgroupError, CpuThrottle, ThrottledNode
+from frac.local import LocalProcessNode
+from frac.observers import BaseRuntimeHooks
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def node():
+    node = LocalProcessNode(["cat"])
+    node.start()
+    yield node
+    node.stop()
+
+
+def test_prepare_rejects_unwritable_root(tmp_path, node):
+    not_a_dir = tmp_path / "file"
+    not_a_dir.write_text("")
+    with pytest.raises(CgroupError):
+        ThrottledNode(node, [CpuThrottle(10)], root=str(not_a_dir)).prepare()
+
+
+def test_prepare_rejects_root_without_controller_files(tmp_path, node):
+    # A plain directory accepts the subtree_control write and the mkdir,
+    # but the cgroup it makes has no cgroup.procs or cpu.max
+    with pytest.raises(CgroupError, match="not writable"):
+        ThrottledNode(node, [CpuThrottle(10)], root=str(tmp_path)).prepare()
+
+
+def test_fire_reports_callback_errors():
+    hooks = BaseRuntimeHooks()
+
+    def fail():
+        raise CgroupError("no cgroup")
+
+    hooks.set_fire_callback(fail)
+    hooks.add_byte_threshold(10, hooks.fire)
+    hooks.add_byte_count(20)  # must not raise into the counting caller
+    assert [str(e) for e in hooks.fire_errors] == ["no cgroup"]
+
+
+def test_byte_kill_fails_fast_on_unwritable_root(tmp_path):
+    data = tmp_path / "in"
+    data.write_bytes(b"x" * 100_000)
+    with open(data, "rb") as stdin:
+        result = subprocess.run(
+            [
+                sys.executable, "-m", "frac", "byte-kill", "--bytes", "1000",
+                "--throttle-cpu", "10", "--cgroup-root", str(tmp_path / "missing" / "cg"),
+                "--cmd", "cat",
+            ],
+            stdin=stdin,
+            capture_output=True,
+            env={**os.environ, "PYTHONPATH": REPO_ROOT},
+            timeout=30,
+        )
+    assert result.returncode != 0
+    assert b"cgroup.subtree_control" in result.stderr
+    assert result.stdout == b""
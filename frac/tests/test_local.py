@@ -0,0 +1,45 @@
+"""ProcessGroupNode only signals a process group while it is still its own."""
+
+import os
+import signal
+import time
+
+from frac.local import ProcessGroupNode
+
+
+def test_resurrect_does_not_signal_a_reaped_group(monkeypatch):
+    node = ProcessGroupNode(["cat"], kill_timeout=2.0)
+    node.start()
+    old_pgid = node.proc.pid
+    node.kill()
+    deadline = time.monotonic() + 5
+    while "kill_to_reap_ms" not in node.kill_stats and time.monotonic() < deadline:
+        time.sleep(0.005)
+    assert "kill_to_reap_ms" in node.kill_stats
+
+    signalled = []
+    real_killpg = os.killpg
+
+    def killpg(pgid, sig):
+        signalled.append((pgid, sig))
+        real_killpg(pgid, sig)
+
+    # The pgid may already belong to someone else: resurrect must leave it alone
+    monkeypatch.setattr(os, "killpg", killpg)
+    node.resurrect()
+    try:
+        assert (old_pgid, signal.SIGKILL) not in signalled
+        assert node.proc.pid != old_pgid and node.is_alive()
+    finally:
+        node.stop()
+
+
+def test_resurrect_kills_a_live_group():
+    node = ProcessGroupNode(["sh", "-c", "sleep 30 & cat"])
+    node.start()
+    old = node.proc
+    node.resurrect()  # the old tree is still running: it goes first
+    try:
+        assert old.wait(timeout=5) == -signal.SIGKILL
+    finally:
+        node.stop()
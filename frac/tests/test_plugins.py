@@ -0,0 +1,48 @@
+"""Plugin files load in isolation and fail with PluginError."""
+
+import pytest
+
+from frac import plugins
+from frac.plugins import PluginError
+
+PLUGIN = """
+WHO = {who!r}
+
+def create_node(**kwargs):
+    return None
+
+def create_hooks(**kwargs):
+    return None
+
+def create_frac(**kwargs):
+    return None
+"""
+
+
+@pytest.fixture(autouse=True)
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("FRAC_CACHE_DIR", str(tmp_path / "cache"))
+
+
+def test_same_name_in_different_directories(tmp_path):
+    for who in ("a", "b"):
+        (tmp_path / who).mkdir()
+        (tmp_path / who / "plugin.py").write_text(PLUGIN.format(who=who))
+    first = plugins.load(str(tmp_path / "a" / "plugin.py"))
+    second = plugins.load(str(tmp_path / "b" / "plugin.py"))
+    assert first.__name__ != second.__name__
+    assert (first.WHO, second.WHO) == ("a", "b")
+
+
+def test_syntax_error_is_plugin_error(tmp_path):
+    path = tmp_path / "broken.py"
+    path.write_text("def create_node(:\n")
+    with pytest.raises(PluginError, match="cannot compile plugin"):
+        plugins.load(str(path))
+
+
+def test_exec_error_is_plugin_error(tmp_path):
+    path = tmp_path / "raises.py"
+    path.write_text("raise RuntimeError('boom')\n")
+    with pytest.raises(PluginError, match="RuntimeError: boom"):
+        plugins.load(str(path))
@@ -0,0 +1,71 @@
+"""byte-kill --trace and replay: faults come back at the recorded offsets."""
+
+import os
+import subprocess
+import sys
+
+from frac.trace import read_trace
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _frac(args, data):
+    result = subprocess.run(
+        [sys.executable, "-m", "frac", *args],
+        input=data,
+        capture_output=True,
+        env={**os.environ, "PYTHONPATH": REPO_ROOT},
+        timeout=60,
+    )
+    assert result.returncode == 0, result.stderr.decode()
+    return result
+
+
+def _faults(path):
+    return [(entry.action, entry.offset) for entry in read_trace(str(path))[1]]
+
+
+def test_kill_is_replayed_at_its_offset(tmp_path):
+    data = b"x" * 500_000
+    trace, replayed = tmp_path / "run.trace", tmp_path / "replay.trace"
+    _frac(["byte-kill", "--bytes", "123457", "--cmd", "cat", "--trace", str(trace)], data)
+    result = _frac(["replay", str(trace), "--cmd", "cat", "--record", str(replayed)], data)
+    assert _faults(trace) == [("kill", 123457)]
+    assert _faults(replayed) == _faults(trace)
+    assert len(result.stdout) == 123457
+
+
+def test_degrade_and_restore_are_replayed(tmp_path):
+    data = b"x" * 1_000_000
+    trace, replayed = tmp_path / "run.trace", tmp_path / "replay.trace"
+    slow = ["--slow-latency-ms", "0.01"]
+    result = _frac(
+        ["byte-kill", "--bytes", "200000", *slow, "--restore-bytes", "600000",
+         "--cmd", "cat", "--trace", str(trace)],
+        data,
+    )
+    assert len(result.stdout) == len(data)  # degraded, not killed
+    assert _faults(trace) == [("slow_link", 200000), ("resurrect", 600000)]
+
+    result = _frac(
+        ["replay", str(trace), *slow, "--cmd", "cat", "--record", str(replayed)], data
+    )
+    assert len(result.stdout) == len(data)
+    assert _faults(replayed) == _faults(trace)
+    assert b"link restored" in result.stderr
+
+
+def test_replay_refuses_degrade_faults_without_their_options(tmp_path):
+    trace = tmp_path / "run.trace"
+    data = b"x" * 300_000
+    _frac(
+        ["byte-kill", "--bytes", "1000", "--slow-latency-ms", "0.01", "--cmd", "cat",
+         "--trace", str(trace)],
+        data,
+    )
+    result = subprocess.run(
+        [sys.executable, "-m", "frac", "replay", str(trace), "--cmd", "cat"],
+        input=data, capture_output=True, env={**os.environ, "PYTHONPATH": REPO_ROOT}, timeout=60,
+    )
+    assert result.returncode != 0
+    assert b"slow_link" in result.stderr
@@ -0,0 +1,101 @@
+"""Compact binary traces of fired faults, for deterministic replay.
+
+A trace file is a 16-byte header (magic, wall-clock start time) followed by
+one record per fire()::
+
+    elapsed_ns  u64   time since the hooks were created
+    offset      u64   bytes_sent() when the fault fired
+    action      u8    index into ACTIONS: fire, kill, resurrect, throttle, slow_link
+    token_len   u16   length of the UTF-8 token that triggered it (0 if none)
+    token       bytes
+
+Fires are rare, so each record is written and flushed as it happens; a
+run that crashes right after a fault still leaves a complete trace.
+Replay re-arms every recorded fault at its byte offset, which does not
+depend on how fast the run goes, and performs the recorded action there.
+"""
+
+from __future__ import annotations
+
+import struct
+import threading
+from dataclasses import dataclass
+from typing import BinaryIO, List, Optional
+
+MAGIC = b"FRACTRC1"
+_HEADER = struct.Struct("<8sd")
+_RECORD = struct.Struct("<QQBH")
+
+# New actions are only ever appended: the index is the on-disk code
+ACTIONS = ("fire", "kill", "resurrect", "throttle", "slow_link")
+
+
+class TraceError(ValueError):
+    """Raised for files that are not (complete) frac traces."""
+
+
+@dataclass
+class TraceEntry:
+    """One recorded fire."""
+
+    elapsed_ns: int
+    offset: int
+    action: str
+    token: Optional[str] = None
+
+    @property
+    def elapsed_ms(self) -> float:
+        return self.elapsed_ns / 1e6
+
+
+class TraceRecorder:
+    """Appends fire records to a trace file; shared safely across threads."""
+
+    def __init__(self, path: str, start_time: float) -> None:
+        self.path = path
+        self._file: Optional[BinaryIO] = open(path, "wb")
+        self._lock = threading.Lock()
+        self._file.write(_HEADER.pack(MAGIC, start_time))
+        self._file.flush()
+
+    def record(self, elapsed_ns: int, offset: int, action: str, token: Optional[str] = None) -> None:
+        code = ACTIONS.index(action) if action in ACTIONS else 0
+        raw = token.encode("utf-8")[:0xFFFF] if token else b""
+        data = _RECORD.pack(elapsed_ns, offset, code, len(raw)) + raw
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(data)
+            self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def read_trace(path: str) -> tuple[float, List[TraceEntry]]:
+    """Return (wall-clock start time, entries) of a trace file."""
+    with open(path, "rb") as f:
+        data = f.read()
+    if len(data) < _HEADER.size:
+        raise TraceError(f"{path}: not a frac trace (too short)")
+    magic, start_time = _HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise TraceError(f"{path}: not a frac trace (bad magic)")
+
+    entries = []
+    pos = _HEADER.size
+    while pos < len(data):
+        if pos + _RECORD.size > len(data):
+            raise TraceError(f"{path}: truncated record at byte {pos}")
+        elapsed_ns, offset, code, token_len = _RECORD.unpack_from(data, pos)
+        pos += _RECORD.size
+        if pos + token_len > len(data):
+            raise TraceError(f"{path}: truncated token at byte {pos}")
+        token = data[pos:pos + token_len].decode("utf-8", "replace") if token_len else None
+        pos += token_len
+        action = ACTIONS[code] if code < len(ACTIONS) else "fire"
+        entries.append(TraceEntry(elapsed_ns, offset, action, token))
+    return start_time, entries